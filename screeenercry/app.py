@@ -3,10 +3,11 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-import time
 
 from crypto_analyzer import CryptoAnalyzer
 from data_fetcher import DataFetcher
+from scan_worker import ScanWorker
+from signal_cache import get_signal_cache
 
 # إعداد الصفحة
 st.set_page_config(
@@ -85,11 +86,32 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)  # تخزين مؤقت لمدة 5 دقائق
+@st.cache_resource
+def get_scan_worker():
+    """عامل المسح الخلفي المشترك بين كل الجلسات"""
+    # نتائج التحليل مشتركة أيضاً: الشموع التي لم تتغير لا يُعاد تحليلها
+    return ScanWorker(CryptoAnalyzer(signal_cache=get_signal_cache())).start()
+
 def load_crypto_data(symbols, timeframes):
-    """تحميل بيانات العملات مع التخزين المؤقت"""
-    analyzer = CryptoAnalyzer()
-    return analyzer.analyze_multiple_cryptos(symbols, timeframes)
+    """
+    آخر نتائج العامل المشترك للعملات المختارة (جدول مفهرس يُنسق بعد الفلترة فقط)
+
+    النتائج محفوظة لكل (عملة، إطار زمني) ويُجمع الجدول منها، فتغيير الاختيار
+    يمسح الأزواج الجديدة فقط. لا ينتظر المسح: الأزواج الجديدة تظهر عندما ينتهي
+    العامل منها ويكتشف poll_scan_results الجيل الجديد.
+    """
+    return get_scan_worker().table(symbols, timeframes)
+
+@st.fragment(run_every=10)
+def poll_scan_results(pending, follow):
+    """
+    استطلاع خفيف لنتائج العامل؛ إعادة رسم الصفحة فقط عند وجود نتائج جديدة
+
+    الأزواج التي عُرضت الصفحة بدونها تظهر فور جاهزيتها دائماً، وتحديث النتائج
+    المعروضة مسبقاً يتبع خيار التحديث التلقائي.
+    """
+    if get_scan_worker().has_new_results(st.session_state.get('scan_generation'), pending, follow):
+        st.rerun()
 
 @st.cache_data(ttl=600)  # تخزين مؤقت لمدة 10 دقائق
 def get_available_symbols():
@@ -117,20 +139,13 @@ def main():
     # إعدادات التحديث التلقائي
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
-        auto_refresh = st.checkbox("🔄 التحديث التلقائي كل ساعة", value=False)
+        auto_refresh = st.checkbox("🔄 التحديث التلقائي عند توفر نتائج جديدة", value=False)
     with col2:
-        if st.button("🔄 تحديث الآن", type="primary"):
-            st.cache_data.clear()
-            st.rerun()
+        refresh_clicked = st.button("🔄 تحديث الآن", type="primary")
     with col3:
         st.markdown(f'<div class="last-update">آخر تحديث: {datetime.now().strftime("%H:%M:%S")}</div>',
                    unsafe_allow_html=True)
 
-    # التحديث التلقائي
-    if auto_refresh:
-        time.sleep(3600)  # ساعة واحدة
-        st.rerun()
-
     # الشريط الجانبي للإعدادات
     with st.sidebar:
         st.header("⚙️ إعدادات التحليل")
@@ -206,18 +221,36 @@ def main():
         st.warning("⚠️ يرجى اختيار إطار زمني واحد على الأقل")
         return
 
+    # التحديث اليدوي يعيد مسح الاختيار الحالي فقط؛ قائمة العملات ونتائج الأزواج الأخرى تبقى
+    if refresh_clicked or refresh_button:
+        worker = get_scan_worker()
+        with st.spinner('🔍 جاري تحديث العملات المختارة...'):
+            worker.refresh_now(worker.watch(selected_symbols, selected_timeframes))
+
     # عرض حالة التحميل
     with st.spinner('🔍 جاري تحليل العملات...'):
         try:
-            # تحميل البيانات
+            # تحميل البيانات (الجيل يُقرأ أولاً حتى لا تفوت الجلسة مسحاً ينتهي أثناء القراءة)
+            generation = get_scan_worker().generation
             signals_df = load_crypto_data(selected_symbols, selected_timeframes)
+            st.session_state['scan_generation'] = generation
+
+            pending = get_scan_worker().pending(selected_symbols, selected_timeframes)
+            # العامل الخلفي يمسح عند إغلاق الشموع والجلسة تستطلع نتائجه فقط؛ الأزواج
+            # قيد التحليل تُستطلع دائماً حتى تظهر دون تفاعل من المستخدم
+            if auto_refresh or pending:
+                poll_scan_results(pending, auto_refresh)
+            if pending:
+                st.info(f"⏳ جاري تحليل {len(pending)} من أزواج العملات المختارة في الخلفية؛ "
+                        "ستظهر نتائجها تلقائياً")
 
             if signals_df.empty:
-                st.warning("❌ لم يتم العثور على إشارات للعملات المختارة")
+                if not pending:
+                    st.warning("❌ لم يتم العثور على إشارات للعملات المختارة")
                 return
 
             # تطبيق الفلاتر
-            analyzer = CryptoAnalyzer()
+            analyzer = get_scan_worker().analyzer
             filtered_signals = analyzer.filter_signals(
                 signals_df,
                 signal_type_filter=signal_type_filter if signal_type_filter != 'الكل' else None,
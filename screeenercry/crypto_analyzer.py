@@ -1,12 +1,120 @@
+import asyncio
+import re
+import time
+
+import numpy as np
 import pandas as pd
 from data_fetcher import DataFetcher
-from indicators import TechnicalIndicators
+from indicators import DEFAULT_BACKEND, TechnicalIndicators, live_window
+from indicator_panel import IndicatorPanel
+from resampler import last_close_ms, timeframe_ms
+from parallel_analysis import analyze_in_processes
+from scan_pipeline import DEFAULT_PREFETCH, prefetch_symbols
+from signal_buffer import SIGNAL_TYPES, SignalBuffer
+from signal_cache import cache_key
+from signal_store import SignalStore, scan_window
+from signal_table import SignalTable
 from datetime import datetime
 
+# أسماء المؤشرات باللغة العربية لكل نوع إشارة
+INDICATOR_NAMES = {
+    # RSI إشارات
+    'rsi_oversold': 'RSI - تشبع بيعي',
+    'rsi_overbought': 'RSI - تشبع شرائي',
+    'rsi_latest_bullish_divergence': '🔥 RSI - دايفرجنس صعودي (الشمعة الأخيرة)',
+    'rsi_latest_bearish_divergence': '🔥 RSI - دايفرجنس هبوطي (الشمعة الأخيرة)',
+    'rsi_simple_bullish_divergence': 'RSI - دايفرجنس صعودي',
+    'rsi_simple_bearish_divergence': 'RSI - دايفرجنس هبوطي',
+
+    # MA إشارات
+    'ma_bullish_crossover': 'MA - تقاطع صعودي',
+    'ma_bearish_crossover': 'MA - تقاطع هبوطي',
+
+    # MACD إشارات
+    'macd_latest_bullish_divergence': '🔥 MACD - دايفرجنس صعودي (الشمعة الأخيرة)',
+    'macd_latest_bearish_divergence': '🔥 MACD - دايفرجنس هبوطي (الشمعة الأخيرة)',
+    'macd_simple_bullish_divergence': 'MACD - دايفرجنس صعودي',
+    'macd_simple_bearish_divergence': 'MACD - دايفرجنس هبوطي',
+
+    # OBV إشارات
+    'obv_latest_bullish_divergence': '🔥 OBV - دايفرجنس صعودي (الشمعة الأخيرة)',
+    'obv_latest_bearish_divergence': '🔥 OBV - دايفرجنس هبوطي (الشمعة الأخيرة)',
+    'obv_simple_bullish_divergence': 'OBV - دايفرجنس صعودي',
+    'obv_simple_bearish_divergence': 'OBV - دايفرجنس هبوطي'
+}
+
+# قوة افتراضية حسب نوع المؤشر للإشارات القديمة (بين 10-100%)
+DEFAULT_STRENGTHS = {
+    # إشارات الدايفرجنس الجديدة (قوية جداً)
+    'rsi_latest_bullish_divergence': 85,
+    'rsi_latest_bearish_divergence': 85,
+    'macd_latest_bullish_divergence': 80,
+    'macd_latest_bearish_divergence': 80,
+    'obv_latest_bullish_divergence': 75,
+    'obv_latest_bearish_divergence': 75,
+
+    # إشارات الدايفرجنس البسيطة (متوسطة إلى قوية)
+    'rsi_simple_bullish_divergence': 65,
+    'rsi_simple_bearish_divergence': 65,
+    'macd_simple_bullish_divergence': 60,
+    'macd_simple_bearish_divergence': 60,
+    'obv_simple_bullish_divergence': 55,
+    'obv_simple_bearish_divergence': 55,
+
+    # إشارات RSI التقليدية (متوسطة)
+    'rsi_oversold': 45,
+    'rsi_overbought': 45,
+
+    # إشارات المتوسطات المتحركة (ضعيفة إلى متوسطة)
+    'ma_bullish_crossover': 35,
+    'ma_bearish_crossover': 35,
+}
+
+# الجداول السابقة مرتبة حسب أكواد SIGNAL_TYPES لتحويل عمود الأكواد دفعة واحدة
+_INDICATOR_LABELS = np.array([INDICATOR_NAMES.get(name, name) for name in SIGNAL_TYPES], dtype=object)
+_DEFAULT_STRENGTH_VALUES = np.array(
+    [min(100, max(10, DEFAULT_STRENGTHS.get(name, 40))) for name in SIGNAL_TYPES], dtype=float)
+
+
+def round_like_builtin(values, decimals=1):
+    """
+    تقريب متجه مطابق لـ round() في بايثون
+
+    np.round يضرب في 10^decimals قبل التقريب فيختلف عن round() عند القيم
+    القريبة من المنتصف (مثل 78.35). هنا تُقارن القيمة بالمنتصف العشري مباشرة،
+    والقيم التي تساوي المنتصف كـ float (نادرة) تُقرب بـ round() نفسها.
+    """
+    values = np.asarray(values, dtype=float)
+    scale = 10.0 ** decimals
+    lower = np.floor(values * scale)
+    midpoint = (2 * lower + 1) / (2 * scale)
+    result = np.where(values > midpoint, lower + 1, lower) / scale
+
+    ties = np.flatnonzero(values == midpoint)
+    if len(ties):
+        result[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    # القيم غير المنتهية تبقى كما هي
+    return np.where(np.isfinite(values), result, values)
+
+
 class CryptoAnalyzer:
-    def __init__(self):
-        """تهيئة محلل العملات الرقمية"""
+    def __init__(self, signal_cache=None, signal_store=None):
+        """
+        تهيئة محلل العملات الرقمية
+
+        Args:
+            signal_cache (SignalCache): ذاكرة مؤقتة لنتائج التحليل (مثل get_signal_cache())؛
+                التحليل المتكرر لنفس الشموع يصبح بحثاً فقط
+            signal_store (SignalStore): مخزن دائم تُكتب فيه نتائج المسح ويستعلم منه
+                get_market_overview
+        """
         self.data_fetcher = DataFetcher()
+        self.signal_cache = signal_cache
+        self.signal_store = signal_store
+        # إعدادات المؤشرات الداخلة في مفتاح الذاكرة المؤقتة
+        self.indicator_params = {'backend': DEFAULT_BACKEND}
+        # علامات الماء العالي للمسح التزايدي (تُحمّل من المخزن عند أول استخدام)
+        self._high_water = None
         self.timeframes = {
             '1H': '1h',
             '2H': '2h',
@@ -31,27 +139,110 @@ class CryptoAnalyzer:
         try:
             # جلب البيانات
             df = self.data_fetcher.get_crypto_data(symbol, timeframe, limit)
+            return self._analyze_dataframe(symbol, timeframe, df)
+
+        except Exception as e:
+            print(f"خطأ في تحليل {symbol}: {e}")
+            return []
 
-            if df.empty:
-                return []
+    def _analyze_dataframe(self, symbol, timeframe, df):
+        """تحليل بيانات جاهزة لعملة وإطار زمني"""
+        return self.analyze_buffer(symbol, timeframe, df).to_records()
 
-            # تحليل المؤشرات الفنية
-            indicators = TechnicalIndicators(df)
-            signals = indicators.get_all_signals()
+    def analyze_buffer(self, symbol, timeframe, df, indicators=None, live=False, cache=True):
+        """
+        تحليل بيانات جاهزة لعملة وإطار زمني إلى مخزن إشارات عمودي
 
-            # إضافة معلومات العملة والإطار الزمني
-            for signal in signals:
-                signal['symbol'] = symbol
-                signal['timeframe'] = timeframe
-                signal['current_price'] = df['close'].iloc[-1]
+        Args:
+            symbol (str): رمز العملة
+            timeframe (str): الإطار الزمني
+            df (pd.DataFrame): بيانات OHLCV
+            indicators (TechnicalIndicators): حاسبة جاهزة (مثلاً من IndicatorPanel)
+            live (bool): إشارات الشمعة الأخيرة فقط (get_live_signal_buffer)
+            cache (bool): استخدام الذاكرة المؤقتة (False لحاسبة قيمها من حالة غير حالة df وحدها)
+
+        Returns:
+            SignalBuffer: الإشارات مع العملة والإطار الزمني والسعر الحالي
+        """
+        try:
+            if df is None or df.empty:
+                return SignalBuffer()
+
+            # الحاسبة الجاهزة تعني أن المستدعي بحث في الذاكرة المؤقتة مسبقاً
+            if not cache:
+                key = None
+            elif indicators is None:
+                key, cached = self._cache_lookup(symbol, timeframe, df, live)
+                if cached is not None:
+                    return cached
+            else:
+                key = self._cache_key(symbol, timeframe, df, live)
 
-            return signals
+            # تحليل المؤشرات الفنية
+            indicators = indicators or TechnicalIndicators(df, self.indicator_params['backend'])
+            buffer = indicators.get_live_signal_buffer() if live else indicators.get_signal_buffer()
+            buffer = buffer.with_context(symbol, timeframe, df['close'].iloc[-1])
+            if key is not None:
+                self.signal_cache.put(key, buffer)
+            return buffer
 
         except Exception as e:
             print(f"خطأ في تحليل {symbol}: {e}")
-            return []
+            return SignalBuffer()
+
+    def _cache_key(self, symbol, timeframe, df, live=False):
+        """مفتاح الذاكرة المؤقتة أو None إذا لم تُفعّل"""
+        if self.signal_cache is None or df is None or df.empty:
+            return None
+        try:
+            params = dict(self.indicator_params, live=True) if live else self.indicator_params
+            return cache_key(symbol, timeframe, df, params)
+        except Exception as e:
+            print(f"خطأ في حساب مفتاح {symbol}: {e}")
+            return None
+
+    def _cache_lookup(self, symbol, timeframe, df, live=False):
+        """
+        البحث عن نتيجة تحليل سابقة لنفس الشموع
+
+        Returns:
+            tuple: (المفتاح، مخزن الإشارات المخزن أو None)
+        """
+        key = self._cache_key(symbol, timeframe, df, live)
+        if key is None:
+            return None, None
+        return key, self.signal_cache.get(key)
+
+    def _analyze_panel(self, timeframe, frames):
+        """
+        تحليل عدة عملات لنفس الإطار الزمني بحساب المؤشرات دفعة واحدة
+
+        Args:
+            timeframe (str): الإطار الزمني
+            frames (dict): {رمز العملة: DataFrame}
 
-    def analyze_multiple_cryptos(self, symbols, timeframes=['1d'], limit=200):
+        Returns:
+            list: مخازن إشارات العملات
+        """
+        try:
+            panel = IndicatorPanel(frames)
+            panel.compute()
+        except Exception as e:
+            print(f"خطأ في حساب المؤشرات المجمعة ({timeframe}): {e}")
+            return [self.analyze_buffer(symbol, timeframe, df) for symbol, df in frames.items()]
+
+        buffers = []
+        for symbol in panel.symbols:
+            try:
+                indicators = panel.indicators_for(symbol)
+            except Exception as e:
+                print(f"خطأ في تحليل {symbol}: {e}")
+                continue
+            buffers.append(self.analyze_buffer(symbol, timeframe, panel.frames[symbol], indicators))
+        return buffers
+
+    def analyze_multiple_cryptos(self, symbols, timeframes=['1d'], limit=200, panel=False,
+                                 workers=None, chunk_size=None, prefetch=DEFAULT_PREFETCH, delta=False):
         """
         تحليل عدة عملات على عدة أطر زمنية
 
@@ -59,118 +250,376 @@ class CryptoAnalyzer:
             symbols (list): قائمة رموز العملات
             timeframes (list): قائمة الأطر الزمنية
             limit (int): عدد الشموع
+            panel (bool): حساب المؤشرات لكل العملات دفعة واحدة لكل إطار زمني
+            workers (int): عدد العمليات لتوزيع التحليل عليها (أكبر من 1 لتفعيله،
+                ولا يُستخدم مع panel)
+            chunk_size (int): عدد المهام المرسلة لكل عملية في كل مرة
+            prefetch (int): عدد العملات التي تُجلب مسبقاً أثناء تحليل العملة الحالية
+                (0 للجلب والتحليل بالتتابع)
+            delta (bool): الإشارات الجديدة فقط منذ آخر مسح تزايدي لكل (عملة، إطار زمني)
+                (انظر new_signals)
 
         Returns:
             pd.DataFrame: جدول الإشارات
         """
-        all_signals = []
+        return self._format_signals(self._scan_buffers(symbols, timeframes, limit, panel,
+                                                       workers, chunk_size, prefetch, delta))
+
+    def analyze_signal_table(self, symbols, timeframes=['1d'], limit=200, panel=False,
+                             workers=None, chunk_size=None, prefetch=DEFAULT_PREFETCH, delta=False):
+        """
+        نفس analyze_multiple_cryptos لكن النتيجة جدول مكتوب النوع غير منسق
+
+        الجدول مناسب للفلترة المتكررة (filter_signals) ويُنسق للعرض في النهاية فقط.
+
+        Returns:
+            SignalTable: جدول الإشارات
+        """
+        return self.build_table(self._scan_buffers(symbols, timeframes, limit, panel,
+                                                    workers, chunk_size, prefetch, delta))
+
+    def _scan_buffers(self, symbols, timeframes, limit, panel=False, workers=None,
+                      chunk_size=None, prefetch=DEFAULT_PREFETCH, delta=False, scanned=None):
+        """
+        تحليل كل العملات والأطر الزمنية إلى مخزن إشارات واحد
+
+        scanned (dict) إن مُرر يُملأ بآخر شمعة تم تحليلها لكل (عملة، إطار زمني).
+        """
+        buffers = []
+        last_candles = {} if scanned is None else scanned
+        windows = {}
+        panel_frames = {timeframe: {} for timeframe in timeframes}
+        use_processes = not panel and workers is not None and workers > 1
+        units = []
+
+        for symbol, frames, error in self._iter_symbol_frames(symbols, timeframes, limit, prefetch):
+            if error is not None:
+                print(f"خطأ في جلب بيانات {symbol}: {error}")
+                continue
 
-        for symbol in symbols:
             for timeframe in timeframes:
-                signals = self.analyze_single_crypto(symbol, timeframe, limit)
-                all_signals.extend(signals)
+                df = frames.get(timeframe)
+                if df is not None and not df.empty:
+                    last_candles[(symbol, timeframe)] = df.index[-1]
+                    windows[(symbol, timeframe)] = scan_window(df)
+                if not (panel or use_processes):
+                    buffers.append(self.analyze_buffer(symbol, timeframe, df))
+                    continue
+
+                # النتائج المخزنة لا تُرسل إلى اللوحة أو العمليات
+                key, cached = self._cache_lookup(symbol, timeframe, df)
+                if cached is not None:
+                    buffers.append(cached)
+                elif panel:
+                    panel_frames[timeframe][symbol] = df
+                elif df is not None and not df.empty:
+                    units.append((symbol, timeframe, df, key))
+
+        if panel:
+            for timeframe in timeframes:
+                if panel_frames[timeframe]:
+                    buffers.extend(self._analyze_panel(timeframe, panel_frames[timeframe]))
+
+        if use_processes:
+            try:
+                results = analyze_in_processes([unit[:3] for unit in units], workers, chunk_size,
+                                               self.indicator_params['backend'])
+                # المهمة الفاشلة تعيد مخزناً فارغاً بدون عملة فلا يُخزن
+                for (_, _, _, key), buffer in zip(units, results):
+                    if key is not None and len(buffer.symbols):
+                        self.signal_cache.put(key, buffer)
+                buffers.extend(results)
+            except Exception as e:
+                print(f"خطأ في التحليل المتوازي: {e}")
+                for symbol, timeframe, df, _ in units:
+                    buffers.append(self.analyze_buffer(symbol, timeframe, df))
+
+        signals = SignalBuffer.concat(buffers)
+        # المخزن يحتفظ بكل إشارات النافذة حتى مع المسح التزايدي
+        self._save_signals(signals, windows)
+        if delta:
+            signals = self.new_signals(signals, last_candles)
+        return signals
+
+    def new_signals(self, signals, last_candles):
+        """
+        الإشارات الجديدة فقط منذ آخر استدعاء، مع تقديم علامة الماء العالي
+
+        لكل (عملة، إطار زمني) تُحفظ آخر شمعة تم تحليلها وأنواع الإشارات التي
+        أُرسلت عليها؛ تمر الإشارات على الشموع الأحدث منها، وعلى نفس الشمعة فقط
+        الأنواع التي لم تُرسل بعد (الشمعة الأخيرة قد تكون قيد التكوين). أول
+        استدعاء لزوج بدون علامة يمرر كل إشاراته. العلامات تُحفظ في signal_store
+        إن وُجد فتبقى بعد إعادة التشغيل.
+
+        Args:
+            signals (SignalBuffer): الإشارات مع العملة والإطار الزمني
+            last_candles (dict): {(العملة، الإطار الزمني): وقت آخر شمعة تم تحليلها}
+
+        Returns:
+            SignalBuffer: الإشارات الجديدة فقط
+        """
+        marks = self._high_water_marks()
+        columns = signals.columns()
+        symbols, timeframes = list(signals.symbols), list(signals.timeframes)
+
+        # العلامة وأنواعها (قناع بت بأكواد SIGNAL_TYPES) لكل صف حسب زوجه
+        pair_count = max(1, len(symbols) * len(timeframes))
+        pair_marks = np.full(pair_count, np.iinfo(np.int64).min, dtype=np.int64)
+        pair_seen = np.zeros(pair_count, dtype=np.int64)
+        pair_last = np.full(pair_count, np.iinfo(np.int64).min, dtype=np.int64)
+        for s, symbol in enumerate(symbols):
+            for t, timeframe in enumerate(timeframes):
+                index = s * len(timeframes) + t
+                if (symbol, timeframe) in marks:
+                    pair_marks[index], pair_seen[index] = marks[(symbol, timeframe)]
+                if (symbol, timeframe) in last_candles:
+                    pair_last[index] = pd.Timestamp(last_candles[(symbol, timeframe)]).value
+
+        pair = columns['symbol'].astype(np.int64) * len(timeframes) + columns['timeframe']
+        timestamps, bits = columns['timestamp'], np.left_shift(1, columns['type'].astype(np.int64))
+        row_marks = pair_marks[pair]
+        keep = (timestamps > row_marks) | ((timestamps == row_marks) & ((pair_seen[pair] & bits) == 0))
+
+        # الأنواع الموجودة على آخر شمعة لكل زوج
+        at_last = np.zeros(pair_count, dtype=np.int64)
+        rows = timestamps == pair_last[pair]
+        np.bitwise_or.at(at_last, pair[rows], bits[rows])
+
+        updated = []
+        for (symbol, timeframe), last in last_candles.items():
+            last = pd.Timestamp(last).value
+            mark, seen = marks.get((symbol, timeframe), (None, 0))
+            if mark is not None and last < mark:
+                continue
+            if symbol in symbols and timeframe in timeframes:
+                found = int(at_last[symbols.index(symbol) * len(timeframes) + timeframes.index(timeframe)])
+            else:
+                found = 0
+            marks[(symbol, timeframe)] = (last, found | seen if last == mark else found)
+            updated.append((symbol, timeframe))
+        self._persist_high_water(updated)
+
+        return signals.take(np.flatnonzero(keep))
+
+    def _high_water_marks(self):
+        """علامات الماء العالي {(العملة، الإطار الزمني): (وقت الشمعة بالنانوثانية، قناع الأنواع)}"""
+        if self._high_water is None:
+            self._high_water = {}
+            if self.signal_store is not None:
+                try:
+                    codes = {name: code for code, name in enumerate(SIGNAL_TYPES)}
+                    for pair, (mark, types) in self.signal_store.high_water_marks().items():
+                        seen = 0
+                        for name in types:
+                            if name in codes:
+                                seen |= 1 << codes[name]
+                        self._high_water[pair] = (mark * 1_000_000, seen)
+                except Exception as e:
+                    print(f"خطأ في قراءة علامات المسح التزايدي: {e}")
+        return self._high_water
+
+    def _persist_high_water(self, pairs):
+        """حفظ علامات الأزواج المحدثة في المخزن الدائم إن وُجد"""
+        if self.signal_store is None or not pairs:
+            return
+        rows = []
+        for symbol, timeframe in pairs:
+            mark, seen = self._high_water[(symbol, timeframe)]
+            types = [name for code, name in enumerate(SIGNAL_TYPES) if seen >> code & 1]
+            rows.append((symbol, timeframe, mark // 1_000_000, types))
+        try:
+            self.signal_store.set_high_water_marks(rows)
+        except Exception as e:
+            print(f"خطأ في حفظ علامات المسح التزايدي: {e}")
+
+    def _save_signals(self, signals, windows=None):
+        """كتابة نتائج المسح في المخزن الدائم إن وُجد (windows: نوافذ الشموع التي أُعيد مسحها)"""
+        if self.signal_store is None or not (len(signals) or windows):
+            return
+        try:
+            self.signal_store.write(signals, self.signal_strengths(signals), windows=windows)
+        except Exception as e:
+            print(f"خطأ في حفظ الإشارات: {e}")
+
+    def analyze_live(self, symbols, timeframes=['1d'], limit=None, prefetch=DEFAULT_PREFETCH):
+        """
+        مسح مباشر: إشارات الشمعة الأخيرة فقط لكل عملة
 
-        if not all_signals:
+        دايفرجنس الشمعة الأخيرة، ومنطقة RSI الحالية، وتقاطع المتوسطات في آخر
+        شمعة، بدون الإشارات التاريخية. تُجلب أقل عدد من الشموع يكفي لتقارب
+        المؤشرات (live_window).
+
+        Args:
+            symbols (list): قائمة رموز العملات
+            timeframes (list): قائمة الأطر الزمنية
+            limit (int): عدد الشموع (افتراضياً live_window())
+            prefetch (int): عدد العملات التي تُجلب مسبقاً أثناء تحليل العملة الحالية
+
+        Returns:
+            pd.DataFrame: جدول الإشارات بنفس تنسيق analyze_multiple_cryptos
+        """
+        buffers = []
+        for symbol, frames, error in self._iter_symbol_frames(symbols, timeframes, limit or live_window(), prefetch):
+            if error is not None:
+                print(f"خطأ في جلب بيانات {symbol}: {error}")
+                continue
+            for timeframe in timeframes:
+                buffers.append(self.analyze_buffer(symbol, timeframe, frames.get(timeframe), live=True))
+        return self._format_signals(SignalBuffer.concat(buffers))
+
+    def iter_multiple_cryptos(self, symbols, timeframes=['1d'], limit=200, prefetch=DEFAULT_PREFETCH):
+        """
+        تحليل عدة عملات مع إرجاع نتائج كل عملة فور انتهائها
+
+        Args:
+            symbols (list): قائمة رموز العملات
+            timeframes (list): قائمة الأطر الزمنية
+            limit (int): عدد الشموع
+            prefetch (int): عدد العملات التي تُجلب مسبقاً أثناء تحليل العملة الحالية
+
+        Yields:
+            dict: نتيجة العملة مع معلومات التقدم:
+                symbol: رمز العملة
+                signals: جدول إشارات العملة بنفس تنسيق analyze_multiple_cryptos
+                error: رسالة الخطأ عند فشل الجلب أو None
+                completed / total: عدد العملات المنتهية والكلي
+                progress: نسبة التقدم بين 0 و 1
+                elapsed: الوقت المنقضي بالثواني
+        """
+        total = len(symbols)
+        started = time.perf_counter()
+
+        for completed, (symbol, frames, error) in enumerate(
+                self._iter_symbol_frames(symbols, timeframes, limit, prefetch), start=1):
+            buffers = []
+            windows = {}
+            if error is not None:
+                print(f"خطأ في جلب بيانات {symbol}: {error}")
+            else:
+                for timeframe in timeframes:
+                    buffers.append(self.analyze_buffer(symbol, timeframe, frames.get(timeframe)))
+                    windows[(symbol, timeframe)] = scan_window(frames.get(timeframe))
+
+            signals = SignalBuffer.concat(buffers)
+            self._save_signals(signals, windows)
+            yield {
+                'symbol': symbol,
+                'signals': self._format_signals(signals),
+                'error': str(error) if error is not None else None,
+                'completed': completed,
+                'total': total,
+                'progress': completed / total if total else 1.0,
+                'elapsed': time.perf_counter() - started,
+            }
+
+    async def aiter_multiple_cryptos(self, symbols, timeframes=['1d'], limit=200, prefetch=DEFAULT_PREFETCH):
+        """
+        نسخة غير متزامنة من iter_multiple_cryptos (التحليل يتم في خيط منفصل)
+
+        Yields:
+            dict: نفس نتائج iter_multiple_cryptos
+        """
+        stream = self.iter_multiple_cryptos(symbols, timeframes, limit, prefetch)
+        finished = object()
+        try:
+            while True:
+                result = await asyncio.to_thread(next, stream, finished)
+                if result is finished:
+                    return
+                yield result
+        finally:
+            stream.close()
+
+    def _iter_symbol_frames(self, symbols, timeframes, limit, prefetch=DEFAULT_PREFETCH):
+        """
+        بيانات كل الأطر الزمنية لكل عملة (جلب واحد لكل عملة)
+
+        يتم جلب الإطار الأصغر مرة واحدة وبناء باقي الأطر منه محلياً، وجلب العملة
+        التالية يتم في الخلفية أثناء تحليل العملة الحالية.
+
+        Yields:
+            tuple: (رمز العملة، {الإطار الزمني: DataFrame}، الخطأ)
+        """
+        def fetch(symbol):
+            return self.data_fetcher.get_multi_timeframe_data(symbol, timeframes, limit)
+
+        if not prefetch:
+            for symbol in symbols:
+                try:
+                    yield symbol, fetch(symbol), None
+                except Exception as e:
+                    yield symbol, None, e
+            return
+
+        yield from prefetch_symbols(fetch, symbols, max_pending=prefetch)
+
+    def _format_signals(self, signals):
+        """
+        تنسيق الإشارات كجدول للعرض
+
+        Args:
+            signals: مخزن إشارات عمودي أو قائمة قواميس
+
+        Returns:
+            pd.DataFrame: جدول الإشارات
+        """
+        table = self.build_table(signals)
+        if table.empty:
             return pd.DataFrame()
+        return table.to_display()
 
-        # تحويل إلى DataFrame
-        df_signals = pd.DataFrame(all_signals)
+    def build_table(self, signals, final_strength=False):
+        """
+        بناء جدول الإشارات المكتوب النوع مع قوة الإشارة النهائية
+
+        Args:
+            signals: مخزن إشارات عمودي أو قائمة قواميس
+            final_strength (bool): القوة في المخزن نهائية مسبقاً (مثلاً من SignalStore)
+
+        Returns:
+            SignalTable: الجدول مفهرس بالوقت
+        """
+        if not isinstance(signals, SignalBuffer):
+            signals = SignalBuffer.from_records(signals)
 
         # ترتيب حسب الوقت (الأحدث أولاً)
-        df_signals = df_signals.sort_values('timestamp', ascending=False)
-
-        # إعادة تنسيق الأعمدة
-        if not df_signals.empty:
-            df_signals['timestamp'] = pd.to_datetime(df_signals['timestamp'])
-            df_signals['وقت الإشارة'] = df_signals['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
-            df_signals['العملة'] = df_signals['symbol']
-            df_signals['الإطار الزمني'] = df_signals['timeframe']
-            df_signals['نوع الإشارة'] = df_signals['signal']
-            df_signals['المؤشر'] = df_signals['type'].apply(self._format_indicator_name)
-            df_signals['الوصف'] = df_signals['description']
-            df_signals['السعر الحالي'] = df_signals['current_price'].round(4)
-
-            # إضافة قوة الإشارة مع إصلاح القيم الخاطئة
-            if 'strength_percentage' in df_signals.columns:
-                # إصلاح القيم الخاطئة
-                df_signals['strength_percentage_fixed'] = df_signals['strength_percentage'].apply(self._fix_strength_value)
-                df_signals['قوة الإشارة'] = df_signals['strength_percentage_fixed'].round(1)
-            else:
-                # قوة افتراضية للإشارات القديمة
-                df_signals['قوة الإشارة'] = df_signals.apply(self._calculate_default_strength, axis=1)
+        signals = signals.sort_by_time(descending=True)
+        strength = signals.columns()['strength'] if final_strength else self.signal_strengths(signals)
 
-            # فحص نهائي إضافي لضمان عدم وجود قيم خاطئة
-            df_signals['قوة الإشارة'] = df_signals['قوة الإشارة'].apply(self._final_strength_check)
+        # الأوصاف وتنسيق الوقت تُنشأ عند العرض فقط
+        return SignalTable.from_buffer(signals, strength, _INDICATOR_LABELS)
 
-            # اختيار الأعمدة المطلوبة
-            columns_order = ['العملة', 'الإطار الزمني', 'نوع الإشارة', 'المؤشر',
-                           'قوة الإشارة', 'وقت الإشارة', 'الوصف', 'السعر الحالي']
-            df_signals = df_signals[columns_order]
+    def signal_strengths(self, signals):
+        """
+        قوة الإشارة النهائية (المعروضة) لكل صف في مخزن الإشارات
+
+        Args:
+            signals (SignalBuffer): الإشارات
 
-        return df_signals
+        Returns:
+            np.ndarray: القوة بين 10-100
+        """
+        columns = signals.columns()
+
+        # إضافة قوة الإشارة مع إصلاح القيم الخاطئة
+        if not np.isnan(columns['strength']).all():
+            # إصلاح القيم الخاطئة
+            strength = np.round(self._fix_strength_values(columns['strength']), 1)
+        else:
+            # قوة افتراضية للإشارات القديمة
+            strength = self._default_strengths(columns['type'])
+
+        # فحص نهائي إضافي لضمان عدم وجود قيم خاطئة
+        return self._final_strength_checks(strength)
 
     def _format_indicator_name(self, indicator_type):
         """تنسيق أسماء المؤشرات باللغة العربية"""
-        indicator_map = {
-            # RSI إشارات
-            'rsi_oversold': 'RSI - تشبع بيعي',
-            'rsi_overbought': 'RSI - تشبع شرائي',
-            'rsi_latest_bullish_divergence': '🔥 RSI - دايفرجنس صعودي (الشمعة الأخيرة)',
-            'rsi_latest_bearish_divergence': '🔥 RSI - دايفرجنس هبوطي (الشمعة الأخيرة)',
-            'rsi_simple_bullish_divergence': 'RSI - دايفرجنس صعودي',
-            'rsi_simple_bearish_divergence': 'RSI - دايفرجنس هبوطي',
-
-            # MA إشارات
-            'ma_bullish_crossover': 'MA - تقاطع صعودي',
-            'ma_bearish_crossover': 'MA - تقاطع هبوطي',
-
-            # MACD إشارات
-            'macd_latest_bullish_divergence': '🔥 MACD - دايفرجنس صعودي (الشمعة الأخيرة)',
-            'macd_latest_bearish_divergence': '🔥 MACD - دايفرجنس هبوطي (الشمعة الأخيرة)',
-            'macd_simple_bullish_divergence': 'MACD - دايفرجنس صعودي',
-            'macd_simple_bearish_divergence': 'MACD - دايفرجنس هبوطي',
-
-            # OBV إشارات
-            'obv_latest_bullish_divergence': '🔥 OBV - دايفرجنس صعودي (الشمعة الأخيرة)',
-            'obv_latest_bearish_divergence': '🔥 OBV - دايفرجنس هبوطي (الشمعة الأخيرة)',
-            'obv_simple_bullish_divergence': 'OBV - دايفرجنس صعودي',
-            'obv_simple_bearish_divergence': 'OBV - دايفرجنس هبوطي'
-        }
-        return indicator_map.get(indicator_type, indicator_type)
+        return INDICATOR_NAMES.get(indicator_type, indicator_type)
 
     def _calculate_default_strength(self, row):
         """حساب قوة محسنة للإشارات القديمة - بين 10-100%"""
-        indicator_type = row['type']
-
-        # قوة محسنة حسب نوع المؤشر (بين 10-100%)
-        strength_map = {
-            # إشارات الدايفرجنس الجديدة (قوية جداً)
-            'rsi_latest_bullish_divergence': 85,
-            'rsi_latest_bearish_divergence': 85,
-            'macd_latest_bullish_divergence': 80,
-            'macd_latest_bearish_divergence': 80,
-            'obv_latest_bullish_divergence': 75,
-            'obv_latest_bearish_divergence': 75,
-
-            # إشارات الدايفرجنس البسيطة (متوسطة إلى قوية)
-            'rsi_simple_bullish_divergence': 65,
-            'rsi_simple_bearish_divergence': 65,
-            'macd_simple_bullish_divergence': 60,
-            'macd_simple_bearish_divergence': 60,
-            'obv_simple_bullish_divergence': 55,
-            'obv_simple_bearish_divergence': 55,
-
-            # إشارات RSI التقليدية (متوسطة)
-            'rsi_oversold': 45,
-            'rsi_overbought': 45,
-
-            # إشارات المتوسطات المتحركة (ضعيفة إلى متوسطة)
-            'ma_bullish_crossover': 35,
-            'ma_bearish_crossover': 35,
-        }
-
         # التأكد من أن القيمة بين 10-100
-        base_strength = strength_map.get(indicator_type, 40)
+        base_strength = DEFAULT_STRENGTHS.get(row['type'], 40)
         return min(100, max(10, base_strength))
 
     def _fix_strength_value(self, value):
@@ -235,6 +684,52 @@ class CryptoAnalyzer:
             # في حالة خطأ، إرجاع قيمة افتراضية
             return 40.0
 
+    def _fix_strength_values(self, values):
+        """
+        نسخة متجهة من _fix_strength_value لعمود كامل
+
+        Args:
+            values: قيم قوة الإشارة (Series أو مصفوفة)
+
+        Returns:
+            np.ndarray: القيم المصححة بنفس نتائج _fix_strength_value
+        """
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+        abs_values = np.abs(values)
+
+        with np.errstate(invalid='ignore'):
+            fixed = np.select(
+                [
+                    np.isnan(values),
+                    values >= 10000,  # قيم كبيرة جداً مثل 40000
+                    values >= 1000,   # قيم كبيرة مثل 2060, 4000
+                    values > 100,     # قيم متوسطة كبيرة مثل 150, 200
+                    values < 0,       # قيم سالبة
+                    values < 10,      # قيم صغيرة جداً
+                ],
+                [
+                    40.0,
+                    np.minimum(100.0, values / 1000),
+                    np.minimum(100.0, values / 100),
+                    np.minimum(100.0, values / 10),
+                    np.where(abs_values > 100, np.minimum(100.0, abs_values / 10), np.minimum(100.0, abs_values)),
+                    np.maximum(10.0, values),
+                ],
+                default=values,
+            )
+
+        # التأكد النهائي من النطاق ثم التقريب لرقم عشري واحد
+        return round_like_builtin(np.clip(fixed, 10.0, 100.0), 1)
+
+    def _final_strength_checks(self, values):
+        """نسخة متجهة من _final_strength_check"""
+        values = np.asarray(values, dtype=float)
+        return np.where(values > 100, 100.0, np.where(values < 10, 10.0, round_like_builtin(values, 1)))
+
+    def _default_strengths(self, type_codes):
+        """نسخة متجهة من _calculate_default_strength لأكواد أنواع الإشارات"""
+        return _DEFAULT_STRENGTH_VALUES[type_codes]
+
     def get_market_overview(self, symbols, timeframe='1d'):
         """
         نظرة عامة على السوق
@@ -255,6 +750,9 @@ class CryptoAnalyzer:
         }
 
         try:
+            if self.signal_store is not None:
+                return self._store_overview(overview, symbols, timeframe)
+
             # تحليل جميع العملات
             signals_df = self.analyze_multiple_cryptos(symbols, [timeframe])
 
@@ -279,41 +777,90 @@ class CryptoAnalyzer:
 
         return overview
 
+    def _store_overview(self, overview, symbols, timeframe, limit=200):
+        """
+        نظرة عامة من استعلامات تجميع على المخزن الدائم
+
+        تُمسح العملات التي أُغلقت لها شمعة أحدث مما في حالة المسح (scan_state)،
+        والإحصائيات تقتصر على نافذة آخر limit شمعة مثل المسح المباشر فلا تدخل
+        فيها الإشارات القديمة المتراكمة في المخزن.
+        """
+        store = self.signal_store
+        close = last_close_ms(timeframe, time.time() * 1000)
+        state = store.scan_state()
+        stale = [symbol for symbol in symbols if state.get((symbol, timeframe), -1) < close]
+        if stale:
+            # المسح يكتب النتائج في المخزن؛ يُسجل فقط ما وصلت بياناته حتى آخر شمعة مغلقة
+            scanned = {}
+            self._scan_buffers(stale, [timeframe], limit, scanned=scanned)
+            last_closed = close - timeframe_ms(timeframe)
+            store.mark_scanned([(symbol, timeframe, close) for (symbol, _), last in scanned.items()
+                                if pd.Timestamp(last).value // 1_000_000 >= last_closed])
+
+        since = close - limit * timeframe_ms(timeframe)
+        summary = store.summary(symbols, [timeframe], since=since)
+
+        overview['total_signals'] = summary['total']
+        overview['buy_signals'] = summary['signals'].get('شراء', 0)
+        overview['sell_signals'] = summary['signals'].get('بيع', 0)
+        overview['most_active_coins'] = summary['symbols'] if summary['total'] else []
+        overview['signal_distribution'] = {
+            self._format_indicator_name(name): count for name, count in summary['types'].items()
+        }
+        return overview
+
+    def _store_table(self, store, symbol=None, signal=None, indicator=None, since=None):
+        """
+        جدول الإشارات المطابقة من المخزن الدائم (الفلترة في استعلام SQL مفهرس)
+
+        Returns:
+            SignalTable: الجدول
+        """
+        types = None
+        if indicator is not None:
+            # فلتر المؤشر نمط على أسماء العرض، يُحول إلى أنواع الإشارات المطابقة
+            pattern = re.compile(indicator)
+            types = [name for name, label in zip(SIGNAL_TYPES, _INDICATOR_LABELS) if pattern.search(label)]
+        if since is not None:
+            # الوقت المعروض مقرب للدقيقة (مثل SignalTable.select)
+            since = pd.Timestamp(since).ceil('min').value // 1_000_000
+        signals = store.query(symbols=[symbol] if symbol is not None else None,
+                              types=types, signal=signal, since=since)
+        return self.build_table(signals, final_strength=True)
+
     def filter_signals(self, signals_df, symbol_filter=None, signal_type_filter=None,
                       indicator_filter=None, hours_back=24):
         """
         فلترة الإشارات
 
         Args:
-            signals_df (pd.DataFrame): جدول الإشارات
+            signals_df: جدول الإشارات (SignalTable أو جدول العرض المنسق أو SignalStore)
             symbol_filter (str): فلتر العملة
             signal_type_filter (str): فلتر نوع الإشارة
             indicator_filter (str): فلتر المؤشر
             hours_back (int): عدد الساعات الماضية
 
         Returns:
-            pd.DataFrame: الإشارات المفلترة
+            pd.DataFrame: الإشارات المفلترة منسقة للعرض
         """
-        if signals_df.empty:
-            return signals_df
-
-        filtered_df = signals_df.copy()
-
-        # فلتر الوقت
-        if hours_back > 0:
-            cutoff_time = datetime.now() - pd.Timedelta(hours=hours_back)
-            filtered_df = filtered_df[pd.to_datetime(filtered_df['وقت الإشارة']) >= cutoff_time]
-
-        # فلتر العملة
-        if symbol_filter and symbol_filter != 'الكل':
-            filtered_df = filtered_df[filtered_df['العملة'] == symbol_filter]
+        filters = {
+            # فلتر الوقت
+            'since': datetime.now() - pd.Timedelta(hours=hours_back) if hours_back > 0 else None,
+            # فلتر العملة
+            'symbol': symbol_filter if symbol_filter and symbol_filter != 'الكل' else None,
+            # فلتر نوع الإشارة
+            'signal': signal_type_filter if signal_type_filter and signal_type_filter != 'الكل' else None,
+            # فلتر المؤشر
+            'indicator': indicator_filter if indicator_filter and indicator_filter != 'الكل' else None,
+        }
 
-        # فلتر نوع الإشارة
-        if signal_type_filter and signal_type_filter != 'الكل':
-            filtered_df = filtered_df[filtered_df['نوع الإشارة'] == signal_type_filter]
+        # المخزن الدائم: الفلترة في استعلام واحد على الفهارس
+        if isinstance(signals_df, SignalStore):
+            return self._store_table(signals_df, **filters).to_display()
 
-        # فلتر المؤشر
-        if indicator_filter and indicator_filter != 'الكل':
-            filtered_df = filtered_df[filtered_df['المؤشر'].str.contains(indicator_filter, na=False)]
+        if signals_df.empty:
+            return signals_df if isinstance(signals_df, pd.DataFrame) else pd.DataFrame()
 
-        return filtered_df
+        # جدول العرض يُحول إلى جدول مفهرس مرة واحدة (تحليل الأوقات مرة واحدة)
+        table = signals_df if isinstance(signals_df, SignalTable) else SignalTable.from_display(signals_df)
+        return table.to_display(table.select(**filters))
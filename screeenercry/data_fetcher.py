@@ -2,17 +2,85 @@ import ccxt
 import pandas as pd
 import yfinance as yf
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+from market_cache import get_market_cache
+from ohlcv_store import get_default_store
+from rate_limiter import (TokenBucket, get_shared_limiter, klines_weight,
+                          request_weight)
+from resampler import (BINANCE_TIMEFRAMES, native_base, plan_base_timeframes,
+                       resample_ohlcv, timeframe_ms)
+
+# حدود Binance للطلبات العامة
+BINANCE_MAX_IN_FLIGHT = 8
+BINANCE_MAX_KLINES_PER_REQUEST = 1000
+
+
 class DataFetcher:
-    def __init__(self):
-        """تهيئة جالب البيانات مع إعداد منصة Binance"""
+    def __init__(self, max_workers=BINANCE_MAX_IN_FLIGHT, rate_limiter=None,
+                 store=None, use_store=True, market_cache=None):
+        """
+        تهيئة جالب البيانات مع إعداد منصة Binance
+
+        Args:
+            max_workers (int): الحد الأقصى للطلبات المتزامنة
+            rate_limiter (TokenBucket): محدد المعدل (الافتراضي: المحدد المشترك لكل البرنامج)
+            store (OHLCVStore): مخزن الشموع المحلي (الافتراضي: المخزن المشترك)
+            use_store (bool): تفعيل التحديث التزايدي من المخزن المحلي
+            market_cache (MarketCache): ذاكرة الأسواق (الافتراضي: الذاكرة المشتركة)
+        """
         self.exchange = ccxt.binance({
             'apiKey': '',  # يمكن تركها فارغة للبيانات العامة
             'secret': '',
             'timeout': 30000,
             'enableRateLimit': True,
+            # نحتاج أسواق Spot فقط، فلا داعي لتحميل أسواق العقود الآجلة
+            'options': {'fetchMarkets': {'types': ['spot']}},
         })
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        # زمن جلب كل عملة في آخر استدعاء لـ get_multiple_symbols_data (بالثواني)
+        self.last_fetch_latency = {}
+        self.store = (store or get_default_store()) if use_store else None
+        self.market_cache = market_cache or get_market_cache()
+
+    def _fetch_ohlcv(self, symbol, timeframe, limit, since=None):
+        """طلب fetch_ohlcv بعد حجز وزنه من محدد المعدل المشترك"""
+        # الأسواق من الذاكرة المشتركة، وإلا حمّلها ccxt بنفسه لكل نسخة خارج محدد المعدل
+        self._load_markets()
+        self.rate_limiter.acquire(klines_weight(limit))
+        if since is None:
+            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        else:
+            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        self._report_used_weight()
+        return ohlcv
+
+    def _report_used_weight(self):
+        """تمرير الوزن المستهلك الذي تعلنه Binance في آخر استجابة إلى محدد المعدل"""
+        headers = getattr(self.exchange, 'last_response_headers', None)
+        if headers:
+            used = headers.get('x-mbx-used-weight-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+            self.rate_limiter.report_used_weight(used)
+
+    def _load_markets(self):
+        """
+        تجهيز الأسواق لـ ccxt من الذاكرة المشتركة بدل تحميلها لكل نسخة
+
+        ينتظر التحميل فقط عند البدء البارد (لا توجد بيانات في الذاكرة ولا على القرص)
+        """
+        if getattr(self.exchange, 'markets', None):
+            return self.exchange.markets
+
+        markets = self.market_cache.get(self._download_markets, block=True)
+        self.exchange.set_markets(markets)
+        return self.exchange.markets
+
+    def _download_markets(self):
+        """تحميل الأسواق من المنصة (طلب exchangeInfo)"""
+        self.rate_limiter.acquire(request_weight('exchangeInfo'))
+        return {market['symbol']: market for market in self.exchange.fetch_markets()}
 
     def get_crypto_data(self, symbol, timeframe='1d', limit=200):
         """
@@ -20,27 +88,171 @@ class DataFetcher:
 
         Args:
             symbol (str): رمز العملة مثل 'BTC/USDT'
-            timeframe (str): الإطار الزمني ('1h', '4h', '1d', '1w')
+            timeframe (str): الإطار الزمني ('1h', '2h', '3h', '4h', '1d', '1w')
             limit (int): عدد الشموع المطلوبة
 
         Returns:
             pd.DataFrame: بيانات OHLCV
         """
-        try:
-            # جلب البيانات من Binance
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        if timeframe not in BINANCE_TIMEFRAMES:
+            # أطر غير مدعومة من المنصة (مثل 3h) تُبنى محلياً من إطار أصغر
+            base = native_base(timeframe)
+            ratio = timeframe_ms(timeframe) // timeframe_ms(base)
+            base_df = self.get_crypto_data(symbol, base, (limit + 1) * ratio)
+            return resample_ohlcv(base_df, base, timeframe).tail(limit)
 
-            # تحويل إلى DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+        try:
+            if self.store is not None:
+                return self._get_incremental_data(symbol, timeframe, limit)
 
-            return df
+            # جلب البيانات من Binance
+            return self._fetch_latest(symbol, timeframe, limit)
 
         except Exception as e:
             print(f"خطأ في جلب البيانات من Binance: {e}")
             return self._get_fallback_data(symbol, timeframe, limit)
 
+    def _get_incremental_data(self, symbol, timeframe, limit):
+        """
+        جلب الشموع الجديدة فقط منذ آخر شمعة مخزنة ثم إرجاع آخر limit شمعة من المخزن
+
+        آخر شمعة مخزنة قد تكون شمعة مفتوحة، لذلك يبدأ الطلب منها حتى تُستبدل بنسختها المغلقة
+        """
+        exchange_id = getattr(self.exchange, 'id', 'binance')
+        tf_ms = timeframe_ms(timeframe)
+        last_ts = self.store.last_timestamp(exchange_id, symbol, timeframe)
+
+        if last_ts is not None:
+            covered = self.store.count_since(exchange_id, symbol, timeframe, last_ts - (limit - 1) * tf_ms)
+            missing = (int(time.time() * 1000) - last_ts) // tf_ms + 1
+
+            if covered >= limit and missing < BINANCE_MAX_KLINES_PER_REQUEST:
+                fetch_limit = max(2, missing + 1)
+                ohlcv = self._fetch_ohlcv(symbol, timeframe, fetch_limit, since=last_ts)
+                self.store.upsert(exchange_id, symbol, timeframe, ohlcv)
+                return self.store.load(exchange_id, symbol, timeframe, limit=limit)
+
+        # لا توجد بيانات كافية في المخزن: جلب كامل
+        return self._fetch_latest(symbol, timeframe, limit)
+
+    def _fetch_latest(self, symbol, timeframe, limit):
+        """جلب آخر limit شمعة، عبر عدة صفحات إذا تجاوز العدد حد الطلب الواحد"""
+        if limit > BINANCE_MAX_KLINES_PER_REQUEST:
+            tf_ms = timeframe_ms(timeframe)
+            current = int(time.time() * 1000) // tf_ms * tf_ms
+            return self.get_history(symbol, timeframe, current - (limit - 1) * tf_ms).tail(limit)
+
+        ohlcv = self._fetch_ohlcv(symbol, timeframe, limit)
+        if self.store is not None:
+            self.store.upsert(getattr(self.exchange, 'id', 'binance'), symbol, timeframe, ohlcv)
+        return self._ohlcv_to_dataframe(ohlcv)
+
+    def get_history(self, symbol, timeframe, since, until=None, max_workers=None):
+        """
+        جلب تاريخ طويل يتجاوز حد الطلب الواحد عبر صفحات since متزامنة
+
+        كل صفحة تُحفظ في المخزن المحلي فور وصولها، ثم تُقرأ الفترة كاملة من المخزن.
+        بدون مخزن تُجمع الصفحات في الذاكرة وتُحذف الشموع المكررة.
+
+        Args:
+            symbol (str): رمز العملة
+            timeframe (str): الإطار الزمني
+            since (int | str | datetime): بداية الفترة (مللي ثانية أو تاريخ)
+            until (int | str | datetime): نهاية الفترة (الافتراضي: الآن)
+            max_workers (int): عدد الصفحات المتزامنة
+
+        Returns:
+            pd.DataFrame: بيانات OHLCV متصلة ومرتبة زمنياً
+        """
+        tf_ms = timeframe_ms(timeframe)
+        since_ms = self._to_ms(since) // tf_ms * tf_ms
+        until_ms = self._to_ms(until) if until is not None else int(time.time() * 1000)
+        page_span = BINANCE_MAX_KLINES_PER_REQUEST * tf_ms
+        page_starts = list(range(since_ms, until_ms + 1, page_span))
+        exchange_id = getattr(self.exchange, 'id', 'binance')
+
+        def fetch_page(start):
+            limit = min(BINANCE_MAX_KLINES_PER_REQUEST, (until_ms - start) // tf_ms + 1)
+            ohlcv = self._fetch_ohlcv(symbol, timeframe, limit, since=start)
+            return [candle for candle in ohlcv if since_ms <= candle[0] <= until_ms]
+
+        pages = {}
+        failed = 0
+        workers = min(max_workers or self.max_workers, len(page_starts)) or 1
+        if workers > 1:
+            self._preload_markets()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch_page, start): start for start in page_starts}
+            for future in as_completed(futures):
+                try:
+                    ohlcv = future.result()
+                except Exception as e:
+                    print(f"خطأ في جلب صفحة من تاريخ {symbol}: {e}")
+                    failed += 1
+                    continue
+
+                if self.store is not None:
+                    self.store.upsert(exchange_id, symbol, timeframe, ohlcv)
+                else:
+                    pages[futures[future]] = ohlcv
+
+        if failed:
+            raise RuntimeError(f"فشل جلب {failed} من {len(page_starts)} صفحة لـ {symbol}")
+
+        if self.store is not None:
+            return self.store.load(exchange_id, symbol, timeframe, since=since_ms, until=until_ms)
+
+        df = self._ohlcv_to_dataframe([candle for start in sorted(pages) for candle in pages[start]])
+        return df[~df.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def _to_ms(value):
+        """تحويل وقت (مللي ثانية أو نص أو datetime) إلى مللي ثانية UTC"""
+        if isinstance(value, (int, float)):
+            return int(value)
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        return int((ts - pd.Timestamp('1970-01-01')) // pd.Timedelta(milliseconds=1))
+
+    def _preload_markets(self):
+        """تحميل الأسواق مرة واحدة قبل التوزيع حتى لا تحمّلها كل thread بنفسها"""
+        try:
+            self._load_markets()
+        except Exception as e:
+            print(f"خطأ في تحميل الأسواق: {e}")
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        """
+        جلب عدة أطر زمنية لعملة واحدة بأقل عدد من الطلبات
+
+        يتم جلب الإطار الأصغر مرة واحدة وبناء الأطر الأكبر منه محلياً
+
+        Args:
+            symbol (str): رمز العملة
+            timeframes (list): الأطر الزمنية المطلوبة
+            limit (int): عدد الشموع لكل إطار
+
+        Returns:
+            dict: {الإطار الزمني: pd.DataFrame}
+        """
+        frames = {}
+        for base, (base_limit, derived) in plan_base_timeframes(timeframes, limit).items():
+            base_df = self.get_crypto_data(symbol, base, base_limit)
+            for timeframe in derived:
+                frames[timeframe] = resample_ohlcv(base_df, base, timeframe).tail(limit)
+
+        return frames
+
+    @staticmethod
+    def _ohlcv_to_dataframe(ohlcv):
+        """تحويل صفوف ccxt إلى DataFrame مفهرس بالوقت"""
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
+
     def _get_fallback_data(self, symbol, timeframe, limit):
         """
         جلب البيانات من yfinance كبديل
@@ -58,7 +270,9 @@ class DataFetcher:
 
             # تحديد فترة البيانات
             period_map = {
-                '1h': '5d',
+                '1h': '60d',
+                '2h': '60d',
+                '3h': '60d',
                 '4h': '60d',
                 '1d': '1y',
                 '1w': '5y'
@@ -66,12 +280,23 @@ class DataFetcher:
             period = period_map.get(timeframe, '1y')
 
             # جلب البيانات
+            interval = self._convert_timeframe(timeframe)
             ticker = yf.Ticker(yf_symbol)
-            df = ticker.history(period=period, interval=self._convert_timeframe(timeframe))
+            df = ticker.history(period=period, interval=interval)
 
             # إعادة تسمية الأعمدة
             df.columns = [col.lower() for col in df.columns]
-            df = df[['open', 'high', 'low', 'close', 'volume']].tail(limit)
+            df = df[['open', 'high', 'low', 'close', 'volume']]
+
+            # yfinance يعيد فهرساً بمنطقة زمنية؛ بيانات Binance بتوقيت UTC بدون منطقة
+            if df.index.tz is not None:
+                df.index = df.index.tz_convert('UTC').tz_localize(None)
+
+            # بناء شموع 2h/3h/4h محلياً من شموع الساعة
+            if interval == '1h' and timeframe != '1h':
+                df = resample_ohlcv(df, '1h', timeframe)
+
+            df = df.tail(limit)
 
             return df
 
@@ -83,18 +308,30 @@ class DataFetcher:
         """تحويل الإطار الزمني لصيغة yfinance"""
         timeframe_map = {
             '1h': '1h',
-            '4h': '1h',  # yfinance لا يدعم 4h مباشرة
+            # yfinance لا يدعم 2h/3h/4h مباشرة، تُجلب شموع الساعة ثم تُجمع محلياً
+            '2h': '1h',
+            '3h': '1h',
+            '4h': '1h',
             '1d': '1d',
             '1w': '1wk'
         }
         return timeframe_map.get(timeframe, '1d')
 
-    def get_available_symbols(self):
-        """الحصول على قائمة العملات القيادية (40 عملة)"""
+    def get_available_symbols(self, block=False):
+        """
+        الحصول على قائمة العملات القيادية (40 عملة)
+
+        Args:
+            block (bool): انتظار تحميل الأسواق عند البدء البارد بدلاً من إعادة القائمة الافتراضية
+        """
         try:
-            markets = self.exchange.load_markets()
+            # افتراضياً لا ننتظر التحميل: عند البدء البارد تُعاد القائمة الافتراضية ويكتمل التحميل في الخلفية
+            markets = self.market_cache.get(self._download_markets, block=block)
+            if not markets:
+                raise RuntimeError("قائمة الأسواق قيد التحميل في الخلفية")
+
             # فلترة العملات المقترنة بـ USDT
-            usdt_pairs = [symbol for symbol in markets.keys() if symbol.endswith('/USDT')]
+            usdt_pairs = {symbol for symbol in markets if symbol.endswith('/USDT')}
 
             # أفضل 40 عملة قيادية مرتبة حسب الأهمية
             top_40_coins = [
@@ -142,27 +379,59 @@ class DataFetcher:
                 'BCH/USDT', 'ALGO/USDT', 'VET/USDT', 'ICP/USDT', 'FIL/USDT'
             ]
 
-    def get_multiple_symbols_data(self, symbols, timeframe='1d', limit=200):
+    def get_multiple_symbols_data(self, symbols, timeframe='1d', limit=200, max_workers=None):
         """
-        جلب بيانات عدة عملات
+        جلب بيانات عدة عملات بشكل متزامن
 
         Args:
             symbols (list): قائمة رموز العملات
             timeframe (str): الإطار الزمني
             limit (int): عدد الشموع
+            max_workers (int): عدد الطلبات المتزامنة (1 = جلب تسلسلي)
 
         Returns:
             dict: قاموس يحتوي على بيانات كل عملة
+
+        ملاحظة: زمن جلب كل عملة يُحفظ في self.last_fetch_latency
         """
+        workers = min(max_workers or self.max_workers, len(symbols)) if symbols else 1
+        self.last_fetch_latency = {}
+        results = {}
+
+        if workers > 1:
+            self._preload_markets()
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._fetch_timed, symbol, timeframe, limit): symbol
+                    for symbol in symbols
+                }
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        print(f"خطأ في جلب بيانات {symbol}: {e}")
+        else:
+            for symbol in symbols:
+                try:
+                    results[symbol] = self._fetch_timed(symbol, timeframe, limit)
+                except Exception as e:
+                    print(f"خطأ في جلب بيانات {symbol}: {e}")
+
+        # الحفاظ على ترتيب العملات كما طُلبت
         data = {}
         for symbol in symbols:
-            try:
-                df = self.get_crypto_data(symbol, timeframe, limit)
-                if not df.empty:
-                    data[symbol] = df
-                time.sleep(0.1)  # تجنب تجاوز حدود API
-            except Exception as e:
-                print(f"خطأ في جلب بيانات {symbol}: {e}")
-                continue
+            df = results.get(symbol)
+            if df is not None and not df.empty:
+                data[symbol] = df
 
         return data
+
+    def _fetch_timed(self, symbol, timeframe, limit):
+        """جلب بيانات عملة واحدة مع تسجيل زمن الجلب"""
+        start = time.perf_counter()
+        try:
+            return self.get_crypto_data(symbol, timeframe, limit)
+        finally:
+            self.last_fetch_latency[symbol] = time.perf_counter() - start
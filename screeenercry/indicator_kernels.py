@@ -0,0 +1,119 @@
+"""
+نوى حساب المؤشرات الفنية مباشرة على مصفوفات NumPy
+
+تعطي نفس نتائج مكتبة ta (نفس القيم المفقودة في البداية ونفس الحالات الخاصة)
+دون إنشاء كائنات pandas وسيطة. تفترض أن الأسعار لا تحتوي قيماً مفقودة
+في المنتصف (القيم المفقودة في البداية مدعومة). كل النوى تقبل أيضاً مصفوفات
+ثنائية الأبعاد (عملات × وقت) وتحسب على المحور الأخير.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# أقصى أس لمعامل التضاؤل داخل الكتلة الواحدة (e^50) للحفاظ على الدقة
+_EMA_BLOCK_EXPONENT = 50.0
+
+
+def ema(values, alpha):
+    """
+    متوسط أسي بدون تعديل (مثل pandas ewm(adjust=False)) بدون حلقة على الشموع
+
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] مع y[0] = x[0]
+
+    يُحسب كل جزء من السلسلة بمجموع تراكمي مُعاد تحجيمه، وطول الجزء محدود
+    حتى لا يتجاوز معامل التحجيم e^50. المصفوفات ثنائية الأبعاد تُحسب
+    على المحور الأخير (كل صف سلسلة مستقلة ببداية خاصة به).
+    """
+    values = np.array(values, dtype=float)
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    starts = _first_valid(values)
+    if n == 0 or starts.min() >= n:
+        return out
+
+    # ما قبل أول قيمة في كل صف يُملأ بها (المتوسط الأسي لقيمة ثابتة هو نفسها) ثم يُخفى
+    leading = np.arange(n) < starts[..., None]
+    first_values = np.take_along_axis(values, np.minimum(starts, n - 1)[..., None], axis=-1)
+    values = np.where(leading, first_values, values)
+
+    first = int(starts.min())
+    beta = 1.0 - alpha
+    block = max(1, int(_EMA_BLOCK_EXPONENT / -np.log(beta))) if 0 < beta < 1 else n
+
+    out[..., first] = values[..., first]
+    previous = out[..., first]
+    start = first + 1
+    while start < n:
+        end = min(n, start + block)
+        segment = values[..., start:end]
+        decay = beta ** np.arange(1, end - start + 1)
+        out[..., start:end] = decay * (previous[..., None] + alpha * np.cumsum(segment / decay, axis=-1))
+        previous = out[..., end - 1]
+        start = end
+
+    out[leading] = np.nan
+    return out
+
+
+def _first_valid(values):
+    """موقع أول قيمة متوفرة على المحور الأخير (طول السلسلة إذا لم توجد)"""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=-1), valid.argmax(axis=-1), values.shape[-1])
+
+
+def _mask_warmup(values, source, periods):
+    """إخفاء أول periods-1 قيمة بعد أول قيمة متوفرة في المصدر (min_periods)"""
+    cutoff = _first_valid(source) + periods - 1
+    values[np.arange(values.shape[-1]) < cutoff[..., None]] = np.nan
+    return values
+
+
+def rsi(close, window=14):
+    """RSI بطريقة Wilder (مطابق لـ ta.momentum.RSIIndicator)"""
+    close = np.ascontiguousarray(close, dtype=float)
+    diff = np.empty_like(close)
+    diff[..., 0] = np.nan
+    np.subtract(close[..., 1:], close[..., :-1], out=diff[..., 1:])
+
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    ema_up = _mask_warmup(ema(up, 1.0 / window), up, window)
+    ema_down = _mask_warmup(ema(down, 1.0 / window), down, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100.0 - 100.0 / (1.0 + ema_up / ema_down)
+    return np.where(ema_down == 0, 100.0, result)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD بالمتوسطات الأسية (مطابق لـ ta.trend.MACD)
+
+    Returns:
+        tuple: (macd, macd_signal, macd_histogram)
+    """
+    close = np.ascontiguousarray(close, dtype=float)
+    ema_fast = _mask_warmup(ema(close, 2.0 / (fast + 1)), close, fast)
+    ema_slow = _mask_warmup(ema(close, 2.0 / (slow + 1)), close, slow)
+    macd_line = ema_fast - ema_slow
+    macd_signal = _mask_warmup(ema(macd_line, 2.0 / (signal + 1)), macd_line, signal)
+    return macd_line, macd_signal, macd_line - macd_signal
+
+
+def obv(close, volume):
+    """OBV (مطابق لـ ta.volume.OnBalanceVolumeIndicator)"""
+    close = np.ascontiguousarray(close, dtype=float)
+    volume = np.ascontiguousarray(volume, dtype=float)
+    falling = np.zeros(close.shape, dtype=bool)
+    falling[..., 1:] = close[..., 1:] < close[..., :-1]
+    return np.cumsum(np.where(falling, -volume, volume), axis=-1)
+
+
+def sma(close, window):
+    """متوسط متحرك بسيط (مطابق لـ ta.trend.SMAIndicator)"""
+    close = np.ascontiguousarray(close, dtype=float)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(close, window, axis=-1).mean(axis=-1)
+    return out
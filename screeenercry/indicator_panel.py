@@ -0,0 +1,149 @@
+import numpy as np
+
+import indicator_kernels
+from indicators import TechnicalIndicators, ma_crossover_masks, pivot_mask, rsi_zone_masks
+
+PANEL_INDICATORS = ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'obv', 'ma_short', 'ma_long')
+
+
+class IndicatorPanel:
+    def __init__(self, frames, rsi_period=14, macd_fast=12, macd_slow=26, macd_signal=9,
+                 ma_short=9, ma_long=20):
+        """
+        حساب المؤشرات لعدة عملات دفعة واحدة على مصفوفات (عملات × وقت)
+
+        تُحاذى بيانات كل العملات على آخر شمعة: الصف i يحتوي شموع العملة i
+        في آخر الأعمدة، والعملات ذات التاريخ الأقصر تُكمل بقيم مفقودة في البداية.
+        النتائج لكل عملة مطابقة لحساب TechnicalIndicators عليها منفردة.
+
+        Args:
+            frames (dict): {رمز العملة: DataFrame} لنفس الإطار الزمني
+            rsi_period (int): فترة RSI
+            macd_fast (int): فترة المتوسط السريع لـ MACD
+            macd_slow (int): فترة المتوسط البطيء لـ MACD
+            macd_signal (int): فترة خط الإشارة لـ MACD
+            ma_short (int): فترة المتوسط المتحرك القصير
+            ma_long (int): فترة المتوسط المتحرك الطويل
+        """
+        self.frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+        self.symbols = list(self.frames)
+        self.params = {
+            'rsi_period': rsi_period,
+            'macd_fast': macd_fast,
+            'macd_slow': macd_slow,
+            'macd_signal': macd_signal,
+            'ma_short': ma_short,
+            'ma_long': ma_long,
+        }
+
+        self.length = max((len(df) for df in self.frames.values()), default=0)
+        # أول عمود فيه بيانات لكل عملة
+        self.starts = np.array([self.length - len(df) for df in self.frames.values()], dtype=int)
+
+        self.close = self._stack('close')
+        self.high = self._stack('high')
+        self.low = self._stack('low')
+        self.volume = self._stack('volume')
+        self.values = {}
+        self._pivot_cache = {}
+
+    def _stack(self, column):
+        """مصفوفة (عملات × وقت) لعمود واحد"""
+        matrix = np.full((len(self.symbols), self.length), np.nan)
+        for row, df in enumerate(self.frames.values()):
+            matrix[row, self.starts[row]:] = df[column].to_numpy(dtype=float)
+        return matrix
+
+    def _mask_warmup(self, values, periods):
+        """إخفاء أول periods-1 شمعة من بيانات كل عملة"""
+        values[np.arange(self.length) < (self.starts + periods - 1)[:, None]] = np.nan
+        return values
+
+    def compute(self):
+        """
+        حساب RSI و MACD و OBV والمتوسطات لكل العملات في تمريرة واحدة
+
+        Returns:
+            dict: {اسم المؤشر: مصفوفة (عملات × وقت)}
+        """
+        p = self.params
+        if self.values:
+            return self.values
+
+        # نوى RSI و OBV تبدأ العد من أول عمود، لذلك تُعاد فترة الإحماء لكل صف
+        rsi = self._mask_warmup(indicator_kernels.rsi(self.close, p['rsi_period']), p['rsi_period'])
+        macd, macd_signal, macd_histogram = indicator_kernels.macd(
+            self.close, p['macd_fast'], p['macd_slow'], p['macd_signal'])
+        obv = indicator_kernels.obv(self.close, np.nan_to_num(self.volume))
+        obv = self._mask_warmup(obv, 1)
+
+        self.values = {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_histogram,
+            'obv': obv,
+            'ma_short': indicator_kernels.sma(self.close, p['ma_short']),
+            'ma_long': indicator_kernels.sma(self.close, p['ma_long']),
+        }
+        return self.values
+
+    def ma_crossovers(self):
+        """أقنعة تقاطع المتوسطات لكل العملات (عملات × (وقت - 1))"""
+        values = self.compute()
+        return ma_crossover_masks(values['ma_short'], values['ma_long'])
+
+    def rsi_zones(self):
+        """أقنعة مناطق التشبع وقوة الإشارة لكل العملات"""
+        return rsi_zone_masks(self.compute()['rsi'])
+
+    def pivots(self, order=2):
+        """أقنعة القمم (high) والقيعان (low) لكل العملات"""
+        if order not in self._pivot_cache:
+            self._pivot_cache[order] = (
+                pivot_mask(self.high, order, np.greater),
+                pivot_mask(self.low, order, np.less),
+            )
+        return self._pivot_cache[order]
+
+    def indicators_for(self, symbol, pivot_order=2):
+        """
+        كائن TechnicalIndicators للعملة مع المؤشرات والأقنعة المحسوبة في اللوحة
+
+        Args:
+            symbol (str): رمز العملة
+            pivot_order (int): عدد الشموع على كل جانب للقمم والقيعان
+
+        Returns:
+            TechnicalIndicators: جاهز لاستدعاء get_all_signals دون إعادة الحساب
+        """
+        row = self.symbols.index(symbol)
+        start = self.starts[row]
+        indicators = TechnicalIndicators(self.frames[symbol])
+
+        for name, matrix in self.compute().items():
+            indicators.df[name] = matrix[row, start:]
+
+        bullish, bearish = self.ma_crossovers()
+        oversold, overbought, strength = self.rsi_zones()
+        highs, lows = self.pivots(pivot_order)
+        indicators._mask_cache = {
+            'ma_crossover': (bullish[row, start:], bearish[row, start:]),
+            'rsi_zones': (oversold[row, start:], overbought[row, start:], strength[row, start:]),
+        }
+        indicators._pivot_cache[pivot_order] = (
+            np.flatnonzero(highs[row, start:]),
+            np.flatnonzero(lows[row, start:]),
+        )
+        indicators._indicators_ready = True
+        return indicators
+
+    def get_all_signals(self):
+        """
+        إشارات كل العملات
+
+        Returns:
+            dict: {رمز العملة: قائمة الإشارات}
+        """
+        self.compute()
+        return {symbol: self.indicators_for(symbol).get_all_signals() for symbol in self.symbols}
@@ -1,58 +1,236 @@
 import pandas as pd
 import numpy as np
 import ta
+
+import indicator_kernels
+from signal_buffer import BUY, SELL, TYPE_CODES, SignalBuffer
+
+# محرك حساب المؤشرات: 'numpy' (indicator_kernels) أو 'ta' (مكتبة ta)
+INDICATOR_BACKENDS = ('numpy', 'ta')
+DEFAULT_BACKEND = 'numpy'
+
+# عدد الشموع الأخيرة التي يفحصها دايفرجنس الشمعة الأخيرة
+LATEST_WINDOW = 30
+# أثر بداية المتوسطات الأسية المسموح به في الوضع المباشر (نسبة من الفرق الابتدائي)
+LIVE_TOLERANCE = 1e-4
+
+
+def ema_warmup(alpha, tolerance=LIVE_TOLERANCE):
+    """عدد الشموع حتى يتضاءل أثر القيمة الابتدائية لمتوسط أسي إلى tolerance"""
+    return int(np.ceil(np.log(tolerance) / np.log(1.0 - alpha)))
+
+
+def live_window(rsi_period=14, macd_slow=26, macd_signal=9, ma_long=20, tolerance=LIVE_TOLERANCE):
+    """
+    أقل عدد من الشموع يحتاجه الوضع المباشر
+
+    فترة إحماء كل مؤشر حتى تتقارب قيمه مع الحساب على كامل التاريخ، مضافاً
+    إليها نافذة دايفرجنس الشمعة الأخيرة (القمم والقيعان تُقارن داخلها فقط).
+    بالإعدادات الافتراضية: 126 + 30 = 156 شمعة بدلاً من 200.
+
+    Returns:
+        int: عدد الشموع
+    """
+    slow_alpha = 2.0 / (macd_slow + 1)
+    signal_alpha = 2.0 / (macd_signal + 1)
+    if signal_alpha > slow_alpha:
+        # خط الإشارة يمرر خطأ المتوسط البطيء مضروباً في signal / (signal - slow)
+        # ولا يحتاج إحماءً منفصلاً فوقه
+        gain = signal_alpha / (signal_alpha - slow_alpha)
+        macd_warmup = max(ema_warmup(slow_alpha, tolerance / gain), ema_warmup(signal_alpha, tolerance))
+    else:
+        macd_warmup = ema_warmup(slow_alpha, tolerance) + ema_warmup(signal_alpha, tolerance)
+
+    warmup = max(
+        ema_warmup(1.0 / rsi_period, tolerance) + 1,  # +1 لأن RSI يبدأ من فرق الأسعار
+        macd_warmup,
+        ma_long,
+    )
+    return warmup + LATEST_WINDOW
+
+
+def pivot_mask(values, order=1, comparator=np.greater):
+    """
+    قناع القمم (np.greater) أو القيعان (np.less) بمقارنة المصفوفة مع نسخها المزاحة
+
+    النقطة i قمة إذا كانت أكبر من كل الجيران حتى المسافة order في الاتجاهين.
+    المصفوفات ثنائية الأبعاد (عملات × وقت) تُفحص على المحور الأخير.
+
+    Args:
+        values: مصفوفة القيم
+        order (int): عدد الشموع على كل جانب
+        comparator: np.greater للقمم أو np.less للقيعان
+
+    Returns:
+        np.ndarray: قناع منطقي بنفس شكل القيم
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+    mask = np.zeros(values.shape, dtype=bool)
+    if n <= 2 * order:
+        return mask
+
+    center = values[..., order:n - order]
+    inner = np.ones(center.shape, dtype=bool)
+    for k in range(1, order + 1):
+        inner &= comparator(center, values[..., order - k:n - order - k])
+        inner &= comparator(center, values[..., order + k:n - order + k])
+
+    mask[..., order:n - order] = inner
+    return mask
+
+
+def pivot_positions(values, order=1, comparator=np.greater):
+    """
+    مواقع القمم أو القيعان في سلسلة واحدة
+
+    Returns:
+        np.ndarray: مواقع النقاط
+    """
+    return np.flatnonzero(pivot_mask(values, order, comparator))
+
+
 try:
     from scipy.signal import argrelextrema
 except ImportError:
     # بديل بسيط إذا لم تكن scipy متاحة
     def argrelextrema(data, comparator, order=1):
-        peaks = []
-        for i in range(order, len(data) - order):
-            if comparator == np.greater:
-                if all(data[i] > data[i-j] for j in range(1, order+1)) and \
-                   all(data[i] > data[i+j] for j in range(1, order+1)):
-                    peaks.append(i)
-            elif comparator == np.less:
-                if all(data[i] < data[i-j] for j in range(1, order+1)) and \
-                   all(data[i] < data[i+j] for j in range(1, order+1)):
-                    peaks.append(i)
-        return (np.array(peaks),)
+        return (pivot_positions(data, order, comparator),)
+
+def ma_crossover_masks(ma_short, ma_long):
+    """
+    أقنعة تقاطع المتوسطات بمقارنة كل شمعة بالشمعة السابقة (على المحور الأخير)
+
+    Returns:
+        tuple: (صعودي، هبوطي) والعنصر i يخص الانتقال من الشمعة i إلى i+1
+    """
+    prev_short, prev_long = ma_short[..., :-1], ma_long[..., :-1]
+    curr_short, curr_long = ma_short[..., 1:], ma_long[..., 1:]
+
+    bullish = (prev_short <= prev_long) & (curr_short > curr_long)
+    bearish = ~bullish & (prev_short >= prev_long) & (curr_short < curr_long)
+    return bullish, bearish
+
+
+def rsi_zone_masks(rsi):
+    """
+    أقنعة مناطق التشبع وقوة الإشارة بناءً على مدى ابتعاد RSI عن الحد
+
+    Returns:
+        tuple: (تشبع بيعي، تشبع شرائي، القوة)
+    """
+    oversold = rsi <= 30
+    overbought = rsi >= 70
+    strength = np.where(oversold, (30 - rsi) * 2 + 40, (rsi - 70) * 2 + 40)
+    strength = np.maximum(10, np.minimum(70, strength))
+    return oversold, overbought, strength
+
 
 class TechnicalIndicators:
-    def __init__(self, df):
+    def __init__(self, df, backend=DEFAULT_BACKEND):
         """
         تهيئة حاسبة المؤشرات الفنية
 
         Args:
             df (pd.DataFrame): بيانات OHLCV
+            backend (str): محرك الحساب 'numpy' أو 'ta'
         """
+        if backend not in INDICATOR_BACKENDS:
+            raise ValueError(f"محرك غير مدعوم: {backend}")
+
+        self.backend = backend
         self.df = df.copy()
         self.signals = []
+        # فهرس القمم والقيعان يُحسب مرة واحدة ويُشارك بين كل كواشف الدايفرجنس
+        self._pivot_cache = {}
+        # نتائج الدايفرجنس البسيط المحسوبة دفعة واحدة في get_all_signals
+        self._simple_divergence_cache = {}
+        # أقنعة التقاطعات ومناطق RSI المحسوبة مسبقاً (مثلاً من IndicatorPanel)
+        self._mask_cache = {}
+        # المؤشرات محسوبة مسبقاً في self.df فلا يعيد get_all_signals حسابها
+        self._indicators_ready = False
+
+    def get_pivots(self, order=2):
+        """
+        فهرس القمم (high) والقيعان (low) على كامل البيانات
+
+        Args:
+            order (int): عدد الشموع على كل جانب
+
+        Returns:
+            tuple: (مواقع القمم، مواقع القيعان) كمصفوفات NumPy
+        """
+        if order not in self._pivot_cache:
+            self._pivot_cache[order] = (
+                pivot_positions(self.df['high'].values, order, np.greater),
+                pivot_positions(self.df['low'].values, order, np.less),
+            )
+        return self._pivot_cache[order]
+
+    def _recent_pivots(self, data, order=2):
+        """
+        قمم وقيعان نافذة من البيانات بصيغة [(الموقع داخل النافذة، السعر)]
+
+        إذا كانت النافذة هي آخر جزء من self.df يُستخدم الفهرس المشترك،
+        وإلا تُحسب القمم والقيعان للنافذة مباشرة
+        """
+        highs_values = data['high'].values
+        lows_values = data['low'].values
+
+        if 0 < len(data) <= len(self.df) and data.index[-1] == self.df.index[-1]:
+            offset = len(self.df) - len(data)
+            all_highs, all_lows = self.get_pivots(order)
+            lo, hi = offset + order, offset + len(data) - order - 1
+            highs = all_highs[(all_highs >= lo) & (all_highs <= hi)] - offset
+            lows = all_lows[(all_lows >= lo) & (all_lows <= hi)] - offset
+        else:
+            highs = pivot_positions(highs_values, order, np.greater)
+            lows = pivot_positions(lows_values, order, np.less)
+
+        price_highs = [(int(i), highs_values[i]) for i in highs]
+        price_lows = [(int(i), lows_values[i]) for i in lows]
+        return price_highs, price_lows
 
     def calculate_rsi(self, period=14):
         """حساب مؤشر RSI"""
-        rsi_indicator = ta.momentum.RSIIndicator(self.df['close'], window=period)
-        self.df['rsi'] = rsi_indicator.rsi()
+        if self.backend == 'numpy':
+            self.df['rsi'] = indicator_kernels.rsi(self.df['close'].values, period)
+        else:
+            rsi_indicator = ta.momentum.RSIIndicator(self.df['close'], window=period)
+            self.df['rsi'] = rsi_indicator.rsi()
         return self.df['rsi']
 
     def calculate_macd(self, fast=12, slow=26, signal=9):
         """حساب مؤشر MACD"""
-        macd_indicator = ta.trend.MACD(self.df['close'], window_fast=fast, window_slow=slow, window_sign=signal)
-        self.df['macd'] = macd_indicator.macd()
-        self.df['macd_signal'] = macd_indicator.macd_signal()
-        self.df['macd_histogram'] = macd_indicator.macd_diff()
+        if self.backend == 'numpy':
+            macd, macd_signal, macd_histogram = indicator_kernels.macd(self.df['close'].values, fast, slow, signal)
+            self.df['macd'] = macd
+            self.df['macd_signal'] = macd_signal
+            self.df['macd_histogram'] = macd_histogram
+        else:
+            macd_indicator = ta.trend.MACD(self.df['close'], window_fast=fast, window_slow=slow, window_sign=signal)
+            self.df['macd'] = macd_indicator.macd()
+            self.df['macd_signal'] = macd_indicator.macd_signal()
+            self.df['macd_histogram'] = macd_indicator.macd_diff()
         return self.df[['macd', 'macd_signal', 'macd_histogram']]
 
     def calculate_obv(self):
         """حساب مؤشر OBV"""
-        obv_indicator = ta.volume.OnBalanceVolumeIndicator(self.df['close'], self.df['volume'])
-        self.df['obv'] = obv_indicator.on_balance_volume()
+        if self.backend == 'numpy':
+            self.df['obv'] = indicator_kernels.obv(self.df['close'].values, self.df['volume'].values)
+        else:
+            obv_indicator = ta.volume.OnBalanceVolumeIndicator(self.df['close'], self.df['volume'])
+            self.df['obv'] = obv_indicator.on_balance_volume()
         return self.df['obv']
 
     def calculate_moving_averages(self, short_period=9, long_period=20):
         """حساب المتوسطات المتحركة"""
-        self.df['ma_short'] = ta.trend.SMAIndicator(self.df['close'], window=short_period).sma_indicator()
-        self.df['ma_long'] = ta.trend.SMAIndicator(self.df['close'], window=long_period).sma_indicator()
+        if self.backend == 'numpy':
+            self.df['ma_short'] = indicator_kernels.sma(self.df['close'].values, short_period)
+            self.df['ma_long'] = indicator_kernels.sma(self.df['close'].values, long_period)
+        else:
+            self.df['ma_short'] = ta.trend.SMAIndicator(self.df['close'], window=short_period).sma_indicator()
+            self.df['ma_long'] = ta.trend.SMAIndicator(self.df['close'], window=long_period).sma_indicator()
         return self.df[['ma_short', 'ma_long']]
 
     def detect_divergence(self, price_series, indicator_series, lookback=3):
@@ -177,46 +355,74 @@ class TechnicalIndicators:
     def detect_simple_divergence(self, price_series, indicator_series, window=20):
         """
         طريقة بديلة أبسط لاكتشاف الدايفرجنس
+
+        لكل شمعة i تُقارن النافذة [i-window, i) بالنافذة [i, i+window)؛ الاتجاهات
+        تُحسب لكل النوافذ دفعة واحدة بمصفوفات مزاحة بدل حلقة على الشموع
         """
-        divergences = []
+        return self.detect_simple_divergence_batch(
+            price_series, {'indicator': indicator_series}, window
+        )['indicator']
 
-        if len(price_series) < window * 2:
-            return divergences
+    def detect_simple_divergence_batch(self, price_series, indicators, window=20):
+        """
+        اكتشاف الدايفرجنس البسيط لعدة مؤشرات مقابل السعر في استدعاء واحد
 
-        # تحليل النوافذ المتحركة
-        for i in range(window, len(price_series) - window):
-            # النافذة الأولى (الماضي)
-            price_window1 = price_series.iloc[i-window:i]
-            ind_window1 = indicator_series.iloc[i-window:i]
-
-            # النافذة الثانية (الحاضر)
-            price_window2 = price_series.iloc[i:i+window]
-            ind_window2 = indicator_series.iloc[i:i+window]
-
-            # حساب الاتجاهات
-            price_trend1 = price_window1.iloc[-1] - price_window1.iloc[0]
-            price_trend2 = price_window2.iloc[-1] - price_window2.iloc[0]
-
-            ind_trend1 = ind_window1.iloc[-1] - ind_window1.iloc[0]
-            ind_trend2 = ind_window2.iloc[-1] - ind_window2.iloc[0]
-
-            # البحث عن الدايفرجنس
-            if price_trend2 < 0 and ind_trend2 > 0 and abs(price_trend2) > abs(price_trend1) * 0.5:
-                # دايفرجنس صعودي
-                divergences.append({
-                    'type': 'bullish_divergence',
-                    'timestamp': price_series.index[i + window - 1],
-                    'strength': abs(price_trend2) + abs(ind_trend2)
-                })
-            elif price_trend2 > 0 and ind_trend2 < 0 and abs(price_trend2) > abs(price_trend1) * 0.5:
-                # دايفرجنس هبوطي
-                divergences.append({
-                    'type': 'bearish_divergence',
-                    'timestamp': price_series.index[i + window - 1],
-                    'strength': abs(price_trend2) + abs(ind_trend2)
-                })
+        Args:
+            price_series (pd.Series): سلسلة الأسعار
+            indicators (dict): {الاسم: سلسلة المؤشر} بنفس طول سلسلة الأسعار
+            window (int): طول النافذة
 
-        return divergences
+        Returns:
+            dict: {الاسم: قائمة الدايفرجنس} بنفس صيغة detect_simple_divergence
+        """
+        index = price_series.index
+        results = {}
+        for name, (ends, bullish, strength) in self._simple_divergence_arrays(
+                price_series, indicators, window).items():
+            results[name] = [
+                {
+                    'type': 'bullish_divergence' if is_bullish else 'bearish_divergence',
+                    'timestamp': index[end],
+                    'strength': value
+                }
+                for end, is_bullish, value in zip(ends, bullish, strength)
+            ]
+        return results
+
+    def _simple_divergence_arrays(self, price_series, indicators, window=20):
+        """
+        الدايفرجنس البسيط كمصفوفات لكل مؤشر
+
+        Returns:
+            dict: {الاسم: (مواقع الإشارات، صعودي؟، القوة)}
+        """
+        n = len(price_series)
+        if n <= window * 2:
+            empty = (np.empty(0, dtype=int), np.empty(0, dtype=bool), np.empty(0))
+            return {name: empty for name in indicators}
+
+        prices = np.asarray(price_series, dtype=float)
+        positions = np.arange(window, n - window)
+        ends = positions + window - 1
+
+        # اتجاه السعر في النافذة الأولى (الماضي) والثانية (الحاضر)
+        price_trend1 = prices[positions - 1] - prices[positions - window]
+        price_trend2 = prices[ends] - prices[positions]
+        price_ok = np.abs(price_trend2) > np.abs(price_trend1) * 0.5
+
+        names = list(indicators)
+        matrix = np.vstack([np.asarray(indicators[name], dtype=float) for name in names])
+        ind_trend2 = matrix[:, ends] - matrix[:, positions]
+
+        bullish = (price_trend2 < 0) & (ind_trend2 > 0) & price_ok
+        bearish = (price_trend2 > 0) & (ind_trend2 < 0) & price_ok
+        strength = np.abs(price_trend2) + np.abs(ind_trend2)
+
+        results = {}
+        for row, name in enumerate(names):
+            found = np.flatnonzero(bullish[row] | bearish[row])
+            results[name] = (ends[found], bullish[row, found], strength[row, found])
+        return results
 
     def detect_latest_divergence(self, price_series, indicator_series, lookback_periods=10):
         """
@@ -312,7 +518,7 @@ class TechnicalIndicators:
         """
         signals = []
 
-        if len(self.df) < 30:
+        if len(self.df) < LATEST_WINDOW:
             return signals
 
         # التأكد من حساب المؤشرات
@@ -328,7 +534,7 @@ class TechnicalIndicators:
             return signals
 
         # تحليل آخر 30 شمعة فقط
-        recent_data = self.df.tail(30).copy()
+        recent_data = self.df.tail(LATEST_WINDOW).copy()
         current_timestamp = recent_data.index[-1]
 
         # البحث عن الدايفرجنس لكل مؤشر
@@ -342,23 +548,8 @@ class TechnicalIndicators:
         """اكتشاف دايفرجنس RSI بطريقة بسيطة وصحيحة"""
         signals = []
 
-        # البحث عن آخر قمتين في السعر
-        price_highs = []
-        for i in range(2, len(data) - 2):
-            if (data['high'].iloc[i] > data['high'].iloc[i-1] and
-                data['high'].iloc[i] > data['high'].iloc[i-2] and
-                data['high'].iloc[i] > data['high'].iloc[i+1] and
-                data['high'].iloc[i] > data['high'].iloc[i+2]):
-                price_highs.append((i, data['high'].iloc[i]))
-
-        # البحث عن آخر قاعين في السعر
-        price_lows = []
-        for i in range(2, len(data) - 2):
-            if (data['low'].iloc[i] < data['low'].iloc[i-1] and
-                data['low'].iloc[i] < data['low'].iloc[i-2] and
-                data['low'].iloc[i] < data['low'].iloc[i+1] and
-                data['low'].iloc[i] < data['low'].iloc[i+2]):
-                price_lows.append((i, data['low'].iloc[i]))
+        # آخر القمم والقيعان في السعر (من الفهرس المشترك)
+        price_highs, price_lows = self._recent_pivots(data)
 
         # التحقق من الدايفرجنس الهبوطي (آخر قمتين)
         if len(price_highs) >= 2:
@@ -434,23 +625,8 @@ class TechnicalIndicators:
         """اكتشاف دايفرجنس MACD بطريقة بسيطة وصحيحة"""
         signals = []
 
-        # البحث عن آخر قمتين في السعر
-        price_highs = []
-        for i in range(2, len(data) - 2):
-            if (data['high'].iloc[i] > data['high'].iloc[i-1] and
-                data['high'].iloc[i] > data['high'].iloc[i-2] and
-                data['high'].iloc[i] > data['high'].iloc[i+1] and
-                data['high'].iloc[i] > data['high'].iloc[i+2]):
-                price_highs.append((i, data['high'].iloc[i]))
-
-        # البحث عن آخر قاعين في السعر
-        price_lows = []
-        for i in range(2, len(data) - 2):
-            if (data['low'].iloc[i] < data['low'].iloc[i-1] and
-                data['low'].iloc[i] < data['low'].iloc[i-2] and
-                data['low'].iloc[i] < data['low'].iloc[i+1] and
-                data['low'].iloc[i] < data['low'].iloc[i+2]):
-                price_lows.append((i, data['low'].iloc[i]))
+        # آخر القمم والقيعان في السعر (من الفهرس المشترك)
+        price_highs, price_lows = self._recent_pivots(data)
 
         # التحقق من الدايفرجنس الهبوطي
         if len(price_highs) >= 2:
@@ -520,23 +696,8 @@ class TechnicalIndicators:
         """اكتشاف دايفرجنس OBV بطريقة بسيطة وصحيحة"""
         signals = []
 
-        # البحث عن آخر قمتين في السعر
-        price_highs = []
-        for i in range(2, len(data) - 2):
-            if (data['high'].iloc[i] > data['high'].iloc[i-1] and
-                data['high'].iloc[i] > data['high'].iloc[i-2] and
-                data['high'].iloc[i] > data['high'].iloc[i+1] and
-                data['high'].iloc[i] > data['high'].iloc[i+2]):
-                price_highs.append((i, data['high'].iloc[i]))
-
-        # البحث عن آخر قاعين في السعر
-        price_lows = []
-        for i in range(2, len(data) - 2):
-            if (data['low'].iloc[i] < data['low'].iloc[i-1] and
-                data['low'].iloc[i] < data['low'].iloc[i-2] and
-                data['low'].iloc[i] < data['low'].iloc[i+1] and
-                data['low'].iloc[i] < data['low'].iloc[i+2]):
-                price_lows.append((i, data['low'].iloc[i]))
+        # آخر القمم والقيعان في السعر (من الفهرس المشترك)
+        price_highs, price_lows = self._recent_pivots(data)
 
         # التحقق من الدايفرجنس الهبوطي
         if len(price_highs) >= 2:
@@ -602,41 +763,11 @@ class TechnicalIndicators:
 
     def _find_peaks(self, series, min_distance=5):
         """البحث عن القمم الحقيقية"""
-        peaks = []
-        for i in range(min_distance, len(series) - min_distance):
-            is_peak = True
-            current_val = series.iloc[i]
-
-            # التحقق من أن القيمة أعلى من الجيران
-            for j in range(1, min_distance + 1):
-                if (current_val <= series.iloc[i-j] or
-                    current_val <= series.iloc[i+j]):
-                    is_peak = False
-                    break
-
-            if is_peak:
-                peaks.append(i)
-
-        return peaks
+        return pivot_positions(series.values, min_distance, np.greater).tolist()
 
     def _find_troughs(self, series, min_distance=5):
         """البحث عن القيعان الحقيقية"""
-        troughs = []
-        for i in range(min_distance, len(series) - min_distance):
-            is_trough = True
-            current_val = series.iloc[i]
-
-            # التحقق من أن القيمة أقل من الجيران
-            for j in range(1, min_distance + 1):
-                if (current_val >= series.iloc[i-j] or
-                    current_val >= series.iloc[i+j]):
-                    is_trough = False
-                    break
-
-            if is_trough:
-                troughs.append(i)
-
-        return troughs
+        return pivot_positions(series.values, min_distance, np.less).tolist()
 
     def _check_latest_divergence(self, data, current_idx, price_highs, price_lows,
                                 indicator_highs, indicator_lows, price_col, indicator_col, indicator_name):
@@ -720,141 +851,213 @@ class TechnicalIndicators:
 
     def analyze_ma_crossover(self):
         """تحليل تقاطع المتوسطات المتحركة"""
-        signals = []
+        buffer = SignalBuffer(self.df.index.tz)
+        self._append_ma_crossover(buffer)
+        return buffer.to_records()
 
+    def _append_ma_crossover(self, buffer):
+        """إضافة إشارات تقاطع المتوسطات إلى المخزن العمودي"""
         if 'ma_short' not in self.df.columns or 'ma_long' not in self.df.columns:
             self.calculate_moving_averages()
 
-        # البحث عن التقاطعات
-        for i in range(1, len(self.df)):
-            prev_short = self.df['ma_short'].iloc[i-1]
-            prev_long = self.df['ma_long'].iloc[i-1]
-            curr_short = self.df['ma_short'].iloc[i]
-            curr_long = self.df['ma_long'].iloc[i]
-
-            # تقاطع صعودي
-            if prev_short <= prev_long and curr_short > curr_long:
-                signals.append({
-                    'type': 'ma_bullish_crossover',
-                    'timestamp': self.df.index[i],
-                    'signal': 'شراء',
-                    'description': 'MA9 تقطع MA20 صعودياً',
-                    'strength_percentage': 35.0  # قوة افتراضية
-                })
-
-            # تقاطع هبوطي
-            elif prev_short >= prev_long and curr_short < curr_long:
-                signals.append({
-                    'type': 'ma_bearish_crossover',
-                    'timestamp': self.df.index[i],
-                    'signal': 'بيع',
-                    'description': 'MA9 تقطع MA20 هبوطياً',
-                    'strength_percentage': 35.0  # قوة افتراضية
-                })
-
-        return signals
+        # البحث عن التقاطعات بمقارنة كل شمعة بالشمعة السابقة دفعة واحدة
+        masks = self._mask_cache.get('ma_crossover')
+        if masks is None:
+            masks = ma_crossover_masks(self.df['ma_short'].to_numpy(dtype=float),
+                                       self.df['ma_long'].to_numpy(dtype=float))
+        bullish, bearish = masks
+
+        found = np.flatnonzero(bullish | bearish)
+        is_bullish = bullish[found]
+        buffer.append(
+            self.df.index[found + 1],
+            np.where(is_bullish, TYPE_CODES['ma_bullish_crossover'], TYPE_CODES['ma_bearish_crossover']),
+            np.where(is_bullish, BUY, SELL),
+            35.0  # قوة افتراضية
+        )
 
     def analyze_rsi_signals(self):
         """تحليل إشارات RSI"""
-        signals = []
+        buffer = SignalBuffer(self.df.index.tz)
+        self._append_rsi_signals(buffer)
+        return buffer.to_records()
 
+    def _append_rsi_signals(self, buffer):
+        """إضافة إشارات RSI إلى المخزن العمودي"""
         if 'rsi' not in self.df.columns:
             self.calculate_rsi()
 
-        # إشارات RSI التقليدية
-        for i in range(len(self.df)):
-            rsi_val = self.df['rsi'].iloc[i]
-            timestamp = self.df.index[i]
-
-            if rsi_val <= 30:
-                # حساب قوة الإشارة بناءً على مدى انخفاض RSI
-                strength = max(10, min(70, (30 - rsi_val) * 2 + 40))
-                signals.append({
-                    'type': 'rsi_oversold',
-                    'timestamp': timestamp,
-                    'signal': 'شراء',
-                    'description': f'RSI في منطقة التشبع البيعي ({rsi_val:.1f})',
-                    'strength_percentage': strength
-                })
-            elif rsi_val >= 70:
-                # حساب قوة الإشارة بناءً على مدى ارتفاع RSI
-                strength = max(10, min(70, (rsi_val - 70) * 2 + 40))
-                signals.append({
-                    'type': 'rsi_overbought',
-                    'timestamp': timestamp,
-                    'signal': 'بيع',
-                    'description': f'RSI في منطقة التشبع الشرائي ({rsi_val:.1f})',
-                    'strength_percentage': strength
-                })
+        # إشارات RSI التقليدية: أقنعة مناطق التشبع والقوة لكل الشموع دفعة واحدة
+        rsi = self.df['rsi'].to_numpy(dtype=float)
+        zones = self._mask_cache.get('rsi_zones')
+        if zones is None:
+            zones = rsi_zone_masks(rsi)
+        oversold, overbought, strength = zones
+
+        found = np.flatnonzero(oversold | overbought)
+        is_oversold = oversold[found]
+        buffer.append(
+            self.df.index[found],
+            np.where(is_oversold, TYPE_CODES['rsi_oversold'], TYPE_CODES['rsi_overbought']),
+            np.where(is_oversold, BUY, SELL),
+            strength[found],
+            value=rsi[found]
+        )
 
         # ملاحظة: إشارات الشمعة الأخيرة تُضاف في get_all_signals()
 
         # البحث عن دايفرجنس RSI - الطريقة البسيطة (للتاريخ)
         try:
-            rsi_simple_div = self.detect_simple_divergence(self.df['close'], self.df['rsi'])
-            for div in rsi_simple_div:
-                signal_type = 'شراء' if div['type'] == 'bullish_divergence' else 'بيع'
-                signals.append({
-                    'type': f"rsi_simple_{div['type']}",
-                    'timestamp': div['timestamp'],
-                    'signal': signal_type,
-                    'description': f"RSI دايفرجنس {signal_type}",
-                    'strength_percentage': 65.0  # قوة افتراضية للدايفرجنس البسيط
-                })
+            self._append_simple_divergence(buffer, 'rsi', 'rsi', 65.0)  # قوة افتراضية للدايفرجنس البسيط
         except Exception as e:
             print(f"خطأ في تحليل RSI البسيط: {e}")
 
-        return signals
+    def _append_simple_divergence(self, buffer, column, prefix, strength):
+        """إضافة الدايفرجنس البسيط لمؤشر واحد إلى المخزن العمودي"""
+        arrays = self._simple_divergence_cache.get(column)
+        if arrays is None:
+            arrays = self._simple_divergence_arrays(self.df['close'], {column: self.df[column]})[column]
+        ends, bullish, _ = arrays
+
+        buffer.append(
+            self.df.index[ends],
+            np.where(bullish, TYPE_CODES[f'{prefix}_simple_bullish_divergence'],
+                     TYPE_CODES[f'{prefix}_simple_bearish_divergence']),
+            np.where(bullish, BUY, SELL),
+            strength
+        )
 
     def get_all_signals(self):
         """الحصول على جميع الإشارات"""
-        all_signals = []
+        return self.get_signal_buffer().to_records()
+
+    def get_signal_buffer(self):
+        """
+        جميع الإشارات في مخزن عمودي (الأحدث أولاً)
+
+        Returns:
+            SignalBuffer: نفس إشارات get_all_signals بدون إنشاء قاموس لكل إشارة
+        """
+        buffer = SignalBuffer(self.df.index.tz)
 
         # حساب جميع المؤشرات
-        self.calculate_rsi()
-        self.calculate_macd()
-        self.calculate_obv()
-        self.calculate_moving_averages()
+        if not self._indicators_ready:
+            self.calculate_rsi()
+            self.calculate_macd()
+            self.calculate_obv()
+            self.calculate_moving_averages()
+
+        # الدايفرجنس البسيط لـ RSI و MACD و OBV في استدعاء واحد
+        try:
+            self._simple_divergence_cache = self._simple_divergence_arrays(
+                self.df['close'],
+                {name: self.df[name] for name in ('rsi', 'macd_histogram', 'obv')}
+            )
+        except Exception as e:
+            print(f"خطأ في تحليل الدايفرجنس البسيط: {e}")
+            self._simple_divergence_cache = {}
 
         # جمع الإشارات التقليدية
-        all_signals.extend(self.analyze_rsi_signals())
-        all_signals.extend(self.analyze_ma_crossover())
+        self._append_rsi_signals(buffer)
+        self._append_ma_crossover(buffer)
 
         # إشارات الدايفرجنس الصحيحة (طريقة TradingView)
         try:
-            tradingview_divergences = self.detect_tradingview_divergence()
-            all_signals.extend(tradingview_divergences)
+            buffer.append_records(self.detect_tradingview_divergence())
         except Exception as e:
             print(f"خطأ في تحليل الدايفرجنس: {e}")
 
         # إشارات MACD الدايفرجنس - الطريقة البسيطة (للتاريخ)
         try:
-            macd_simple_div = self.detect_simple_divergence(self.df['close'], self.df['macd_histogram'])
-            for div in macd_simple_div:
-                signal_type = 'شراء' if div['type'] == 'bullish_divergence' else 'بيع'
-                all_signals.append({
-                    'type': f"macd_simple_{div['type']}",
-                    'timestamp': div['timestamp'],
-                    'signal': signal_type,
-                    'description': f"MACD دايفرجنس {signal_type}",
-                    'strength_percentage': 60.0  # قوة افتراضية للدايفرجنس البسيط
-                })
+            self._append_simple_divergence(buffer, 'macd_histogram', 'macd', 60.0)  # قوة افتراضية للدايفرجنس البسيط
         except Exception as e:
             print(f"خطأ في تحليل MACD البسيط: {e}")
 
         # إشارات OBV الدايفرجنس - الطريقة البسيطة (للتاريخ)
         try:
-            obv_simple_div = self.detect_simple_divergence(self.df['close'], self.df['obv'])
-            for div in obv_simple_div:
-                signal_type = 'شراء' if div['type'] == 'bullish_divergence' else 'بيع'
-                all_signals.append({
-                    'type': f"obv_simple_{div['type']}",
-                    'timestamp': div['timestamp'],
-                    'signal': signal_type,
-                    'description': f"OBV دايفرجنس {signal_type}",
-                    'strength_percentage': 55.0  # قوة افتراضية للدايفرجنس البسيط
-                })
+            self._append_simple_divergence(buffer, 'obv', 'obv', 55.0)  # قوة افتراضية للدايفرجنس البسيط
         except Exception as e:
             print(f"خطأ في تحليل OBV البسيط: {e}")
 
-        return sorted(all_signals, key=lambda x: x['timestamp'], reverse=True)
+        return buffer.sort_by_time(descending=True)
+
+    def get_live_signal_buffer(self, tolerance=LIVE_TOLERANCE):
+        """
+        إشارات الشمعة الأخيرة فقط للمسح المباشر
+
+        دايفرجنس الشمعة الأخيرة، ومنطقة RSI الحالية، وتقاطع المتوسطات في آخر
+        شمعة. RSI و MACD والمتوسطات تُحسب على آخر live_window() شمعة فقط بدلاً
+        من كامل التاريخ، ولا يُحسب الدايفرجنس التاريخي.
+
+        Args:
+            tolerance (float): أثر بداية المتوسطات الأسية المسموح به
+
+        Returns:
+            SignalBuffer: الإشارات (الأحدث أولاً)
+        """
+        buffer = SignalBuffer(self.df.index.tz)
+        if len(self.df) < 2:
+            return buffer
+
+        window = live_window(tolerance=tolerance)
+        if self._indicators_ready:
+            live = TechnicalIndicators(self.df.tail(window), backend=self.backend)
+            live._indicators_ready = True
+        else:
+            # OBV تراكمي وقيمته المطلقة تدخل في قوة الدايفرجنس، لذلك يُحسب على كل البيانات
+            # (مجموع تراكمي واحد رخيص)
+            if 'obv' not in self.df.columns:
+                self.calculate_obv()
+            obv = self.df['obv'].to_numpy()[-window:]
+            tail = self.df[['open', 'high', 'low', 'close', 'volume']].tail(window)
+
+            if self.backend == 'numpy':
+                # كل الأعمدة في إنشاء واحد بدلاً من إضافتها عموداً عموداً
+                close = tail['close'].to_numpy(dtype=float)
+                macd, macd_signal, macd_histogram = indicator_kernels.macd(close)
+                columns = {name: tail[name].to_numpy() for name in tail.columns}
+                columns.update({
+                    'rsi': indicator_kernels.rsi(close),
+                    'macd': macd,
+                    'macd_signal': macd_signal,
+                    'macd_histogram': macd_histogram,
+                    'obv': obv,
+                    'ma_short': indicator_kernels.sma(close, 9),
+                    'ma_long': indicator_kernels.sma(close, 20),
+                })
+                live = TechnicalIndicators(pd.DataFrame(columns, index=tail.index), backend=self.backend)
+            else:
+                live = TechnicalIndicators(tail, backend=self.backend)
+                live.calculate_rsi()
+                live.calculate_macd()
+                live.calculate_moving_averages()
+                live.df['obv'] = obv
+            live._indicators_ready = True
+
+        timestamps = live.df.index[-1:]
+
+        # منطقة RSI الحالية
+        rsi = live.df['rsi'].to_numpy(dtype=float)[-1:]
+        oversold, overbought, strength = rsi_zone_masks(rsi)
+        if oversold[0] or overbought[0]:
+            buffer.append(timestamps,
+                          'rsi_oversold' if oversold[0] else 'rsi_overbought',
+                          BUY if oversold[0] else SELL,
+                          strength, value=rsi)
+
+        # تقاطع المتوسطات في آخر شمعة
+        bullish, bearish = ma_crossover_masks(live.df['ma_short'].to_numpy(dtype=float)[-2:],
+                                              live.df['ma_long'].to_numpy(dtype=float)[-2:])
+        if bullish[0] or bearish[0]:
+            buffer.append(timestamps,
+                          'ma_bullish_crossover' if bullish[0] else 'ma_bearish_crossover',
+                          BUY if bullish[0] else SELL,
+                          35.0)  # قوة افتراضية
+
+        # دايفرجنس الشمعة الأخيرة (طريقة TradingView)
+        try:
+            buffer.append_records(live.detect_tradingview_divergence())
+        except Exception as e:
+            print(f"خطأ في تحليل الدايفرجنس: {e}")
+
+        return buffer.sort_by_time(descending=True)
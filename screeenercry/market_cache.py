@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_MARKETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'markets.json')
+DEFAULT_MARKETS_TTL = 6 * 3600  # ست ساعات
+# بعد فشل التحميل لا يُعاد الطلب قبل هذه المدة (كل طلب شموع كان سيعيده ويستهلك وزناً)
+DEFAULT_RETRY_SECONDS = 30.0
+
+
+class MarketCache:
+    def __init__(self, path=DEFAULT_MARKETS_PATH, ttl=DEFAULT_MARKETS_TTL, retry=DEFAULT_RETRY_SECONDS):
+        """
+        ذاكرة مؤقتة لبيانات الأسواق محفوظة على القرص ومشتركة بين كل DataFetcher
+
+        Args:
+            path (str): مسار ملف JSON (None للذاكرة فقط)
+            ttl (float): مدة صلاحية البيانات بالثواني
+            retry (float): ثواني الانتظار بعد فشل التحميل قبل إعادة المحاولة
+        """
+        self.path = path
+        self.ttl = ttl
+        self.retry = retry
+        self._failed_at = None
+        self._markets = None
+        self._fetched_at = 0.0
+        self._disk_checked = False
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def age(self):
+        """عمر البيانات المخزنة بالثواني (inf إذا لم تُحمّل بعد)"""
+        with self._lock:
+            self._load_from_disk()
+            return time.time() - self._fetched_at if self._markets is not None else float('inf')
+
+    def get(self, loader, block=False):
+        """
+        إرجاع الأسواق المخزنة مع تحديثها في الخلفية عند انتهاء صلاحيتها
+
+        Args:
+            loader (callable): دالة تعيد قاموس الأسواق {symbol: market}
+            block (bool): الانتظار حتى التحميل إذا لم تتوفر أي بيانات بعد
+
+        Returns:
+            dict: قاموس الأسواق، أو None إذا لم تتوفر بيانات ولم يُطلب الانتظار
+        """
+        with self._lock:
+            self._load_from_disk()
+            markets = self._markets
+            fresh = markets is not None and time.time() - self._fetched_at < self.ttl
+
+        if fresh:
+            return markets
+        failed_at = self._failed_at
+        recently_failed = failed_at is not None and time.time() - failed_at < self.retry
+        if markets is None and block:
+            if recently_failed:
+                raise RuntimeError("فشل تحميل قائمة الأسواق مؤخراً")
+            return self.refresh(loader)
+
+        # بيانات قديمة أو غير موجودة: تحديث في الخلفية دون حجب المستدعي
+        if not recently_failed:
+            self.refresh_async(loader)
+        return markets
+
+    def refresh(self, loader):
+        """تحميل الأسواق الآن وحفظها في الذاكرة وعلى القرص"""
+        try:
+            markets = loader()
+        except Exception:
+            self._failed_at = time.time()
+            raise
+        with self._lock:
+            self._markets = markets
+            self._fetched_at = time.time()
+            self._failed_at = None
+            self._save_to_disk()
+        return markets
+
+    def refresh_async(self, loader):
+        """تحديث في الخلفية (طلب واحد فقط في نفس الوقت)"""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return self._refresh_thread
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_quietly, args=(loader,), daemon=True
+            )
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    def _refresh_quietly(self, loader):
+        try:
+            self.refresh(loader)
+        except Exception as e:
+            print(f"خطأ في تحديث قائمة الأسواق: {e}")
+
+    def _load_from_disk(self):
+        """قراءة الملف مرة واحدة عند أول استخدام (يُستدعى تحت القفل)"""
+        if self._disk_checked or not self.path:
+            return
+        self._disk_checked = True
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                payload = json.load(f)
+            self._markets = payload['markets']
+            self._fetched_at = payload['fetched_at']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"خطأ في قراءة ملف الأسواق: {e}")
+
+    def _save_to_disk(self):
+        """كتابة الملف بشكل ذري (يُستدعى تحت القفل)"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self._fetched_at, 'markets': self._markets}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"خطأ في حفظ ملف الأسواق: {e}")
+
+
+_market_cache = None
+_market_cache_lock = threading.Lock()
+
+
+def get_market_cache():
+    """الذاكرة المؤقتة المشتركة للأسواق داخل نفس البرنامج"""
+    global _market_cache
+    with _market_cache_lock:
+        if _market_cache is None:
+            _market_cache = MarketCache(
+                os.environ.get('MARKETS_CACHE_PATH', DEFAULT_MARKETS_PATH),
+                float(os.environ.get('MARKETS_CACHE_TTL', DEFAULT_MARKETS_TTL)),
+            )
+        return _market_cache
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'ohlcv.sqlite')
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """مخزن الشموع المشترك لكل العمليات داخل نفس البرنامج"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = OHLCVStore(os.environ.get('OHLCV_STORE_PATH', DEFAULT_STORE_PATH))
+        return _default_store
+
+
+class OHLCVStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        مخزن محلي لبيانات الشموع (SQLite) مفهرس حسب (المنصة، العملة، الإطار الزمني)
+
+        Args:
+            path (str): مسار ملف قاعدة البيانات (':memory:' للتخزين في الذاكرة)
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS candles (
+                    exchange TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    PRIMARY KEY (exchange, symbol, timeframe, ts)
+                ) WITHOUT ROWID
+            ''')
+            self._conn.commit()
+
+    def last_timestamp(self, exchange, symbol, timeframe):
+        """آخر وقت شمعة مخزنة (بالمللي ثانية) أو None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MAX(ts) FROM candles WHERE exchange=? AND symbol=? AND timeframe=?',
+                (exchange, symbol, timeframe)
+            ).fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def count_since(self, exchange, symbol, timeframe, since):
+        """عدد الشموع المخزنة ابتداءً من وقت معين"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COUNT(*) FROM candles WHERE exchange=? AND symbol=? AND timeframe=? AND ts>=?',
+                (exchange, symbol, timeframe, int(since))
+            ).fetchone()
+        return row[0]
+
+    def upsert(self, exchange, symbol, timeframe, ohlcv):
+        """
+        إضافة شموع أو تحديثها (الشمعة المفتوحة تُستبدل بنسختها الأحدث)
+
+        Args:
+            ohlcv (list): صفوف [timestamp_ms, open, high, low, close, volume] كما تعيدها ccxt
+        """
+        if not ohlcv:
+            return 0
+
+        rows = [
+            (exchange, symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5])
+            for c in ohlcv
+        ]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, exchange, symbol, timeframe, limit=None, since=None, until=None):
+        """
+        قراءة الشموع المخزنة بنفس صيغة DataFetcher.get_crypto_data
+
+        Args:
+            limit (int): عدد آخر الشموع المطلوبة
+            since (int): أقدم وقت مطلوب بالمللي ثانية
+            until (int): أحدث وقت مطلوب بالمللي ثانية
+
+        Returns:
+            pd.DataFrame: بيانات OHLCV مفهرسة بالوقت
+        """
+        query = ('SELECT ts, open, high, low, close, volume FROM candles '
+                 'WHERE exchange=? AND symbol=? AND timeframe=?')
+        params = [exchange, symbol, timeframe]
+        if since is not None:
+            query += ' AND ts>=?'
+            params.append(int(since))
+        if until is not None:
+            query += ' AND ts<=?'
+            params.append(int(until))
+        query += ' ORDER BY ts DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        df = pd.DataFrame(rows[::-1], columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
+
+    def close(self):
+        """إغلاق الاتصال بقاعدة البيانات"""
+        with self._lock:
+            self._conn.close()
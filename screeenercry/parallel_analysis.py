@@ -0,0 +1,138 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from indicators import DEFAULT_BACKEND, TechnicalIndicators
+from signal_buffer import SignalBuffer
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# عدد المهام لكل عامل عند عدم تحديد حجم الدفعة (توازن بين الحمل وتكلفة الإرسال)
+CHUNKS_PER_WORKER = 4
+
+class SharedFrames:
+    def __init__(self, units):
+        """
+        نسخ بيانات OHLCV لعدة (عملة، إطار زمني) إلى كتلة ذاكرة مشتركة واحدة
+
+        العمليات العاملة تقرأ البيانات مباشرة من الذاكرة المشتركة، ولا يُرسل إليها
+        إلا وصف صغير لكل مهمة بدلاً من DataFrame كامل.
+
+        Args:
+            units (list): قائمة (رمز العملة، الإطار الزمني، DataFrame)
+        """
+        units = [(symbol, timeframe, df) for symbol, timeframe, df in units
+                 if df is not None and not df.empty]
+        total = sum(len(df) for _, _, df in units)
+        # لكل شمعة: وقت int64 + خمس قيم float64
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, total * 8 * (1 + len(OHLCV_COLUMNS))))
+        self.tasks = []
+
+        timestamps = np.ndarray((total,), dtype=np.int64, buffer=self.shm.buf)
+        values = np.ndarray((len(OHLCV_COLUMNS), total), dtype=np.float64,
+                            buffer=self.shm.buf, offset=total * 8)
+        offset = 0
+        for symbol, timeframe, df in units:
+            length = len(df)
+            index = pd.DatetimeIndex(df.index)
+            timestamps[offset:offset + length] = index.asi8
+            for row, column in enumerate(OHLCV_COLUMNS):
+                values[row, offset:offset + length] = df[column].to_numpy(dtype=float)
+            tz = str(index.tz) if index.tz is not None else None
+            self.tasks.append((self.shm.name, total, symbol, timeframe, offset, length, tz, index.unit))
+            offset += length
+
+    def close(self):
+        """تحرير الذاكرة المشتركة"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def frame_from_task(task):
+    """
+    إعادة بناء DataFrame لمهمة من الذاكرة المشتركة
+
+    Args:
+        task (tuple): وصف المهمة من SharedFrames.tasks
+
+    Returns:
+        tuple: (رمز العملة، الإطار الزمني، DataFrame)
+    """
+    name, total, symbol, timeframe, offset, length, tz, unit = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        timestamps = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)[offset:offset + length]
+        values = np.ndarray((len(OHLCV_COLUMNS), total), dtype=np.float64,
+                            buffer=shm.buf, offset=total * 8)[:, offset:offset + length]
+        # نسخ مستقلة عن الذاكرة المشتركة حتى يمكن فصلها وتحريرها بأمان
+        stamps = timestamps.astype(f'datetime64[{unit}]')
+        data = values.T.copy()
+        del timestamps, values
+    finally:
+        # الفصل بعد النسخ مباشرة: لا يبقى مقبض مفتوح في العملية العاملة بعد انتهاء الدفعة
+        shm.close()
+
+    index = pd.DatetimeIndex(stamps, name='timestamp')
+    if tz is not None:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    df = pd.DataFrame(data, index=index, columns=list(OHLCV_COLUMNS))
+    return symbol, timeframe, df
+
+
+def analyze_task(task, backend=DEFAULT_BACKEND):
+    """
+    تحليل مهمة واحدة داخل عملية عاملة
+
+    Args:
+        task (tuple): وصف المهمة من SharedFrames.tasks
+        backend (str): محرك حساب المؤشرات 'numpy' أو 'ta'
+
+    Returns:
+        SignalBuffer: الإشارات مع معلومات العملة والإطار الزمني (مصفوفات صغيرة سريعة الإرسال)
+    """
+    try:
+        symbol, timeframe, df = frame_from_task(task)
+        buffer = TechnicalIndicators(df, backend).get_signal_buffer()
+        return buffer.with_context(symbol, timeframe, df['close'].iloc[-1])
+    except Exception as e:
+        print(f"خطأ في تحليل {task[2]}: {e}")
+        return SignalBuffer()
+
+
+def default_chunk_size(task_count, max_workers):
+    """حجم الدفعة الافتراضي: حوالي CHUNKS_PER_WORKER دفعات لكل عامل"""
+    return max(1, math.ceil(task_count / (max_workers * CHUNKS_PER_WORKER)))
+
+
+def analyze_in_processes(units, max_workers=None, chunk_size=None, backend=DEFAULT_BACKEND):
+    """
+    تحليل (عملة، إطار زمني) على عدة عمليات
+
+    Args:
+        units (list): قائمة (رمز العملة، الإطار الزمني، DataFrame)
+        max_workers (int): عدد العمليات (افتراضياً عدد الأنوية)
+        chunk_size (int): عدد المهام المرسلة لكل عامل في كل مرة
+        backend (str): محرك حساب المؤشرات (نفس محرك المحلل حتى تطابق النتائج المسح العادي)
+
+    Returns:
+        list: مخزن إشارات لكل مهمة بترتيب المهام
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with SharedFrames(units) as shared:
+        if not shared.tasks:
+            return []
+        chunk_size = chunk_size or default_chunk_size(len(shared.tasks), max_workers)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(partial(analyze_task, backend=backend), shared.tasks, chunksize=chunk_size))
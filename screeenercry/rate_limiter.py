@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+# ميزانية وزن الطلبات التي نسمح بها لأنفسنا في الدقيقة
+# الحد الرسمي لـ Binance أعلى (BINANCE_SERVER_WEIGHT_LIMIT)، لكننا نترك هامشاً لباقي العمليات على نفس الـ IP
+BINANCE_WEIGHT_PER_MINUTE = 1200
+BINANCE_SERVER_WEIGHT_LIMIT = 6000
+# أقصى وزن يمكن استهلاكه دفعة واحدة قبل أن تبدأ الطلبات بالانتظار
+BINANCE_BURST_WEIGHT = 100
+
+# أوزان نقاط النهاية العامة في Binance
+BINANCE_ENDPOINT_WEIGHTS = {
+    'exchangeInfo': 20,
+    'ticker/24hr': 40,
+    'ticker/price': 2,
+    'depth': 5,
+}
+
+
+def klines_weight(limit):
+    """وزن طلب الشموع (klines) في Binance حسب عدد الشموع المطلوبة"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def request_weight(endpoint, limit=None):
+    """وزن طلب Binance حسب نقطة النهاية"""
+    if endpoint == 'klines':
+        return klines_weight(limit or 500)
+    return BINANCE_ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+class TokenBucket:
+    def __init__(self, capacity=BINANCE_BURST_WEIGHT, refill_per_second=BINANCE_WEIGHT_PER_MINUTE / 60.0):
+        """
+        محدد معدل (token bucket) يُعاد ملؤه بشكل مستمر
+
+        آمن للاستخدام من عدة threads ومن مهام asyncio: كل طلب يحجز وزنه تحت القفل
+        ثم ينتظر خارج القفل المدة اللازمة حتى يتوفر الرصيد.
+
+        Args:
+            capacity (float): أقصى رصيد (أكبر دفعة مسموحة دون انتظار)
+            refill_per_second (float): معدل إعادة الملء بالوحدات في الثانية
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # إحصائيات
+        self._requests = 0
+        self._total_weight = 0.0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @classmethod
+    def per_minute(cls, weight_per_minute, burst=None):
+        """إنشاء محدد بميزانية في الدقيقة"""
+        burst = burst if burst is not None else min(BINANCE_BURST_WEIGHT, weight_per_minute)
+        return cls(capacity=burst, refill_per_second=weight_per_minute / 60.0)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def _reserve(self, weight):
+        """حجز الوزن وإرجاع مدة الانتظار اللازمة بالثواني"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= weight
+            wait = max(0.0, -self._tokens / self.refill_per_second)
+
+            self._requests += 1
+            self._total_weight += weight
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._last_wait = wait
+        return wait
+
+    def acquire(self, weight=1):
+        """
+        انتظار حتى يتوفر الرصيد لطلب بوزن معين
+
+        Returns:
+            float: مدة الانتظار بالثواني
+        """
+        wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, weight=1):
+        """نفس acquire لكن دون حجب حلقة asyncio"""
+        wait = self._reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def report_used_weight(self, used_weight, server_limit=BINANCE_SERVER_WEIGHT_LIMIT, high_watermark=0.8):
+        """
+        مزامنة الرصيد مع الوزن المستهلك الذي تعلنه Binance (X-MBX-USED-WEIGHT-1M)
+
+        الوزن المعلن يشمل طلبات العمليات الأخرى على نفس الـ IP؛ إذا اقترب من الحد
+        يُصفَّر الرصيد حتى تنتظر الطلبات التالية بدلاً من التعرض للحظر.
+        """
+        if used_weight is None:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            if float(used_weight) >= server_limit * high_watermark:
+                self._tokens = min(self._tokens, 0.0)
+
+    def metrics(self):
+        """
+        إحصائيات المحدد
+
+        Returns:
+            dict: الرصيد الحالي وزمن الانتظار وعدد الطلبات
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'available': self._tokens,
+                'capacity': self.capacity,
+                'refill_per_second': self.refill_per_second,
+                'requests': self._requests,
+                'total_weight': self._total_weight,
+                'total_wait': self._total_wait,
+                'max_wait': self._max_wait,
+                'last_wait': self._last_wait,
+            }
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter():
+    """محدد المعدل المشترك لكل DataFetcher داخل نفس البرنامج"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket.per_minute(BINANCE_WEIGHT_PER_MINUTE)
+        return _shared_limiter
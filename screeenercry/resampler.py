@@ -0,0 +1,132 @@
+import pandas as pd
+
+# الأطر الزمنية التي تدعمها Binance مباشرة
+BINANCE_TIMEFRAMES = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '3d', '1w']
+
+# الحد الأقصى لعدد الشموع الأساسية التي نقبل جلبها لبناء إطار أكبر
+MAX_BASE_CANDLES = 1000
+
+_UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+OHLCV_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+}
+
+
+def timeframe_ms(timeframe):
+    """مدة الإطار الزمني بالمللي ثانية ('4h' => 14400000)"""
+    return int(timeframe[:-1]) * _UNIT_MS[timeframe[-1]]
+
+
+# الشموع الأسبوعية في Binance تبدأ يوم الاثنين (1970-01-05) وليس من بداية epoch (الخميس)
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def last_close_ms(timeframe, now_ms):
+    """
+    وقت إغلاق آخر شمعة مغلقة (= وقت افتتاح الشمعة الحالية) بالمللي ثانية
+
+    Args:
+        timeframe (str): الإطار الزمني
+        now_ms (int): الوقت الحالي بالمللي ثانية (UTC)
+    """
+    duration = timeframe_ms(timeframe)
+    offset = _WEEK_OFFSET_MS if timeframe.endswith('w') else 0
+    return (int(now_ms) - offset) // duration * duration + offset
+
+
+def pandas_rule(timeframe):
+    """قاعدة pandas المطابقة لحدود شموع المنصة"""
+    amount, unit = int(timeframe[:-1]), timeframe[-1]
+    if unit == 'w':
+        # الشموع الأسبوعية في Binance تبدأ يوم الاثنين 00:00 UTC
+        return f'{amount}W-MON'
+    # الأيام تُحوّل إلى ساعات حتى تُحسب حدودها من origin='epoch'
+    return {'m': f'{amount}min', 'h': f'{amount}h', 'd': f'{amount * 24}h'}[unit]
+
+
+def resample_ohlcv(df, base_timeframe, timeframe):
+    """
+    بناء شموع إطار زمني أكبر من شموع إطار أصغر
+
+    Args:
+        df (pd.DataFrame): بيانات OHLCV للإطار الأساسي مفهرسة بوقت افتتاح الشمعة
+        base_timeframe (str): الإطار الزمني للبيانات المدخلة
+        timeframe (str): الإطار الزمني المطلوب
+
+    Returns:
+        pd.DataFrame: بيانات OHLCV للإطار المطلوب بحدود مطابقة للمنصة
+    """
+    if df.empty or base_timeframe == timeframe:
+        return df
+
+    rule = pandas_rule(timeframe)
+    if timeframe.endswith('w'):
+        grouper = df.resample(rule, label='left', closed='left')
+    else:
+        # الحدود محسوبة من 1970-01-01 UTC مثل Binance (4h => 00:00, 04:00, ...)
+        grouper = df.resample(rule, label='left', closed='left', origin='epoch')
+
+    resampled = grouper.agg(OHLCV_AGGREGATION)
+    counts = grouper['close'].count()
+    resampled = resampled[counts > 0]
+    counts = counts[counts > 0]
+
+    # حذف الشمعة الأولى إذا كانت ناقصة (بداية البيانات في منتصف الفترة)
+    expected = timeframe_ms(timeframe) // timeframe_ms(base_timeframe)
+    if len(resampled) and counts.iloc[0] < expected:
+        resampled = resampled.iloc[1:]
+
+    return resampled
+
+
+def native_base(timeframe, native_timeframes=BINANCE_TIMEFRAMES):
+    """أكبر إطار مدعوم من المنصة يقسم الإطار المطلوب"""
+    if timeframe in native_timeframes:
+        return timeframe
+
+    target = timeframe_ms(timeframe)
+    divisors = [tf for tf in native_timeframes if target % timeframe_ms(tf) == 0]
+    return max(divisors, key=timeframe_ms)
+
+
+def plan_base_timeframes(timeframes, limit, native_timeframes=BINANCE_TIMEFRAMES,
+                         max_base_candles=MAX_BASE_CANDLES):
+    """
+    اختيار أقل عدد من الأطر الأساسية التي يجب جلبها لبناء كل الأطر المطلوبة
+
+    Args:
+        timeframes (list): الأطر الزمنية المطلوبة
+        limit (int): عدد الشموع المطلوبة لكل إطار
+        native_timeframes (list): الأطر التي تدعمها المنصة
+        max_base_candles (int): الحد الأقصى لشموع الإطار الأساسي
+
+    Returns:
+        dict: {الإطار الأساسي: (عدد الشموع المطلوب جلبها، [الأطر المشتقة منه])}
+    """
+    plan = {}
+    for timeframe in sorted(set(timeframes), key=timeframe_ms):
+        target = timeframe_ms(timeframe)
+        base = None
+
+        # محاولة الاشتقاق من إطار أساسي تم اختياره مسبقاً (الأصغر أولاً)
+        for candidate in sorted(plan, key=timeframe_ms):
+            ratio = target // timeframe_ms(candidate)
+            if target % timeframe_ms(candidate) == 0 and (limit + 1) * ratio <= max_base_candles:
+                base = candidate
+                break
+
+        if base is None:
+            base = native_base(timeframe, native_timeframes)
+            plan.setdefault(base, (limit, []))
+
+        ratio = target // timeframe_ms(base)
+        needed, derived = plan[base]
+        # شمعة إضافية لتعويض الفترة الأولى الناقصة بعد التجميع
+        plan[base] = (max(needed, (limit + 1) * ratio if ratio > 1 else limit), derived + [timeframe])
+
+    return plan
@@ -0,0 +1,70 @@
+import queue
+import threading
+
+# عدد العملات الجاهزة المسموح بانتظارها بين مرحلة الجلب ومرحلة التحليل
+DEFAULT_PREFETCH = 2
+
+_DONE = object()
+
+
+def prefetch_symbols(fetch, symbols, max_pending=DEFAULT_PREFETCH, fetch_workers=1):
+    """
+    جلب بيانات العملات في خيوط خلفية بينما يُحلَّل ما سبق جلبه
+
+    مرحلة الجلب مرتبطة بمرحلة التحليل بطابور محدود، فلا يسبق الجلب التحليل
+    بأكثر من max_pending عملة ولا تتراكم البيانات في الذاكرة.
+
+    Args:
+        fetch (callable): دالة تأخذ رمز العملة وتعيد بياناتها
+        symbols (list): قائمة رموز العملات
+        max_pending (int): أقصى عدد من العملات الجاهزة في الطابور
+        fetch_workers (int): عدد خيوط الجلب (الترتيب يصبح ترتيب الانتهاء إذا زاد عن 1)
+
+    Yields:
+        tuple: (رمز العملة، البيانات، الخطأ) والبيانات None عند فشل الجلب
+    """
+    ready = queue.Queue(maxsize=max(1, max_pending))
+    pending = iter(symbols)
+    pending_lock = threading.Lock()
+    stop = threading.Event()
+
+    def put(item):
+        # التوقف عند إغلاق المستهلك بدلاً من الانتظار للأبد على طابور ممتلئ
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            while not stop.is_set():
+                with pending_lock:
+                    symbol = next(pending, _DONE)
+                if symbol is _DONE:
+                    return
+                try:
+                    item = (symbol, fetch(symbol), None)
+                except Exception as e:
+                    item = (symbol, None, e)
+                if not put(item):
+                    return
+        finally:
+            put(_DONE)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, fetch_workers))]
+    for thread in workers:
+        thread.start()
+
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = ready.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
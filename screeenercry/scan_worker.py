@@ -0,0 +1,248 @@
+"""
+عامل مسح خلفي واحد مشترك بين كل جلسات التطبيق
+
+كل الجلسات تقرأ آخر نتائج العامل بدلاً من أن تمسح كل جلسة بنفسها، فتكلفة N
+مشاهد هي مسح واحد. العامل يعيد مسح الأزواج المطلوبة عند إغلاق شموعها وكل
+refresh ثانية، والجلسات تستطلع رقم الجيل (generation) لمعرفة وجود نتائج جديدة.
+"""
+
+import threading
+import time
+
+from crypto_analyzer import CryptoAnalyzer
+from resampler import last_close_ms, timeframe_ms
+from scan_pipeline import DEFAULT_PREFETCH, prefetch_symbols
+from scanner_daemon import DEFAULT_SETTLE_SECONDS
+from signal_buffer import SignalBuffer
+from signal_cache import get_signal_cache
+
+# أقصى عمر لنتيجة زوج قبل إعادة مسحه (الشمعة الحالية ما زالت تتغير)
+DEFAULT_REFRESH_SECONDS = 300.0
+
+# الزوج الذي لم تطلبه أي جلسة طوال هذه المدة يتوقف مسحه وتُحذف نتيجته
+DEFAULT_IDLE_SECONDS = 3600.0
+
+
+class ScanWorker:
+    def __init__(self, analyzer=None, limit=200, refresh=DEFAULT_REFRESH_SECONDS, idle=DEFAULT_IDLE_SECONDS,
+                 settle=DEFAULT_SETTLE_SECONDS, prefetch=DEFAULT_PREFETCH, clock=time.time):
+        """
+        عامل مسح مشترك يحتفظ بآخر نتيجة لكل (عملة، إطار زمني)
+
+        Args:
+            analyzer (CryptoAnalyzer): المحلل (افتراضياً مع الذاكرة المؤقتة المشتركة)
+            limit (int): عدد الشموع لكل إطار
+            refresh (float): أقصى عمر للنتيجة بالثواني قبل إعادة المسح
+            idle (float): ثواني عدم الطلب قبل التوقف عن مسح الزوج وحذف نتيجته
+            settle (float): ثواني الانتظار بعد إغلاق الشمعة قبل المسح
+            prefetch (int): عدد العملات التي تُجلب مسبقاً أثناء التحليل
+            clock (callable): مصدر الوقت بالثواني (للاختبار)
+        """
+        self.analyzer = analyzer or CryptoAnalyzer(signal_cache=get_signal_cache())
+        self.limit = limit
+        self.refresh = refresh
+        self.idle = idle
+        self.settle = settle
+        self.prefetch = prefetch
+        self.clock = clock
+        # يزيد بعد كل مسح غيّر النتائج؛ الجلسات تقارنه بآخر قيمة رأتها
+        self.generation = 0
+
+        self._results = {}      # {(العملة، الإطار الزمني): SignalBuffer}
+        self._versions = {}     # {(العملة، الإطار الزمني): (آخر شمعة، آخر سعر، عدد الإشارات)}
+        self._scanned_at = {}   # {(العملة، الإطار الزمني): وقت المسح بالثواني}
+        self._watched = {}      # {(العملة، الإطار الزمني): آخر وقت طلبته فيه جلسة}
+        self._lock = threading.Lock()
+        # مسح واحد في كل مرة: الخيط الخلفي والتحديث اليدوي لا يتداخلان
+        self._scan_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, symbols, timeframes):
+        """إضافة أزواج إلى ما يعيد العامل مسحه في الخلفية (أو تجديد طلبها)"""
+        pairs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        now = self.clock()
+        with self._lock:
+            for pair in pairs:
+                self._watched[pair] = now
+        return pairs
+
+    def watched(self):
+        with self._lock:
+            return list(self._watched)
+
+    def table(self, symbols, timeframes):
+        """
+        آخر نتائج الأزواج المحددة كجدول إشارات (دون انتظار أي مسح)
+
+        الأزواج التي لم تُمسح بعد تُضاف لما يراقبه العامل ويُوقظ لمسحها، والجدول
+        يحتوي ما هو جاهز الآن فقط؛ الجلسة تعيد الطلب عندما يتغير generation.
+
+        Returns:
+            SignalTable: جدول الإشارات بنفس ترتيب analyze_signal_table
+        """
+        pairs = self.watch(symbols, timeframes)
+        with self._lock:
+            buffers = [self._results[pair] for pair in pairs if pair in self._results]
+        if len(buffers) < len(pairs):
+            self.wake()
+        return self.analyzer.build_table(SignalBuffer.concat(buffers))
+
+    def pending(self, symbols, timeframes):
+        """الأزواج المحددة التي لم تُمسح بعد (نتائجها غائبة عن table)"""
+        with self._lock:
+            return [(symbol, timeframe) for symbol in symbols for timeframe in timeframes
+                    if (symbol, timeframe) not in self._results]
+
+    def has_new_results(self, generation, pending=(), follow=True):
+        """
+        هل لدى الجلسة نتائج جديدة تستدعي إعادة رسم الصفحة
+
+        Args:
+            generation (int): آخر جيل رأته الجلسة
+            pending (list): الأزواج التي عُرضت الصفحة بدونها (تُعرض فور جاهزيتها دائماً)
+            follow (bool): إعادة الرسم أيضاً عند تحديث النتائج المعروضة مسبقاً
+
+        Returns:
+            bool: True إذا تغير الجيل وكان التغيير مما تتابعه الجلسة
+        """
+        with self._lock:
+            if self.generation == generation:
+                return False
+            return follow or any(pair in self._results for pair in pending)
+
+    def scan(self, pairs):
+        """
+        مسح أزواج محددة وتحديث نتائجها
+
+        Args:
+            pairs (list): قائمة (العملة، الإطار الزمني)
+
+        Returns:
+            int: عدد الأزواج التي تم مسحها
+        """
+        with self._scan_lock:
+            # كل عملة تُجلب مرة واحدة لكل أطرها المطلوبة
+            symbol_timeframes = {}
+            for symbol, timeframe in pairs:
+                timeframes = symbol_timeframes.setdefault(symbol, [])
+                if timeframe not in timeframes:
+                    timeframes.append(timeframe)
+
+            def fetch(symbol):
+                return self.analyzer.data_fetcher.get_multi_timeframe_data(
+                    symbol, symbol_timeframes[symbol], self.limit)
+
+            scanned = changed = 0
+            for symbol, frames, error in prefetch_symbols(fetch, list(symbol_timeframes), self.prefetch):
+                if error is not None:
+                    print(f"خطأ في جلب بيانات {symbol}: {error}")
+                    continue
+                now = self.clock()
+                for timeframe in symbol_timeframes[symbol]:
+                    df = frames.get(timeframe)
+                    buffer = self.analyzer.analyze_buffer(symbol, timeframe, df)
+                    # نفس الشمعة الأخيرة ونفس السعر ونفس الإشارات: لا داعي لإعادة رسم الجلسات
+                    version = None if df is None or df.empty else (
+                        df.index[-1], float(df['close'].iloc[-1]), len(buffer))
+                    pair = (symbol, timeframe)
+                    with self._lock:
+                        if pair not in self._results or self._versions.get(pair) != version:
+                            changed += 1
+                        self._results[pair] = buffer
+                        self._versions[pair] = version
+                        self._scanned_at[pair] = now
+                    scanned += 1
+
+            if changed:
+                with self._lock:
+                    self.generation += 1
+            return scanned
+
+    def refresh_now(self, pairs=None):
+        """
+        إعادة مسح الأزواج (افتراضياً كل الأزواج المطلوبة) فوراً
+
+        نتائج الأزواج الأخرى لا تتأثر، والنتائج القديمة تبقى متاحة للجلسات
+        الأخرى حتى ينتهي المسح.
+        """
+        return self.scan(self.watched() if pairs is None else pairs)
+
+    def invalidate(self, pairs=None):
+        """حذف نتائج أزواج محددة (افتراضياً الكل) فيعيد العامل مسحها في دورته التالية"""
+        with self._lock:
+            for pair in list(self._results) if pairs is None else pairs:
+                self._results.pop(pair, None)
+                self._versions.pop(pair, None)
+                self._scanned_at.pop(pair, None)
+
+    def prune(self, now=None):
+        """
+        التوقف عن مسح الأزواج التي لم تطلبها أي جلسة منذ idle ثانية وحذف نتائجها
+
+        Returns:
+            list: الأزواج المحذوفة
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            stale = [pair for pair, requested in self._watched.items() if now - requested >= self.idle]
+            for pair in stale:
+                del self._watched[pair]
+        self.invalidate(stale)
+        return stale
+
+    def _next_due(self, pair, scanned_at):
+        """وقت استحقاق إعادة مسح الزوج: بعد refresh أو بعد إغلاق شمعته التالية"""
+        timeframe = pair[1]
+        next_close = last_close_ms(timeframe, (scanned_at - self.settle) * 1000) + timeframe_ms(timeframe)
+        return min(scanned_at + self.refresh, next_close / 1000 + self.settle)
+
+    def due_pairs(self, now=None):
+        """الأزواج المطلوبة التي حان وقت إعادة مسحها"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            return [pair for pair in self._watched
+                    if pair not in self._scanned_at or self._next_due(pair, self._scanned_at[pair]) <= now]
+
+    def seconds_until_next(self, now=None):
+        """الثواني حتى استحقاق أقرب زوج (refresh إذا لم يُطلب شيء بعد)"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            dues = [self._next_due(pair, self._scanned_at[pair]) if pair in self._scanned_at else now
+                    for pair in self._watched]
+        return max(0.0, min(dues) - now) if dues else self.refresh
+
+    def run_once(self, now=None):
+        """حذف الأزواج غير المطلوبة ثم مسح المستحق الآن"""
+        self.prune(now)
+        due = self.due_pairs(now)
+        return self.scan(due) if due else 0
+
+    def run_forever(self):
+        """المسح عند كل استحقاق حتى stop()؛ wake() يوقظ العامل قبل موعده"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"خطأ في المسح الخلفي: {e}")
+            self._wake.wait(self.seconds_until_next())
+            self._wake.clear()
+
+    def start(self):
+        """تشغيل العامل في خيط خلفي (مرة واحدة)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run_forever, name='scan-worker', daemon=True)
+                self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+ماسح مستقل يعمل بدون Streamlit ويُجدول مسح كل إطار زمني بعد إغلاق شمعته
+
+    python scanner_daemon.py --timeframes 1h 4h 1d
+    python scanner_daemon.py --symbols BTC/USDT ETH/USDT --once
+
+النتائج تُكتب في مخزن الإشارات المحلي (signal_store) فيتم الحساب مرة واحدة
+لكل شمعة بدلاً من مرة لكل مشاهد للصفحة.
+"""
+
+import argparse
+import threading
+import time
+
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from indicators import TechnicalIndicators
+from resampler import last_close_ms, timeframe_ms
+from scan_pipeline import DEFAULT_PREFETCH, prefetch_symbols
+from signal_cache import get_signal_cache
+from signal_store import get_default_signal_store, scan_window
+from streaming_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+
+# انتظار بعد إغلاق الشمعة حتى تصبح متوفرة عند المنصة
+DEFAULT_SETTLE_SECONDS = 5.0
+
+# محاولات انتظار شمعة مغلقة لم تنشرها المنصة (بمهلة تتضاعف) قبل تسجيل الزوج كممسوح
+DEFAULT_MAX_RETRIES = 5
+
+
+def closed_candles(df, close_ms):
+    """الشموع المغلقة فقط (تحذف الشمعة التي بدأت عند close_ms أو بعده)"""
+    if df is None or df.empty:
+        return df
+    cutoff = pd.Timestamp(close_ms, unit='ms')
+    if getattr(df.index, 'tz', None) is not None:
+        cutoff = cutoff.tz_localize('UTC')
+    return df[df.index < cutoff]
+
+
+class ScannerDaemon:
+    def __init__(self, symbols, timeframes, analyzer=None, store=None, limit=200,
+                 settle=DEFAULT_SETTLE_SECONDS, prefetch=DEFAULT_PREFETCH, clock=time.time, incremental=True,
+                 max_retries=DEFAULT_MAX_RETRIES):
+        """
+        ماسح مجدول على إغلاق الشموع
+
+        Args:
+            symbols (list): رموز العملات (None: قائمة المنصة، يُعاد تحديدها في كل دورة)
+            timeframes (list): الأطر الزمنية
+            analyzer (CryptoAnalyzer): المحلل (افتراضياً مع الذاكرة المؤقتة المشتركة)
+            store (SignalStore): مخزن الإشارات (افتراضياً المخزن المحلي المشترك)
+            limit (int): عدد الشموع لكل إطار
+            settle (float): ثواني الانتظار بعد الإغلاق قبل المسح
+            prefetch (int): عدد العملات التي تُجلب مسبقاً أثناء التحليل
+            clock (callable): مصدر الوقت بالثواني (للاختبار)
+            incremental (bool): تحديث المؤشرات بالشموع الجديدة فقط من حالة محفوظة في المخزن
+                (لمحرك numpy فقط، فحالة IncrementalIndicators تطابق نواه)
+            max_retries (int): محاولات إعادة مسح زوج لم تصل شمعته المغلقة قبل تسجيله كممسوح
+        """
+        # القائمة الافتراضية عند تعذر تحميل الأسواق تُستبدل بقائمة المنصة عند توفرها
+        self.dynamic_symbols = symbols is None
+        self.symbols = [] if symbols is None else list(symbols)
+        self.timeframes = list(timeframes)
+        self.analyzer = analyzer or CryptoAnalyzer(signal_cache=get_signal_cache())
+        self.store = store or get_default_signal_store()
+        self.limit = limit
+        self.settle = settle
+        self.prefetch = prefetch
+        self.clock = clock
+        self.incremental = incremental and self.analyzer.indicator_params.get('backend') == 'numpy'
+        # {(العملة، الإطار الزمني): IncrementalIndicators} آخر حالة كُتبت إشاراتها
+        self._engines = {}
+        self.max_retries = max_retries
+        # {(العملة، الإطار الزمني): (وقت الإغلاق، عدد المحاولات، وقت المحاولة التالية)}
+        self._retries = {}
+
+    def due_pairs(self, now=None):
+        """
+        (عملة، إطار زمني) التي أُغلقت لها شمعة لم تُمسح بعد
+
+        Returns:
+            dict: {الإطار الزمني: (وقت الإغلاق بالمللي ثانية، [العملات])}
+        """
+        now = self.clock() if now is None else now
+        state = self.store.scan_state()
+        due = {}
+        for timeframe in self.timeframes:
+            close = last_close_ms(timeframe, (now - self.settle) * 1000)
+            symbols = [symbol for symbol in self.symbols if state.get((symbol, timeframe), -1) < close
+                       and not self._waiting(symbol, timeframe, close, now)]
+            if symbols:
+                due[timeframe] = (close, symbols)
+        return due
+
+    def run_once(self, now=None):
+        """
+        مسح كل ما هو مستحق الآن وكتابة النتائج في المخزن
+
+        كل عملة تُجلب مرة واحدة للأطر المستحقة لها فقط، وتُحلل شموعها المغلقة.
+        الزوج الذي لم تنشر المنصة شمعته المغلقة بعد تُكتب إشاراته ويُعاد مسحه بمهلة
+        تتضاعف، ثم يُسجل كممسوح بعد max_retries محاولة.
+
+        Returns:
+            dict: ملخص (pairs, signals, errors, pending, elapsed)
+        """
+        started = time.perf_counter()
+        now = self.clock() if now is None else now
+        if self.dynamic_symbols:
+            self.symbols = list(self.analyzer.data_fetcher.get_available_symbols(block=True))
+        due = self.due_pairs(now)
+        summary = {'pairs': 0, 'signals': 0, 'errors': 0, 'pending': 0, 'elapsed': 0.0}
+        if not due:
+            return summary
+
+        # الأطر المستحقة لكل عملة بترتيب العملات
+        symbol_timeframes = {}
+        for timeframe, (_, symbols) in due.items():
+            for symbol in symbols:
+                symbol_timeframes.setdefault(symbol, []).append(timeframe)
+
+        def fetch(symbol):
+            # شمعة إضافية لأن closed_candles يحذف الشمعة قيد التكوين
+            return self.analyzer.data_fetcher.get_multi_timeframe_data(
+                symbol, symbol_timeframes[symbol], self.limit + 1)
+
+        ordered = [symbol for symbol in self.symbols if symbol in symbol_timeframes]
+        for symbol, frames, error in prefetch_symbols(fetch, ordered, self.prefetch):
+            if error is not None:
+                print(f"خطأ في جلب بيانات {symbol}: {error}")
+                summary['errors'] += 1
+                continue
+
+            scanned = []
+            for timeframe in symbol_timeframes[symbol]:
+                close = due[timeframe][0]
+                # خطأ زوج واحد لا يوقف مسح بقية الأزواج؛ الزوج يبقى مستحقاً
+                try:
+                    df = closed_candles(frames.get(timeframe), close)
+                    indicators = engine = None
+                    if self.incremental and df is not None and not df.empty:
+                        indicators, engine = self._indicators(symbol, timeframe, df)
+                    # قيم الحالة التزايدية تعتمد على تاريخ أطول من df فلا تُشارك في الذاكرة المؤقتة
+                    buffer = self.analyzer.analyze_buffer(symbol, timeframe, df, indicators, cache=engine is None)
+                    summary['signals'] += self.store.write(buffer, self.analyzer.signal_strengths(buffer),
+                                                           windows={(symbol, timeframe): scan_window(df)})
+                    if engine is not None:
+                        self.store.save_indicator_state(symbol, timeframe, engine.to_dict())
+                        self._engines[(symbol, timeframe)] = engine
+                except Exception as e:
+                    print(f"خطأ في مسح {symbol} على {timeframe}: {e}")
+                    summary['errors'] += 1
+                    continue
+                # الشمعة المغلقة لم تصل من المنصة بعد: يُعاد المسح بدلاً من تخطيها
+                if (df is None or df.empty or df.index[-1].value // 1_000_000 != close - timeframe_ms(timeframe)) \
+                        and self._retry_later(symbol, timeframe, close, now):
+                    summary['pending'] += 1
+                    continue
+                self._retries.pop((symbol, timeframe), None)
+                scanned.append((symbol, timeframe, close))
+
+            # يُسجل المسح بعد الكتابة: التوقف بينهما يعني إعادة مسح آمنة فقط
+            self.store.mark_scanned(scanned)
+            summary['pairs'] += len(scanned)
+
+        summary['elapsed'] = time.perf_counter() - started
+        return summary
+
+    def _indicators(self, symbol, timeframe, df):
+        """
+        حاسبة مؤشرات للزوج من حالته التزايدية
+
+        الحالة (من الذاكرة، أو من المخزن بعد إعادة التشغيل) تتقدم بالشموع الجديدة
+        فقط، وتُهيأ من df من جديد إذا لم تتصل بها البيانات.
+
+        Returns:
+            tuple: (TechnicalIndicators بمؤشرات جاهزة، IncrementalIndicators) أو (None، None)
+        """
+        try:
+            engine = self._engines.get((symbol, timeframe))
+            if engine is None:
+                state = self.store.indicator_state(symbol, timeframe)
+                engine = IncrementalIndicators.from_dict(state) if state else None
+
+            frame = engine.history_frame(df.index) if engine is not None and engine.advance(df) else None
+            if frame is None:
+                engine = IncrementalIndicators.from_dataframe(df, keep=max(self.limit, len(df)))
+                frame = engine.history_frame(df.index)
+
+            indicators = TechnicalIndicators(df, self.analyzer.indicator_params['backend'])
+            for name in INDICATOR_COLUMNS:
+                indicators.df[name] = frame[name].values
+            indicators._indicators_ready = True
+            return indicators, engine
+        except Exception as e:
+            print(f"خطأ في تحديث مؤشرات {symbol}: {e}")
+            return None, None
+
+    def _waiting(self, symbol, timeframe, close, now):
+        """هل الزوج في مهلة انتظار شمعة الإغلاق close"""
+        retry = self._retries.get((symbol, timeframe))
+        return retry is not None and retry[0] == close and retry[2] > now
+
+    def _retry_later(self, symbol, timeframe, close, now):
+        """
+        جدولة إعادة مسح زوج لم تصل شمعته المغلقة بمهلة تتضاعف مع كل محاولة
+
+        Returns:
+            bool: False بعد max_retries محاولة (يُسجل الزوج كممسوح مع تحذير)
+        """
+        retry = self._retries.get((symbol, timeframe))
+        attempts = retry[1] + 1 if retry is not None and retry[0] == close else 1
+        if attempts > self.max_retries:
+            self._retries.pop((symbol, timeframe), None)
+            print(f"⚠️ لم تصل شمعة {symbol} على {timeframe} بعد {self.max_retries} محاولات؛ "
+                  f"تُسجل كممسوحة حتى الإغلاق التالي")
+            return False
+        self._retries[(symbol, timeframe)] = (close, attempts, now + max(self.settle, 1.0) * 2 ** (attempts - 1))
+        return True
+
+    def seconds_until_next(self, now=None):
+        """الثواني حتى أقرب إغلاق شمعة قادم (مع فترة الانتظار) أو أقرب إعادة محاولة"""
+        now = self.clock() if now is None else now
+        waits = [retry_at - now for _, _, retry_at in self._retries.values() if retry_at > now]
+        for timeframe in self.timeframes:
+            next_close = last_close_ms(timeframe, (now - self.settle) * 1000) + timeframe_ms(timeframe)
+            waits.append(next_close / 1000 + self.settle - now)
+        return max(0.0, min(waits))
+
+    def run_forever(self, stop=None):
+        """
+        المسح عند كل إغلاق حتى يُطلب التوقف
+
+        Args:
+            stop (threading.Event): إشارة التوقف (الانتظار ينتهي فوراً عند ضبطها)
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                summary = self.run_once()
+                if summary['pairs']:
+                    print(f"✅ تم مسح {summary['pairs']} زوج ({summary['signals']} إشارة) "
+                          f"في {summary['elapsed']:.1f} ثانية")
+            except Exception as e:
+                print(f"خطأ في المسح: {e}")
+            # الأزواج التي تنتظر شمعتها المغلقة تُعاد عند انتهاء مهلتها لا عند الإغلاق التالي
+            stop.wait(self.seconds_until_next())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ماسح إشارات العملات المجدول على إغلاق الشموع')
+    parser.add_argument('--symbols', nargs='*', help='رموز العملات (افتراضياً العملات القيادية)')
+    parser.add_argument('--timeframes', nargs='*', default=['1h', '4h', '1d'], help='الأطر الزمنية')
+    parser.add_argument('--limit', type=int, default=200, help='عدد الشموع لكل إطار')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help='ثواني الانتظار بعد إغلاق الشمعة')
+    parser.add_argument('--once', action='store_true', help='مسح المستحق مرة واحدة ثم الخروج')
+    args = parser.parse_args(argv)
+
+    analyzer = CryptoAnalyzer(signal_cache=get_signal_cache())
+    daemon = ScannerDaemon(args.symbols or None, args.timeframes, analyzer, limit=args.limit, settle=args.settle)
+
+    if args.once:
+        print(daemon.run_once())
+        return
+
+    scope = f"{len(args.symbols)} عملة" if args.symbols else "العملات القيادية في المنصة"
+    print(f"🔍 بدء الماسح: {scope} على {', '.join(args.timeframes)}")
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        print("تم إيقاف الماسح")
+
+
+if __name__ == "__main__":
+    main()
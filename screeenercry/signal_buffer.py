@@ -0,0 +1,340 @@
+"""
+تمثيل عمودي للإشارات بدلاً من قوائم القواميس
+
+كل إشارة صف في مصفوفات NumPy: الوقت (int64 نانوثانية)، نوع الإشارة واتجاهها
+كأكواد فئوية، والقوة كـ float. الوصف النصي لا يُنشأ إلا عند طلبه للصفوف
+المعروضة أو المصدرة.
+"""
+
+import numpy as np
+import pandas as pd
+
+# كل أنواع الإشارات التي تنتجها TechnicalIndicators (الكود = الموقع في القائمة)
+SIGNAL_TYPES = (
+    'rsi_oversold',
+    'rsi_overbought',
+    'rsi_latest_bullish_divergence',
+    'rsi_latest_bearish_divergence',
+    'rsi_simple_bullish_divergence',
+    'rsi_simple_bearish_divergence',
+    'ma_bullish_crossover',
+    'ma_bearish_crossover',
+    'macd_latest_bullish_divergence',
+    'macd_latest_bearish_divergence',
+    'macd_simple_bullish_divergence',
+    'macd_simple_bearish_divergence',
+    'obv_latest_bullish_divergence',
+    'obv_latest_bearish_divergence',
+    'obv_simple_bullish_divergence',
+    'obv_simple_bearish_divergence',
+)
+TYPE_CODES = {name: code for code, name in enumerate(SIGNAL_TYPES)}
+
+SIGNAL_DIRECTIONS = ('شراء', 'بيع')
+BUY, SELL = 0, 1
+
+# قوالب الوصف؛ value هي قيمة المؤشر المخزنة مع الإشارة (مثل RSI)
+DESCRIPTION_TEMPLATES = {
+    'rsi_oversold': 'RSI في منطقة التشبع البيعي ({value:.1f})',
+    'rsi_overbought': 'RSI في منطقة التشبع الشرائي ({value:.1f})',
+    'ma_bullish_crossover': 'MA9 تقطع MA20 صعودياً',
+    'ma_bearish_crossover': 'MA9 تقطع MA20 هبوطياً',
+    'rsi_simple_bullish_divergence': 'RSI دايفرجنس شراء',
+    'rsi_simple_bearish_divergence': 'RSI دايفرجنس بيع',
+    'macd_simple_bullish_divergence': 'MACD دايفرجنس شراء',
+    'macd_simple_bearish_divergence': 'MACD دايفرجنس بيع',
+    'obv_simple_bullish_divergence': 'OBV دايفرجنس شراء',
+    'obv_simple_bearish_divergence': 'OBV دايفرجنس بيع',
+}
+
+_COLUMNS = {
+    'timestamp': np.int64,
+    'type': np.int16,
+    'signal': np.int8,
+    'strength': np.float64,
+    'value': np.float64,
+    'raw_strength': np.float64,
+    'symbol': np.int32,
+    'timeframe': np.int32,
+    'current_price': np.float64,
+}
+
+
+class SignalBuffer:
+    def __init__(self, tz=None):
+        """
+        مخزن عمودي للإشارات
+
+        Args:
+            tz: المنطقة الزمنية لفهرس البيانات (None للأوقات بدون منطقة)
+        """
+        self.tz = tz
+        self.symbols = []
+        self.timeframes = []
+        self._chunks = {name: [] for name in _COLUMNS}
+        self._columns = None
+        # أوصاف جاهزة لصفوف قليلة لا يمكن بناؤها من قالب (دايفرجنس الشمعة الأخيرة)
+        self._texts = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """الحجم التقريبي بالبايت (للذاكرة المؤقتة)"""
+        return sum(column.nbytes for column in self.columns().values()) + \
+            sum(len(text.encode()) for text in self._texts.values())
+
+    def append(self, timestamps, signal_type, signal, strength, value=np.nan, raw_strength=np.nan):
+        """
+        إضافة مجموعة إشارات من نفس النوع دفعة واحدة
+
+        Args:
+            timestamps: أوقات الإشارات (DatetimeIndex أو int64 بالنانوثانية)
+            signal_type: نوع الإشارة (أو مصفوفة أكواد من TYPE_CODES)
+            signal: BUY أو SELL (أو مصفوفة أكواد)
+            strength: قوة الإشارة (قيمة أو مصفوفة)
+            value: قيمة المؤشر المستخدمة في الوصف
+            raw_strength: القوة الخام قبل التطبيع (لدايفرجنس الشمعة الأخيرة)
+        """
+        if isinstance(timestamps, pd.DatetimeIndex):
+            timestamps = timestamps.as_unit('ns').asi8
+        timestamps = np.asarray(timestamps, dtype=np.int64).reshape(-1)
+        count = len(timestamps)
+        if count == 0:
+            return
+
+        values = {
+            'timestamp': timestamps,
+            'type': TYPE_CODES[signal_type] if isinstance(signal_type, str) else signal_type,
+            'signal': signal,
+            'strength': strength,
+            'value': value,
+            'raw_strength': raw_strength,
+            'symbol': -1,
+            'timeframe': -1,
+            'current_price': np.nan,
+        }
+        for name, dtype in _COLUMNS.items():
+            self._chunks[name].append(np.broadcast_to(np.asarray(values[name], dtype=dtype), count))
+        self._columns = None
+        self._size += count
+
+    def append_records(self, records):
+        """إضافة إشارات بصيغة القواميس (مع أوصافها الجاهزة)"""
+        for record in records:
+            row = self._size
+            timestamp = pd.Timestamp(record['timestamp'])
+            if timestamp.tzinfo is not None:
+                self.tz = timestamp.tzinfo
+            self.append(
+                [timestamp.as_unit('ns').value],
+                record['type'],
+                SIGNAL_DIRECTIONS.index(record['signal']),
+                record.get('strength_percentage', np.nan),
+                raw_strength=record.get('strength', np.nan),
+            )
+            self._texts[row] = record['description']
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        بناء مخزن من قائمة قواميس (مع symbol و timeframe و current_price إن وجدت)
+        """
+        buffer = cls()
+        contexts = []
+        for record in records:
+            buffer.append_records([record])
+            contexts.append((record.get('symbol'), record.get('timeframe'), record.get('current_price', np.nan)))
+
+        if any(symbol is not None for symbol, _, _ in contexts):
+            columns = buffer.columns()
+            buffer.symbols = list(dict.fromkeys(symbol for symbol, _, _ in contexts))
+            buffer.timeframes = list(dict.fromkeys(timeframe for _, timeframe, _ in contexts))
+            symbol_codes = {symbol: code for code, symbol in enumerate(buffer.symbols)}
+            timeframe_codes = {timeframe: code for code, timeframe in enumerate(buffer.timeframes)}
+            columns['symbol'] = np.array([symbol_codes[s] for s, _, _ in contexts], dtype=np.int32)
+            columns['timeframe'] = np.array([timeframe_codes[t] for _, t, _ in contexts], dtype=np.int32)
+            columns['current_price'] = np.array([p for _, _, p in contexts], dtype=np.float64)
+        return buffer
+
+    @classmethod
+    def from_columns(cls, timestamps, types, signals, strength, symbols, timeframes,
+                     current_price=np.nan, descriptions=None, tz=None, values=np.nan):
+        """
+        بناء مخزن من أعمدة نصية (مثلاً صفوف قاعدة بيانات)
+
+        Args:
+            timestamps: الأوقات بالنانوثانية
+            types: أسماء أنواع الإشارات
+            signals: اتجاهات الإشارات (شراء/بيع)
+            strength: قوة الإشارة
+            symbols: العملة لكل صف
+            timeframes: الإطار الزمني لكل صف
+            current_price: السعر الحالي لكل صف
+            descriptions: أوصاف جاهزة لكل صف، أو قاموس {الصف: الوصف} للصفوف التي لا قالب لها
+                (None لإنشائها كلها من القوالب)
+            tz: المنطقة الزمنية
+            values: قيمة المؤشر المستخدمة في أوصاف القوالب
+        """
+        buffer = cls(tz)
+        directions = {direction: code for code, direction in enumerate(SIGNAL_DIRECTIONS)}
+        buffer.append(
+            timestamps,
+            np.array([TYPE_CODES[name] for name in types], dtype=np.int16),
+            np.array([directions[signal] for signal in signals], dtype=np.int8),
+            strength,
+            value=values,
+        )
+        columns = buffer.columns()
+        symbol_codes, buffer.symbols = pd.factorize(pd.Series(symbols, dtype=object))
+        timeframe_codes, buffer.timeframes = pd.factorize(pd.Series(timeframes, dtype=object))
+        buffer.symbols, buffer.timeframes = list(buffer.symbols), list(buffer.timeframes)
+        columns['symbol'] = symbol_codes.astype(np.int32)
+        columns['timeframe'] = timeframe_codes.astype(np.int32)
+        columns['current_price'] = np.broadcast_to(np.asarray(current_price, dtype=np.float64), len(buffer)).copy()
+        if isinstance(descriptions, dict):
+            buffer._texts = dict(descriptions)
+        elif descriptions is not None:
+            buffer._texts = dict(enumerate(descriptions))
+        return buffer
+
+    def columns(self):
+        """الأعمدة كمصفوفات متصلة (تُدمج الأجزاء مرة واحدة)"""
+        if self._columns is None:
+            self._columns = {
+                name: np.concatenate(chunks) if chunks else np.empty(0, dtype=_COLUMNS[name])
+                for name, chunks in self._chunks.items()
+            }
+            self._chunks = {name: [column] for name, column in self._columns.items()}
+        return self._columns
+
+    def with_context(self, symbol, timeframe, current_price):
+        """تحديد العملة والإطار الزمني والسعر الحالي لكل الصفوف"""
+        columns = self.columns()
+        self.symbols = [symbol]
+        self.timeframes = [timeframe]
+        columns['symbol'] = np.zeros(self._size, dtype=np.int32)
+        columns['timeframe'] = np.zeros(self._size, dtype=np.int32)
+        columns['current_price'] = np.full(self._size, current_price, dtype=np.float64)
+        self._chunks = {name: [column] for name, column in columns.items()}
+        return self
+
+    def take(self, rows):
+        """مخزن جديد بالصفوف المحددة وبترتيبها"""
+        rows = np.asarray(rows, dtype=np.int64)
+        result = SignalBuffer(self.tz)
+        result.symbols = self.symbols
+        result.timeframes = self.timeframes
+        result._columns = {name: column[rows] for name, column in self.columns().items()}
+        result._chunks = {name: [column] for name, column in result._columns.items()}
+        result._size = len(rows)
+        if self._texts:
+            positions = np.full(self._size, -1, dtype=np.int64)
+            positions[rows] = np.arange(len(rows))
+            result._texts = {int(positions[old]): text for old, text in self._texts.items() if positions[old] >= 0}
+        return result
+
+    def sort_by_time(self, descending=True):
+        """ترتيب ثابت حسب الوقت (الصفوف المتساوية تحتفظ بترتيب إضافتها)"""
+        timestamps = self.columns()['timestamp']
+        order = np.argsort(-timestamps if descending else timestamps, kind='stable')
+        return self.take(order)
+
+    @classmethod
+    def concat(cls, buffers):
+        """دمج عدة مخازن مع توحيد فئات العملات والأطر الزمنية"""
+        result = cls()
+        symbol_codes, timeframe_codes = {}, {}
+        for buffer in buffers:
+            if not len(buffer):
+                continue
+            if result.tz is None:
+                result.tz = buffer.tz
+            columns = dict(buffer.columns())
+            for name, categories, codes in (('symbol', buffer.symbols, symbol_codes),
+                                            ('timeframe', buffer.timeframes, timeframe_codes)):
+                mapping = np.array([codes.setdefault(category, len(codes)) for category in categories] or [-1],
+                                   dtype=np.int32)
+                columns[name] = np.where(columns[name] >= 0, mapping[columns[name]], -1).astype(np.int32)
+            offset = result._size
+            for name in _COLUMNS:
+                result._chunks[name].append(columns[name])
+            result._texts.update({offset + row: text for row, text in buffer._texts.items()})
+            result._size += len(buffer)
+        result.symbols = list(symbol_codes)
+        result.timeframes = list(timeframe_codes)
+        return result
+
+    def timestamps(self):
+        """الأوقات كـ DatetimeIndex"""
+        index = pd.DatetimeIndex(self.columns()['timestamp'].astype('datetime64[ns]'))
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return index
+
+    def describe(self, rows=None):
+        """
+        إنشاء الأوصاف النصية للصفوف المطلوبة فقط
+
+        Args:
+            rows: مواقع الصفوف (افتراضياً كل الصفوف)
+
+        Returns:
+            list: الأوصاف بنفس ترتيب الصفوف
+        """
+        columns = self.columns()
+        rows = range(self._size) if rows is None else np.asarray(rows).tolist()
+        descriptions = []
+        for row in rows:
+            text = self._texts.get(row)
+            if text is None:
+                template = DESCRIPTION_TEMPLATES.get(SIGNAL_TYPES[columns['type'][row]], '')
+                text = template.format(value=columns['value'][row])
+            descriptions.append(text)
+        return descriptions
+
+    def to_records(self):
+        """الإشارات كقائمة قواميس بنفس صيغة get_all_signals"""
+        columns = self.columns()
+        timestamps = self.timestamps()
+        descriptions = self.describe()
+        records = []
+        for row in range(self._size):
+            record = {
+                'type': SIGNAL_TYPES[columns['type'][row]],
+                'timestamp': timestamps[row],
+                'signal': SIGNAL_DIRECTIONS[columns['signal'][row]],
+                'description': descriptions[row],
+            }
+            if not np.isnan(columns['raw_strength'][row]):
+                record['strength'] = columns['raw_strength'][row]
+            record['strength_percentage'] = columns['strength'][row]
+            if columns['symbol'][row] >= 0:
+                record['symbol'] = self.symbols[columns['symbol'][row]]
+                record['timeframe'] = self.timeframes[columns['timeframe'][row]]
+                record['current_price'] = columns['current_price'][row]
+            records.append(record)
+        return records
+
+    def to_frame(self, descriptions=True):
+        """
+        جدول pandas بأعمدة مكتوبة النوع (فئات للنوع والاتجاه والعملة والإطار)
+
+        Args:
+            descriptions (bool): إضافة عمود الوصف
+        """
+        columns = self.columns()
+        frame = pd.DataFrame({
+            'timestamp': self.timestamps(),
+            'type': pd.Categorical.from_codes(columns['type'], categories=SIGNAL_TYPES),
+            'signal': pd.Categorical.from_codes(columns['signal'], categories=SIGNAL_DIRECTIONS),
+            'strength_percentage': columns['strength'],
+            'symbol': pd.Categorical.from_codes(columns['symbol'], categories=self.symbols),
+            'timeframe': pd.Categorical.from_codes(columns['timeframe'], categories=self.timeframes),
+            'current_price': columns['current_price'],
+        })
+        if descriptions:
+            frame['description'] = self.describe()
+        return frame
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 ميجابايت في الذاكرة
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+
+# الملفات التي تحدد نتائج التحليل: أي تعديل فيها يغير مفاتيح الذاكرة المؤقتة
+# (المحرك العادي، مصفوفة العملات، والمؤشرات التزايدية في الخدمة الخلفية)
+VERSIONED_MODULES = (
+    'indicators.py', 'indicator_kernels.py', 'indicator_panel.py',
+    'streaming_indicators.py', 'signal_buffer.py',
+)
+
+
+def _code_version():
+    """بصمة مصدر كود التحليل (تُلغي النتائج المخزنة عند تحديث الكود)"""
+    digest = hashlib.blake2b(digest_size=8)
+    for name in VERSIONED_MODULES:
+        try:
+            with open(os.path.join(_MODULE_DIR, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def data_fingerprint(df):
+    """
+    بصمة بيانات OHLCV: وقت آخر شمعة مع hash لكل القيم
+
+    الشمعة الأخيرة قد تكون قيد التكوين، لذلك تدخل كل القيم في البصمة وليس
+    الوقت وحده؛ أي تغير في سعرها يعطي مفتاحاً جديداً.
+
+    Returns:
+        tuple: (وقت آخر شمعة بالنانوثانية، عدد الشموع، hash)
+    """
+    index = pd.DatetimeIndex(df.index)
+    digest = hashlib.blake2b(index.as_unit('ns').asi8.tobytes(), digest_size=16)
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    digest.update(str(index.tz).encode())
+    return int(index.as_unit('ns').asi8[-1]), len(df), digest.hexdigest()
+
+
+def cache_key(symbol, timeframe, df, params=None):
+    """
+    مفتاح نتائج التحليل
+
+    Args:
+        symbol (str): رمز العملة
+        timeframe (str): الإطار الزمني
+        df (pd.DataFrame): بيانات OHLCV
+        params (dict): إعدادات المؤشرات (مثل المحرك)
+
+    Returns:
+        tuple: (العملة، الإطار، وقت آخر شمعة، بصمة البيانات، الإعدادات، إصدار الكود)
+    """
+    last_timestamp, length, digest = data_fingerprint(df)
+    params = tuple(sorted((params or {}).items()))
+    return (symbol, timeframe, last_timestamp, f"{length}:{digest}", params, CODE_VERSION)
+
+
+def _sizeof(value):
+    """حجم القيمة التقريبي بالبايت"""
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class SignalCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        ذاكرة مؤقتة LRU لنتائج التحليل محدودة بالحجم مع طبقة اختيارية على القرص
+
+        Args:
+            max_bytes (int): أقصى حجم للنتائج في الذاكرة
+            directory (str): مجلد طبقة القرص (None للذاكرة فقط)
+            max_disk_bytes (int): أقصى حجم لملفات القرص (الأقدم يُحذف أولاً)
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """حجم النتائج المخزنة في الذاكرة"""
+        return self._bytes
+
+    def get(self, key):
+        """
+        النتيجة المخزنة للمفتاح (من الذاكرة ثم القرص) أو None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        value = self._load_from_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        """تخزين نتيجة في الذاكرة وعلى القرص"""
+        with self._lock:
+            self._store(key, value)
+        self._save_to_disk(key, value)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """النتيجة المخزنة أو حسابها بـ compute() وتخزينها"""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        """مسح الذاكرة (ملفات القرص تبقى)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, key, value):
+        """إضافة للذاكرة مع حذف الأقدم استخداماً عند تجاوز الحجم (تحت القفل)"""
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def _path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.pkl")
+
+    def _load_from_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"خطأ في قراءة ذاكرة الإشارات المؤقتة: {e}")
+            return None
+        if stored_key != key:
+            return None
+        try:
+            # تحديث وقت الاستخدام لحذف الأقدم استخداماً أولاً
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _save_to_disk(self, key, value):
+        """كتابة الملف بشكل ذري ثم حذف الأقدم عند تجاوز الحجم"""
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except Exception as e:
+            print(f"خطأ في حفظ ذاكرة الإشارات المؤقتة: {e}")
+
+    def _prune_disk(self):
+        files = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pkl')]
+        stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in files]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_signal_cache = None
+_signal_cache_lock = threading.Lock()
+
+
+def get_signal_cache():
+    """الذاكرة المؤقتة المشتركة لنتائج التحليل داخل نفس البرنامج (وبين جلسات Streamlit)"""
+    global _signal_cache
+    with _signal_cache_lock:
+        if _signal_cache is None:
+            _signal_cache = SignalCache(
+                int(os.environ.get('SIGNAL_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+                os.environ.get('SIGNAL_CACHE_DIR') or None,
+                int(os.environ.get('SIGNAL_CACHE_MAX_DISK_BYTES', DEFAULT_MAX_DISK_BYTES)),
+            )
+        return _signal_cache
@@ -0,0 +1,337 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from signal_buffer import SIGNAL_DIRECTIONS, SIGNAL_TYPES, SignalBuffer
+
+DEFAULT_SIGNAL_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'signals.sqlite')
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def scan_window(df):
+    """
+    نافذة الشموع التي حُللت في df بصيغة SignalStore.write
+
+    Returns:
+        tuple: (أول شمعة، آخر شمعة) بالمللي ثانية UTC، أو None لبيانات فارغة
+    """
+    if df is None or df.empty:
+        return None
+    return df.index[0].value // 1_000_000, df.index[-1].value // 1_000_000
+
+
+def get_default_signal_store():
+    """مخزن الإشارات المشترك داخل نفس البرنامج"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SignalStore(os.environ.get('SIGNAL_STORE_PATH', DEFAULT_SIGNAL_STORE_PATH))
+        return _default_store
+
+
+class SignalStore:
+    def __init__(self, path=DEFAULT_SIGNAL_STORE_PATH):
+        """
+        مخزن محلي للإشارات (SQLite) يكتب فيه الماسح ويقرأ منه التطبيق
+
+        كل إشارة صف واحد لكل (العملة، الإطار الزمني، النوع، وقت الشمعة)؛ إعادة
+        المسح تحدّث الصف بدلاً من تكراره. المفتاح الأساسي يخدم الاستعلام حسب
+        (العملة، الإطار الزمني)، وفهرسان إضافيان للوقت والنوع.
+
+        Args:
+            path (str): مسار ملف قاعدة البيانات (':memory:' للتخزين في الذاكرة)
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS signals (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    signal TEXT NOT NULL,
+                    strength REAL,
+                    ts INTEGER NOT NULL,
+                    detected_at INTEGER NOT NULL,
+                    description TEXT,
+                    current_price REAL,
+                    value REAL,
+                    PRIMARY KEY (symbol, timeframe, type, ts)
+                ) WITHOUT ROWID
+            ''')
+            # قواعد أنشأتها نسخة أقدم بدون عمود قيمة المؤشر
+            if 'value' not in [row[1] for row in self._conn.execute('PRAGMA table_info(signals)')]:
+                self._conn.execute('ALTER TABLE signals ADD COLUMN value REAL')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS signals_ts ON signals (ts)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS signals_type ON signals (type, ts)')
+            # آخر شمعة مغلقة تم مسحها لكل (عملة، إطار زمني)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS scan_state (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    last_close INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, timeframe)
+                ) WITHOUT ROWID
+            ''')
+            # علامة الماء العالي للمسح التزايدي: آخر شمعة أُرسلت إشاراتها وأنواع الإشارات عليها
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS delta_marks (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    mark INTEGER NOT NULL,
+                    types TEXT NOT NULL,
+                    PRIMARY KEY (symbol, timeframe)
+                ) WITHOUT ROWID
+            ''')
+            # حالة المؤشرات التزايدية (IncrementalIndicators.to_dict بصيغة JSON) للماسح
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (symbol, timeframe)
+                ) WITHOUT ROWID
+            ''')
+            self._conn.commit()
+
+    def write(self, buffer, strength, detected_at=None, windows=None):
+        """
+        إضافة الإشارات أو تحديثها
+
+        الإشارة الموجودة مسبقاً تُحدّث مع الإبقاء على وقت اكتشافها الأول. إشارات
+        نوافذ windows التي لم تعد في buffer (اختفت عند إعادة المسح) تُحذف في نفس
+        المعاملة.
+
+        Args:
+            buffer (SignalBuffer): الإشارات مع العملة والإطار الزمني
+            strength (np.ndarray): قوة الإشارة النهائية لكل صف
+            detected_at (float): وقت الاكتشاف بالثواني (افتراضياً الآن)
+            windows (dict): {(العملة، الإطار الزمني): (أول شمعة، آخر شمعة) بالمللي ثانية}
+                للشموع التي أُعيد مسحها (انظر scan_window)
+
+        Returns:
+            int: عدد الصفوف المكتوبة
+        """
+        windows = {pair: window for pair, window in (windows or {}).items() if window is not None}
+        if not len(buffer) and not windows:
+            return 0
+
+        columns = buffer.columns()
+        detected_at = int((time.time() if detected_at is None else detected_at) * 1000)
+        # الأوقات تُخزن بالمللي ثانية (UTC لبيانات المنصة)
+        timestamps = columns['timestamp'] // 1_000_000
+        # تُخزن قيمة المؤشر وتُنشأ الأوصاف عند العرض؛ النص يُخزن فقط للصفوف التي لا قالب لها
+        descriptions = [None] * len(buffer)
+        for row, text in buffer._texts.items():
+            descriptions[row] = text
+        rows = list(zip(
+            np.asarray(buffer.symbols, dtype=object)[columns['symbol']].tolist(),
+            np.asarray(buffer.timeframes, dtype=object)[columns['timeframe']].tolist(),
+            np.asarray(SIGNAL_TYPES, dtype=object)[columns['type']].tolist(),
+            np.asarray(SIGNAL_DIRECTIONS, dtype=object)[columns['signal']].tolist(),
+            np.asarray(strength, dtype=float).tolist(),
+            timestamps.tolist(),
+            [detected_at] * len(buffer),
+            descriptions,
+            columns['current_price'].tolist(),
+            columns['value'].tolist(),
+        ))
+        with self._lock:
+            try:
+                if windows:
+                    keep = {(row[0], row[1], row[2], row[5]) for row in rows}
+                    stale = []
+                    for (symbol, timeframe), (first, last) in windows.items():
+                        stale.extend(
+                            (symbol, timeframe, signal_type, ts) for signal_type, ts in self._conn.execute(
+                                'SELECT type, ts FROM signals WHERE symbol = ? AND timeframe = ? '
+                                'AND ts BETWEEN ? AND ?', (symbol, timeframe, int(first), int(last)))
+                            if (symbol, timeframe, signal_type, ts) not in keep
+                        )
+                    self._conn.executemany(
+                        'DELETE FROM signals WHERE symbol = ? AND timeframe = ? AND type = ? AND ts = ?', stale)
+                self._conn.executemany(
+                    'INSERT INTO signals (symbol, timeframe, type, signal, strength, ts, detected_at, '
+                    'description, current_price, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (symbol, timeframe, type, ts) DO UPDATE SET signal = excluded.signal, '
+                    'strength = excluded.strength, description = excluded.description, '
+                    'current_price = excluded.current_price, value = excluded.value', rows)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return len(rows)
+
+    @staticmethod
+    def _where(symbols=None, timeframes=None, types=None, signal=None, since=None, until=None):
+        """شروط الاستعلام ومعاملاتها (الأوقات بالمللي ثانية)"""
+        clauses, params = [], []
+        for column, values in (('symbol', symbols), ('timeframe', timeframes), ('type', types)):
+            if values is not None:
+                values = list(values)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else '0')
+                params.extend(values)
+        if signal is not None:
+            clauses.append('signal = ?')
+            params.append(signal)
+        if since is not None:
+            clauses.append('ts >= ?')
+            params.append(int(since))
+        if until is not None:
+            clauses.append('ts <= ?')
+            params.append(int(until))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, symbols=None, timeframes=None, types=None, signal=None, since=None, until=None):
+        """
+        قراءة الإشارات المطابقة للفلاتر
+
+        Args:
+            symbols (list): العملات (None للكل)
+            timeframes (list): الأطر الزمنية (None للكل)
+            types (list): أنواع الإشارات (None للكل)
+            signal (str): شراء أو بيع
+            since (int): أقدم وقت شمعة بالمللي ثانية
+            until (int): أحدث وقت شمعة بالمللي ثانية
+
+        Returns:
+            SignalBuffer: الإشارات مع قوتها المخزنة (الأوصاف تُنشأ عند العرض)
+        """
+        where, params = self._where(symbols, timeframes, types, signal, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT ts, type, signal, strength, symbol, timeframe, current_price, value, description '
+                f'FROM signals{where}', params
+            ).fetchall()
+
+        columns = list(zip(*rows)) or [[]] * 9
+        return SignalBuffer.from_columns(
+            np.asarray(columns[0], dtype=np.int64) * 1_000_000,
+            columns[1], columns[2],
+            np.asarray(columns[3], dtype=float),
+            columns[4], columns[5],
+            np.asarray(columns[6], dtype=float),
+            {row: text for row, text in enumerate(columns[8]) if text is not None},
+            values=np.asarray(columns[7], dtype=float),
+        )
+
+    def summary(self, symbols=None, timeframes=None, since=None, top=5):
+        """
+        إحصائيات الإشارات المخزنة بدون قراءة الصفوف
+
+        Returns:
+            dict: total, signals {الاتجاه: العدد}, symbols (الأكثر نشاطاً), types {النوع: العدد}
+        """
+        where, params = self._where(symbols, timeframes, since=since)
+        with self._lock:
+            directions = self._conn.execute(
+                f'SELECT signal, COUNT(*) FROM signals{where} GROUP BY signal', params).fetchall()
+            active = self._conn.execute(
+                f'SELECT symbol, COUNT(*) AS n FROM signals{where} GROUP BY symbol ORDER BY n DESC, symbol LIMIT ?',
+                params + [top]).fetchall()
+            types = self._conn.execute(
+                f'SELECT type, COUNT(*) AS n FROM signals{where} GROUP BY type ORDER BY n DESC, type', params).fetchall()
+        directions = dict(directions)
+        return {
+            'total': sum(directions.values()),
+            'signals': directions,
+            'symbols': dict(active),
+            'types': dict(types),
+        }
+
+    def scan_state(self):
+        """
+        آخر شمعة مغلقة تم مسحها
+
+        Returns:
+            dict: {(العملة، الإطار الزمني): وقت الإغلاق بالمللي ثانية}
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT symbol, timeframe, last_close FROM scan_state').fetchall()
+        return {(symbol, timeframe): last_close for symbol, timeframe, last_close in rows}
+
+    def mark_scanned(self, pairs):
+        """
+        تسجيل انتهاء مسح (عملة، إطار زمني) حتى إغلاق معين
+
+        Args:
+            pairs (list): قائمة (العملة، الإطار الزمني، وقت الإغلاق بالمللي ثانية)
+        """
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO scan_state VALUES (?, ?, ?)',
+                [(symbol, timeframe, int(last_close)) for symbol, timeframe, last_close in pairs]
+            )
+            self._conn.commit()
+
+    def high_water_marks(self):
+        """
+        علامات الماء العالي للمسح التزايدي
+
+        Returns:
+            dict: {(العملة، الإطار الزمني): (وقت الشمعة بالمللي ثانية، [أنواع الإشارات المرسلة عليها])}
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT symbol, timeframe, mark, types FROM delta_marks').fetchall()
+        return {(symbol, timeframe): (mark, types.split(',') if types else [])
+                for symbol, timeframe, mark, types in rows}
+
+    def set_high_water_marks(self, marks):
+        """
+        حفظ علامات الماء العالي
+
+        Args:
+            marks (list): قائمة (العملة، الإطار الزمني، وقت الشمعة بالمللي ثانية، [الأنواع])
+        """
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO delta_marks VALUES (?, ?, ?, ?)',
+                [(symbol, timeframe, int(mark), ','.join(types)) for symbol, timeframe, mark, types in marks]
+            )
+            self._conn.commit()
+
+    def indicator_state(self, symbol, timeframe):
+        """
+        حالة المؤشرات التزايدية المحفوظة
+
+        Returns:
+            dict: قاموس IncrementalIndicators.to_dict أو None إذا لم تُحفظ
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT state FROM indicator_state WHERE symbol = ? AND timeframe = ?', (symbol, timeframe)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_indicator_state(self, symbol, timeframe, state):
+        """
+        حفظ حالة المؤشرات التزايدية (تستبدل الحالة السابقة)
+
+        Args:
+            state (dict): قاموس IncrementalIndicators.to_dict
+        """
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO indicator_state VALUES (?, ?, ?)',
+                               (symbol, timeframe, json.dumps(state)))
+            self._conn.commit()
+
+    def count(self):
+        """عدد الإشارات المخزنة"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM signals').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
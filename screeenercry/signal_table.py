@@ -0,0 +1,159 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from signal_buffer import SIGNAL_DIRECTIONS
+
+# أعمدة جدول العرض بالترتيب
+DISPLAY_COLUMNS = ['العملة', 'الإطار الزمني', 'نوع الإشارة', 'المؤشر',
+                   'قوة الإشارة', 'وقت الإشارة', 'الوصف', 'السعر الحالي']
+
+
+class SignalTable:
+    def __init__(self, frame, describe):
+        """
+        جدول إشارات مكتوب النوع ومفهرس بالوقت للفلترة السريعة
+
+        Args:
+            frame (pd.DataFrame): مفهرس بوقت الإشارة (تصاعدياً) وبأعمدة فئوية
+                symbol و timeframe و signal و indicator، وعمودي strength و current_price
+                وعمود row لموقع الصف في مصدر الأوصاف
+            describe (callable): تعيد أوصاف مواقع row المطلوبة
+        """
+        self.frame = frame
+        self._describe = describe
+        # نسخ NumPy للفلترة بدون المرور على pandas
+        self._timestamps = frame.index.to_numpy()
+        self._codes = {name: frame[name].cat.codes.to_numpy() for name in ('symbol', 'timeframe', 'signal', 'indicator')}
+
+    @classmethod
+    def from_buffer(cls, buffer, strength, labels):
+        """
+        بناء الجدول من مخزن إشارات عمودي
+
+        Args:
+            buffer (SignalBuffer): الإشارات مرتبة بالأحدث أولاً
+            strength (np.ndarray): قوة الإشارة النهائية لكل صف
+            labels (np.ndarray): اسم المؤشر المعروض لكل كود نوع إشارة
+        """
+        columns = buffer.columns()
+        # الجدول تصاعدي بالوقت: عكس ترتيب العرض يحافظ على ترتيب الصفوف المتساوية عند العرض
+        order = np.arange(len(buffer))[::-1]
+        timestamps = buffer.timestamps()
+        if timestamps.tz is not None:
+            # وقت الإشارة يُعرض ويُقارن بالتوقيت المحلي للبيانات (مثل الجدول المنسق)
+            timestamps = timestamps.tz_localize(None)
+
+        label_categories = pd.unique(labels)
+        label_codes = pd.Categorical(labels, categories=label_categories).codes
+
+        frame = pd.DataFrame({
+            'symbol': pd.Categorical.from_codes(columns['symbol'][order], categories=buffer.symbols),
+            'timeframe': pd.Categorical.from_codes(columns['timeframe'][order], categories=buffer.timeframes),
+            'signal': pd.Categorical.from_codes(columns['signal'][order], categories=SIGNAL_DIRECTIONS),
+            'indicator': pd.Categorical.from_codes(label_codes[columns['type'][order]], categories=label_categories),
+            'strength': np.asarray(strength, dtype=float)[order],
+            'current_price': columns['current_price'][order],
+            'row': order,
+        }, index=pd.DatetimeIndex(timestamps[order], name='timestamp'))
+        return cls(frame, buffer.describe)
+
+    @classmethod
+    def from_display(cls, signals_df):
+        """بناء الجدول من جدول عرض منسق (تُحلل أوقات الإشارات مرة واحدة)"""
+        timestamps = pd.to_datetime(signals_df['وقت الإشارة']).to_numpy()
+        # ترتيب ثابت تصاعدي مع الحفاظ على ترتيب الجدول للصفوف المتساوية عند العرض
+        order = np.argsort(timestamps[::-1], kind='stable')
+        order = len(timestamps) - 1 - order
+        descriptions = signals_df['الوصف'].to_numpy(dtype=object)
+
+        frame = pd.DataFrame({
+            'symbol': pd.Categorical(signals_df['العملة'].to_numpy(dtype=object)[order]),
+            'timeframe': pd.Categorical(signals_df['الإطار الزمني'].to_numpy(dtype=object)[order]),
+            'signal': pd.Categorical(signals_df['نوع الإشارة'].to_numpy(dtype=object)[order]),
+            'indicator': pd.Categorical(signals_df['المؤشر'].to_numpy(dtype=object)[order]),
+            'strength': pd.to_numeric(signals_df['قوة الإشارة']).to_numpy(dtype=float)[order],
+            'current_price': pd.to_numeric(signals_df['السعر الحالي']).to_numpy(dtype=float)[order],
+            'row': order,
+        }, index=pd.DatetimeIndex(timestamps[order], name='timestamp'))
+        return cls(frame, lambda rows: descriptions[np.asarray(rows, dtype=int)].tolist())
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def empty(self):
+        return len(self.frame) == 0
+
+    def _category_mask(self, column, selected, rows):
+        """قناع الصفوف التي تنتمي فئتها إلى الأكواد المحددة"""
+        categories = self.frame[column].cat.categories
+        codes = np.flatnonzero([selected(category) for category in categories])
+        return np.isin(self._codes[column][rows], codes)
+
+    def select(self, symbol=None, signal=None, indicator=None, since=None, until=None):
+        """
+        مواقع الصفوف المطابقة للفلاتر (تصاعدياً بالوقت)
+
+        Args:
+            symbol (str): العملة
+            signal (str): نوع الإشارة (شراء/بيع)
+            indicator (str): نمط يُبحث عنه في اسم المؤشر (مثل RSI)
+            since: أول دقيقة مسموحة (مقارنة بوقت الإشارة مقرباً للدقيقة)
+            until: آخر وقت مسموح
+
+        Returns:
+            np.ndarray: مواقع الصفوف
+        """
+        # فلتر الوقت: بحث ثنائي في الفهرس المرتب
+        start, stop = 0, len(self._timestamps)
+        if since is not None:
+            # الوقت المعروض مقرب للدقيقة، لذلك الحد الأدنى هو الدقيقة التالية للحد
+            since = pd.Timestamp(since).ceil('min').to_datetime64()
+            start = np.searchsorted(self._timestamps, since, side='left')
+        if until is not None:
+            stop = np.searchsorted(self._timestamps, pd.Timestamp(until).to_datetime64(), side='right')
+        rows = np.arange(start, max(start, stop))
+
+        # باقي الفلاتر: أقنعة على أكواد الفئات
+        mask = np.ones(len(rows), dtype=bool)
+        if symbol is not None:
+            mask &= self._category_mask('symbol', lambda category: category == symbol, rows)
+        if signal is not None:
+            mask &= self._category_mask('signal', lambda category: category == signal, rows)
+        if indicator is not None:
+            pattern = re.compile(indicator)
+            mask &= self._category_mask('indicator', lambda category: bool(pattern.search(category)), rows)
+        return rows[mask]
+
+    def take(self, rows):
+        """جدول جديد بالصفوف المحددة"""
+        return SignalTable(self.frame.iloc[np.sort(np.asarray(rows, dtype=int))], self._describe)
+
+    def to_display(self, rows=None):
+        """
+        تنسيق الصفوف للعرض (الأحدث أولاً) - الخطوة الأخيرة فقط
+
+        Args:
+            rows: مواقع الصفوف (افتراضياً كل الصفوف)
+
+        Returns:
+            pd.DataFrame: جدول العرض بأعمدة DISPLAY_COLUMNS
+        """
+        rows = np.arange(len(self.frame)) if rows is None else np.sort(np.asarray(rows, dtype=int))
+        if not len(rows):
+            return pd.DataFrame(columns=DISPLAY_COLUMNS)
+        rows = rows[::-1]
+
+        selected = self.frame.iloc[rows]
+        return pd.DataFrame({
+            'العملة': selected['symbol'].astype(object).to_numpy(),
+            'الإطار الزمني': selected['timeframe'].astype(object).to_numpy(),
+            'نوع الإشارة': selected['signal'].astype(object).to_numpy(),
+            'المؤشر': selected['indicator'].astype(object).to_numpy(),
+            'قوة الإشارة': selected['strength'].to_numpy(),
+            'وقت الإشارة': selected.index.strftime('%Y-%m-%d %H:%M'),
+            'الوصف': self._describe(selected['row'].to_numpy()),
+            'السعر الحالي': selected['current_price'].round(4).to_numpy(),
+        })
@@ -0,0 +1,288 @@
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = ['rsi', 'macd', 'macd_signal', 'macd_histogram', 'obv', 'ma_short', 'ma_long']
+
+
+class IncrementalIndicators:
+    def __init__(self, rsi_period=14, macd_fast=12, macd_slow=26, macd_signal=9,
+                 ma_short=9, ma_long=20, keep=0):
+        """
+        حالة المؤشرات الفنية المحدثة شمعة بشمعة بزمن ثابت لكل تحديث
+
+        تحتفظ بمتوسطات Wilder لـ RSI وحالات المتوسطات الأسية لـ MACD ومجموع OBV
+        ونوافذ المتوسطات المتحركة، وتعطي نفس قيم TechnicalIndicators لآخر شمعة.
+
+        Args:
+            rsi_period (int): فترة RSI
+            macd_fast (int): فترة المتوسط السريع لـ MACD
+            macd_slow (int): فترة المتوسط البطيء لـ MACD
+            macd_signal (int): فترة خط الإشارة لـ MACD
+            ma_short (int): فترة المتوسط المتحرك القصير
+            ma_long (int): فترة المتوسط المتحرك الطويل
+            keep (int): عدد آخر الشموع المغلقة التي تُحفظ قيم مؤشراتها (history_frame)
+        """
+        self.params = {
+            'rsi_period': rsi_period,
+            'macd_fast': macd_fast,
+            'macd_slow': macd_slow,
+            'macd_signal': macd_signal,
+            'ma_short': ma_short,
+            'ma_long': ma_long,
+        }
+        self.count = 0  # عدد الشموع المغلقة
+        self.last_timestamp = None
+        self.prev_close = None
+        self.rsi_up = None
+        self.rsi_down = None
+        self.ema_fast = None
+        self.ema_slow = None
+        self.ema_signal = None
+        self.signal_count = 0
+        self.obv = 0.0
+        self.short_window = deque()
+        self.long_window = deque()
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+
+        # قيم آخر شمعة مغلقة وقيم الشمعة المفتوحة (إن وجدت)
+        self.values = dict.fromkeys(INDICATOR_COLUMNS)
+        self.forming = None
+        self.forming_timestamp = None
+        # [الوقت بالنانوثانية، قيم INDICATOR_COLUMNS...] لآخر keep شمعة مغلقة
+        self.keep = keep
+        self.history = deque(maxlen=keep or None) if keep else None
+
+    @classmethod
+    def from_dataframe(cls, df, **params):
+        """
+        تهيئة الحالة من بيانات تاريخية (كل الشموع تعتبر مغلقة)
+
+        Args:
+            df (pd.DataFrame): بيانات OHLCV مفهرسة بالوقت
+        """
+        engine = cls(**params)
+        for timestamp, close, volume in zip(df.index, df['close'].values, df['volume'].values):
+            engine.update(timestamp, close, volume)
+        return engine
+
+    def update(self, timestamp, close, volume, closed=True):
+        """
+        إضافة شمعة مغلقة أو تحديث الشمعة المفتوحة
+
+        الشمعة المفتوحة لا تغير الحالة، لذلك يمكن مراجعتها عدة مرات حتى تُغلق.
+
+        Args:
+            timestamp: وقت افتتاح الشمعة
+            close (float): سعر الإغلاق (الحالي للشمعة المفتوحة)
+            volume (float): الحجم
+            closed (bool): هل الشمعة مغلقة
+
+        Returns:
+            dict: قيم المؤشرات بعد الشمعة
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(f"الشمعة {timestamp} ليست بعد آخر شمعة مغلقة {self.last_timestamp}")
+        if self.forming_timestamp is not None and timestamp > self.forming_timestamp:
+            # شمعة جديدة قبل إغلاق المفتوحة تعني شمعة ناقصة في الحالة
+            raise ValueError(f"الشمعة المفتوحة {self.forming_timestamp} لم تُغلق قبل {timestamp}")
+
+        values = self._step(float(close), float(volume), commit=closed)
+        if closed:
+            self.last_timestamp = timestamp
+            self.values = values
+            self.forming = None
+            self.forming_timestamp = None
+            if self.history is not None:
+                self.history.append([timestamp.value] + [values[name] for name in INDICATOR_COLUMNS])
+        else:
+            self.forming = values
+            self.forming_timestamp = timestamp
+        return values
+
+    def advance(self, df):
+        """
+        إضافة الشموع المغلقة في df الأحدث من آخر شمعة في الحالة
+
+        Args:
+            df (pd.DataFrame): بيانات OHLCV مغلقة تتضمن آخر شمعة في الحالة
+
+        Returns:
+            bool: False إذا لم تتصل البيانات بالحالة (فجوة أو إغلاق معدّل) فيجب إعادة التهيئة
+        """
+        if self.last_timestamp is None or df.empty:
+            return False
+        position = df.index.searchsorted(self.last_timestamp)
+        if position >= len(df) or df.index[position] != self.last_timestamp \
+                or float(df['close'].iloc[position]) != self.prev_close:
+            return False
+
+        new = df.iloc[position + 1:]
+        for timestamp, close, volume in zip(new.index, new['close'].values, new['volume'].values):
+            self.update(timestamp, close, volume)
+        return True
+
+    def history_frame(self, index):
+        """
+        قيم المؤشرات المحفوظة لشموع index
+
+        Returns:
+            pd.DataFrame: أعمدة INDICATOR_COLUMNS (NaN قبل اكتمال الإحماء)، أو None
+            إذا لم يغطِّ السجل كل الشموع المطلوبة
+        """
+        if not self.history:
+            return None
+        rows = np.array(self.history, dtype=float)
+        timestamps = rows[:, 0].astype(np.int64)
+        wanted = pd.DatetimeIndex(index).as_unit('ns').asi8
+        positions = np.minimum(np.searchsorted(timestamps, wanted), len(timestamps) - 1)
+        if not np.array_equal(timestamps[positions], wanted):
+            return None
+        return pd.DataFrame(rows[positions, 1:], index=index, columns=INDICATOR_COLUMNS)
+
+    def _step(self, close, volume, commit):
+        """حساب قيم الشمعة التالية من الحالة (وحفظها إذا كانت مغلقة)"""
+        p = self.params
+        count = self.count + 1
+        first = self.prev_close is None
+
+        # RSI (Wilder): متوسط أسي بمعامل 1/period للصعود والهبوط
+        diff = 0.0 if first else close - self.prev_close
+        up, down = max(diff, 0.0), max(-diff, 0.0)
+        alpha = 1.0 / p['rsi_period']
+        rsi_up = up if first else (1 - alpha) * self.rsi_up + alpha * up
+        rsi_down = down if first else (1 - alpha) * self.rsi_down + alpha * down
+        rsi = None
+        if count >= p['rsi_period']:
+            rsi = 100.0 if rsi_down == 0 else 100.0 - 100.0 / (1.0 + rsi_up / rsi_down)
+
+        # MACD
+        ema_fast = close if first else self._ema(self.ema_fast, close, p['macd_fast'])
+        ema_slow = close if first else self._ema(self.ema_slow, close, p['macd_slow'])
+        macd = macd_signal = macd_histogram = None
+        signal_count = self.signal_count
+        ema_signal = self.ema_signal
+        if count >= max(p['macd_fast'], p['macd_slow']):
+            macd = ema_fast - ema_slow
+            ema_signal = macd if ema_signal is None else self._ema(ema_signal, macd, p['macd_signal'])
+            signal_count += 1
+            if signal_count >= p['macd_signal']:
+                macd_signal = ema_signal
+                macd_histogram = macd - macd_signal
+
+        # OBV: الحجم يُطرح فقط إذا انخفض الإغلاق
+        obv = self.obv + (-volume if not first and close < self.prev_close else volume)
+
+        # المتوسطات المتحركة بمجاميع متدحرجة
+        short_sum, ma_short = self._rolling(self.short_window, self.short_sum, close, p['ma_short'])
+        long_sum, ma_long = self._rolling(self.long_window, self.long_sum, close, p['ma_long'])
+
+        if commit:
+            self.count = count
+            self.prev_close = close
+            self.rsi_up, self.rsi_down = rsi_up, rsi_down
+            self.ema_fast, self.ema_slow = ema_fast, ema_slow
+            self.ema_signal, self.signal_count = ema_signal, signal_count
+            self.obv = obv
+            self._push(self.short_window, close, p['ma_short'])
+            self._push(self.long_window, close, p['ma_long'])
+            self.short_sum, self.long_sum = short_sum, long_sum
+            # الجمع والطرح المستمران يراكمان خطأ التقريب؛ يُعاد المجموع من النافذة مرة كل دورة
+            if count % p['ma_short'] == 0:
+                self.short_sum = math.fsum(self.short_window)
+            if count % p['ma_long'] == 0:
+                self.long_sum = math.fsum(self.long_window)
+
+        return {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_histogram,
+            'obv': obv,
+            'ma_short': ma_short,
+            'ma_long': ma_long,
+        }
+
+    @staticmethod
+    def _ema(previous, value, period):
+        alpha = 2.0 / (period + 1)
+        return (1 - alpha) * previous + alpha * value
+
+    @staticmethod
+    def _rolling(window, total, close, period):
+        """المجموع الجديد والمتوسط (None قبل امتلاء النافذة) دون تعديل النافذة"""
+        total = total + close
+        if len(window) == period:
+            total -= window[0]
+        size = min(len(window) + 1, period)
+        return total, (total / period if size == period else None)
+
+    @staticmethod
+    def _push(window, close, period):
+        window.append(close)
+        if len(window) > period:
+            window.popleft()
+
+    def to_dict(self):
+        """الحالة كقاموس قابل للحفظ بصيغة JSON"""
+        return {
+            'params': self.params,
+            'count': self.count,
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            'prev_close': self.prev_close,
+            'rsi_up': self.rsi_up,
+            'rsi_down': self.rsi_down,
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'ema_signal': self.ema_signal,
+            'signal_count': self.signal_count,
+            'obv': self.obv,
+            'short_window': list(self.short_window),
+            'long_window': list(self.long_window),
+            'short_sum': self.short_sum,
+            'long_sum': self.long_sum,
+            'values': self.values,
+            'forming': self.forming,
+            'forming_timestamp': (self.forming_timestamp.isoformat()
+                                  if self.forming_timestamp is not None else None),
+            'keep': self.keep,
+            'history': list(self.history) if self.history is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """استعادة الحالة من قاموس to_dict"""
+        engine = cls(**state['params'], keep=state.get('keep', 0))
+        for key in ('count', 'prev_close', 'rsi_up', 'rsi_down', 'ema_fast', 'ema_slow',
+                    'ema_signal', 'signal_count', 'obv', 'short_sum', 'long_sum', 'values'):
+            setattr(engine, key, state[key])
+        engine.short_window = deque(state['short_window'])
+        engine.long_window = deque(state['long_window'])
+        if state['last_timestamp'] is not None:
+            engine.last_timestamp = pd.Timestamp(state['last_timestamp'])
+        engine.forming = state.get('forming')
+        if state.get('forming_timestamp') is not None:
+            engine.forming_timestamp = pd.Timestamp(state['forming_timestamp'])
+        if engine.history is not None and state.get('history'):
+            engine.history.extend(state['history'])
+        return engine
+
+    def snapshot(self, path):
+        """حفظ الحالة على القرص (كتابة ذرية)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path):
+        """تحميل الحالة المحفوظة بـ snapshot"""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+اختبار الجلب المتزامن لعدة عملات (بدون اتصال بالإنترنت)
+"""
+
+import threading
+import time
+
+from data_fetcher import DataFetcher
+from market_cache import MarketCache
+from rate_limiter import TokenBucket
+
+
+class FakeExchange:
+    """منصة وهمية تحاكي fetch_ohlcv مع زمن استجابة ثابت"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    markets = None
+    markets_loaded = 0
+
+    def fetch_markets(self):
+        self.markets_loaded += 1
+        return [{'symbol': 'BTC/USDT'}]
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=200, since=None, params=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        start = 1_700_000_000_000
+        return [[start + i * 3_600_000, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0]
+                for i in range(limit)]
+
+
+def test_concurrent_fetch():
+    """اختبار أن الجلب المتزامن يعيد نفس النتائج بزمن أقل"""
+    print("🔥 اختبار الجلب المتزامن")
+    print("=" * 60)
+
+    symbols = [f'COIN{i}/USDT' for i in range(12)]
+
+    fetcher = DataFetcher(max_workers=4, rate_limiter=TokenBucket(1e9, 1e9), use_store=False,
+                          market_cache=MarketCache(None, ttl=60))
+    fetcher.exchange = FakeExchange()
+
+    start = time.perf_counter()
+    serial = fetcher.get_multiple_symbols_data(symbols, '1h', 50, max_workers=1)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = fetcher.get_multiple_symbols_data(symbols, '1h', 50)
+    concurrent_time = time.perf_counter() - start
+
+    print(f"⏱️ تسلسلي: {serial_time:.2f}s - متزامن: {concurrent_time:.2f}s")
+    print(f"📊 أقصى طلبات متزامنة: {fetcher.exchange.max_in_flight}")
+
+    assert list(concurrent.keys()) == symbols
+    assert all(concurrent[s].equals(serial[s]) for s in symbols)
+    assert fetcher.exchange.max_in_flight <= 4
+    assert set(fetcher.last_fetch_latency) == set(symbols)
+    assert concurrent_time < serial_time
+    # الأسواق تُحمّل مرة واحدة عبر الذاكرة المشتركة حتى في الجلب التسلسلي
+    assert fetcher.exchange.markets_loaded == 1 and 'BTC/USDT' in fetcher.exchange.markets
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch()
+    print("\n✅ انتهى الاختبار")
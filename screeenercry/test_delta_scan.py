@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+اختبار المسح التزايدي (الإشارات الجديدة فقط منذ آخر مسح)
+"""
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from signal_buffer import BUY, SELL, SignalBuffer
+from signal_store import SignalStore
+
+KEY = ['العملة', 'الإطار الزمني', 'المؤشر', 'وقت الإشارة']
+
+
+def make_frames(count, length=400, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, length)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end='2024-06-01', periods=length, freq='1h'))
+    return frames
+
+
+class FrameFetcher:
+    """بيانات تنمو حتى عدد شموع محدد"""
+
+    def __init__(self, frames, length):
+        self.frames = frames
+        self.length = length
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        return {timeframe: self.frames[symbol].iloc[:self.length] for timeframe in timeframes}
+
+
+def rows(table):
+    return sorted(map(tuple, table[KEY].values.tolist())) if len(table) else []
+
+
+def test_emits_only_new_candles():
+    """كل مسح تزايدي يعطي إشارات الشموع الجديدة فقط"""
+    print("🔥 اختبار المسح التزايدي")
+    print("=" * 60)
+
+    frames = make_frames(8, seed=1)
+    fetcher = FrameFetcher(frames, 300)
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher
+
+    # أول مسح: كل الإشارات
+    first = analyzer.analyze_multiple_cryptos(list(frames), ['1h'], delta=True)
+    assert rows(first) == rows(analyzer.analyze_multiple_cryptos(list(frames), ['1h']))
+
+    # نفس الشموع: لا جديد
+    assert analyzer.analyze_multiple_cryptos(list(frames), ['1h'], delta=True).empty
+
+    total = 0
+    for length in (310, 330, 400):
+        mark = frames['COIN0/USDT'].index[fetcher.length - 1].strftime('%Y-%m-%d %H:%M')
+        fetcher.length = length
+        delta = analyzer.analyze_multiple_cryptos(list(frames), ['1h'], delta=True)
+        full = analyzer.analyze_multiple_cryptos(list(frames), ['1h'])
+
+        assert set(rows(delta)) <= set(rows(full))
+        assert (delta['وقت الإشارة'] >= mark).all()
+        assert rows(delta[delta['وقت الإشارة'] > mark]) == rows(full[full['وقت الإشارة'] > mark])
+        total += len(delta)
+    assert 0 < total < len(full)
+    print(f"✅ {total} إشارة جديدة بدلاً من {len(full)}")
+
+
+def test_forming_candle_types_emitted_once():
+    """على نفس الشمعة تمر الأنواع التي لم تُرسل بعد فقط"""
+    last = pd.Timestamp('2024-06-01 10:00')
+
+    def buffer(*types):
+        result = SignalBuffer()
+        for signal_type, signal in types:
+            result.append(pd.DatetimeIndex([last]), signal_type, signal, 50.0)
+        return result.with_context('AAA/USDT', '1h', 1.0)
+
+    analyzer = CryptoAnalyzer()
+    pair = {('AAA/USDT', '1h'): last}
+    assert len(analyzer.new_signals(buffer(('rsi_oversold', BUY)), pair)) == 1
+    assert len(analyzer.new_signals(buffer(('rsi_oversold', BUY)), pair)) == 0
+
+    result = analyzer.new_signals(buffer(('rsi_oversold', BUY), ('ma_bearish_crossover', SELL)), pair)
+    assert [record['type'] for record in result.to_records()] == ['ma_bearish_crossover']
+    print("✅ الشمعة قيد التكوين لا تكرر الإشارات")
+
+
+def test_marks_persist_in_store():
+    """العلامات تبقى في المخزن بعد إعادة التشغيل"""
+    frames = make_frames(4, seed=2)
+    fetcher = FrameFetcher(frames, 350)
+    store = SignalStore(':memory:')
+
+    analyzer = CryptoAnalyzer(signal_store=store)
+    analyzer.data_fetcher = fetcher
+    assert not analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'], delta=True).empty
+    assert len(store.high_water_marks()) == 8
+
+    restarted = CryptoAnalyzer(signal_store=store)
+    restarted.data_fetcher = fetcher
+    assert restarted.analyze_multiple_cryptos(list(frames), ['1h', '4h'], delta=True).empty
+
+    fetcher.length = 400
+    table = restarted.analyze_signal_table(list(frames), ['1h', '4h'], delta=True)
+    mark = frames['COIN0/USDT'].index[349]
+    assert len(table) and (table.frame.index >= mark).all()
+    print(f"✅ العلامات محفوظة ({len(table)} إشارة جديدة بعد إعادة التشغيل)")
+
+
+if __name__ == "__main__":
+    test_emits_only_new_candles()
+    test_forming_candle_types_emitted_once()
+    test_marks_persist_in_store()
+    print("\n✅ انتهى الاختبار")
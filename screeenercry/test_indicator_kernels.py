@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+اختبار تطابق نوى NumPy مع مكتبة ta
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+import indicator_kernels
+from indicators import TechnicalIndicators
+
+TOLERANCE = 1e-10
+
+
+def assert_close(fast, reference, name):
+    """نفس مواقع القيم المفقودة ونفس القيم بدقة عالية"""
+    fast = np.asarray(fast, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    assert np.array_equal(np.isnan(fast), np.isnan(reference)), f"{name}: مواقع NaN مختلفة"
+    mask = ~np.isnan(reference)
+    assert np.allclose(fast[mask], reference[mask], rtol=TOLERANCE, atol=TOLERANCE), name
+
+
+def make_series(periods, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    if periods > 10:
+        # أسعار متساوية متتالية (حالة خاصة في OBV و RSI)
+        close[periods // 3:periods // 3 + 3] = close[periods // 3]
+    return pd.Series(close), pd.Series(rng.uniform(0, 1000, periods))
+
+
+def test_kernels_match_ta():
+    """RSI و MACD و OBV و SMA مطابقة لـ ta على أطوال مختلفة"""
+    print("🔥 اختبار تطابق النوى مع ta")
+    print("=" * 60)
+
+    for periods in (1, 2, 14, 15, 27, 35, 200, 5000):
+        close, volume = make_series(periods, seed=periods)
+
+        assert_close(indicator_kernels.rsi(close.values, 14),
+                     ta.momentum.RSIIndicator(close, window=14).rsi(), 'rsi')
+
+        reference = ta.trend.MACD(close, window_fast=12, window_slow=26, window_sign=9)
+        macd, macd_signal, macd_histogram = indicator_kernels.macd(close.values, 12, 26, 9)
+        assert_close(macd, reference.macd(), 'macd')
+        assert_close(macd_signal, reference.macd_signal(), 'macd_signal')
+        assert_close(macd_histogram, reference.macd_diff(), 'macd_histogram')
+
+        assert_close(indicator_kernels.obv(close.values, volume.values),
+                     ta.volume.OnBalanceVolumeIndicator(close, volume).on_balance_volume(), 'obv')
+
+        for window in (9, 20):
+            assert_close(indicator_kernels.sma(close.values, window),
+                         ta.trend.SMAIndicator(close, window=window).sma_indicator(), 'sma')
+
+    print("✅ كل المؤشرات مطابقة")
+
+
+def test_constant_prices():
+    """أسعار ثابتة: RSI = 100 في الحالتين"""
+    close = pd.Series(np.full(50, 10.0))
+    assert_close(indicator_kernels.rsi(close.values), ta.momentum.RSIIndicator(close).rsi(), 'rsi')
+
+
+def test_backend_switch():
+    """المحركان يعطيان نفس الإشارات"""
+    close, volume = make_series(400, seed=9)
+    df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                       'close': close, 'volume': volume})
+    df.index = pd.date_range('2024-01-01', periods=len(df), freq='4h')
+
+    timings = {}
+    results = {}
+    for backend in ('ta', 'numpy'):
+        start = time.perf_counter()
+        results[backend] = TechnicalIndicators(df, backend=backend).get_all_signals()
+        timings[backend] = time.perf_counter() - start
+
+    print(f"⏱️ ta: {timings['ta'] * 1000:.1f}ms - numpy: {timings['numpy'] * 1000:.1f}ms")
+    assert [(s['type'], s['timestamp']) for s in results['ta']] == \
+           [(s['type'], s['timestamp']) for s in results['numpy']]
+
+    try:
+        TechnicalIndicators(df, backend='talib')
+        assert False, "يجب رفض المحرك غير المدعوم"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_kernels_match_ta()
+    test_constant_prices()
+    test_backend_switch()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+اختبار حساب المؤشرات المجمع لعدة عملات (عملات × وقت)
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from indicator_panel import PANEL_INDICATORS, IndicatorPanel
+from indicators import TechnicalIndicators
+
+
+def make_frames(count, periods=200, seed=21):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        # أطوال مختلفة لاختبار المحاذاة على آخر شمعة
+        length = periods - (i % 4) * 37
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, length)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close, 'high': close * rng.uniform(1.0, 1.02, length),
+            'low': close * rng.uniform(0.98, 1.0, length), 'close': close,
+            'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end='2024-06-01', periods=length, freq='4h'))
+    return frames
+
+
+def test_panel_matches_single():
+    """المؤشرات والإشارات مطابقة للحساب لكل عملة منفردة"""
+    print("🔥 اختبار الحساب المجمع للمؤشرات")
+    print("=" * 60)
+
+    frames = make_frames(12)
+    panel = IndicatorPanel(frames)
+    panel_signals = panel.get_all_signals()
+
+    for symbol, df in frames.items():
+        single = TechnicalIndicators(df)
+        expected = single.get_all_signals()
+        panel_df = panel.indicators_for(symbol).df
+        for column in PANEL_INDICATORS:
+            np.testing.assert_allclose(panel_df[column].values, single.df[column].values,
+                                       rtol=1e-10, atol=1e-10, err_msg=f'{symbol} {column}')
+        assert [(s['type'], s['timestamp']) for s in panel_signals[symbol]] == \
+               [(s['type'], s['timestamp']) for s in expected], symbol
+    print(f"✅ {len(frames)} عملات مطابقة")
+
+
+def test_analyzer_panel_mode():
+    """وضع اللوحة في المحلل يعطي نفس جدول الإشارات"""
+    frames = make_frames(6, seed=5)
+
+    class FrameFetcher:
+        def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+            return {timeframe: frames[symbol] for timeframe in timeframes}
+
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher()
+
+    def rows(table):
+        return sorted(map(tuple, table.astype(str).values.tolist()))
+
+    regular = analyzer.analyze_multiple_cryptos(list(frames), ['4h'])
+    batched = analyzer.analyze_multiple_cryptos(list(frames), ['4h'], panel=True)
+    assert rows(regular) == rows(batched)
+    print(f"✅ جدول الإشارات مطابق ({len(batched)} إشارة)")
+
+
+def test_panel_speed():
+    """حساب المؤشرات لمئات العملات أسرع من الحساب المنفصل"""
+    frames = make_frames(300)
+
+    start = time.perf_counter()
+    for df in frames.values():
+        indicators = TechnicalIndicators(df)
+        indicators.calculate_rsi()
+        indicators.calculate_macd()
+        indicators.calculate_obv()
+        indicators.calculate_moving_averages()
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    IndicatorPanel(frames).compute()
+    batched = time.perf_counter() - start
+
+    print(f"⏱️ منفصل: {single * 1000:.1f}ms - مجمع: {batched * 1000:.1f}ms")
+    assert batched < single
+
+
+if __name__ == "__main__":
+    test_panel_matches_single()
+    test_analyzer_panel_mode()
+    test_panel_speed()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+اختبار الوضع المباشر (إشارات الشمعة الأخيرة فقط)
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+import indicator_kernels
+from indicators import LATEST_WINDOW, LIVE_TOLERANCE, TechnicalIndicators, ema_warmup, live_window
+
+LIVE_TYPES = {'rsi_oversold', 'rsi_overbought', 'ma_bullish_crossover', 'ma_bearish_crossover'}
+
+
+def make_frames(count, length=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close,
+            'high': close * (1 + rng.uniform(0, 0.01, length)),
+            'low': close * (1 - rng.uniform(0, 0.01, length)),
+            'close': close,
+            'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end='2024-06-01', periods=length, freq='1h'))
+    return frames
+
+
+def latest_subset(signals, last):
+    """إشارات الوضع الكامل التي يغطيها الوضع المباشر"""
+    return [s for s in signals if s['timestamp'] == last and (s['type'] in LIVE_TYPES or '_latest_' in s['type'])]
+
+
+def test_warmup_window():
+    """نافذة الإحماء تكفي لتضاؤل أثر البداية إلى الحد المطلوب"""
+    print("🔥 اختبار الوضع المباشر")
+    print("=" * 60)
+
+    for alpha in [1 / 14, 2 / 27, 0.2]:
+        bars = ema_warmup(alpha, 1e-4)
+        assert (1 - alpha) ** bars <= 1e-4 < (1 - alpha) ** (bars - 1)
+    assert live_window(tolerance=1e-2) < live_window() < live_window(tolerance=1e-6)
+    print(f"✅ نافذة الوضع المباشر: {live_window()} شمعة")
+
+
+def test_window_saving():
+    """النافذة أقصر فعلاً من الجلب الافتراضي (200) وخط إشارة MACD يتقارب داخلها"""
+    window = live_window()
+    assert window <= 160, window
+    print(f"✅ الوضع المباشر يجلب {window} شمعة بدلاً من 200 (توفير {(1 - window / 200) * 100:.0f}%)")
+
+    # أسوأ حالة: قفزة في السعر عند بداية النافذة (فرق ابتدائي 100 في كل المتوسطات)
+    close = np.r_[np.full(1000 - window, 100.0), np.full(window, 200.0)]
+    full = indicator_kernels.macd(close)[1]
+    tail = indicator_kernels.macd(close[-window:])[1]
+    error = np.abs(full[-LATEST_WINDOW:] - tail[-LATEST_WINDOW:]).max()
+    assert error <= LIVE_TOLERANCE * 100.0, error
+
+
+def test_matches_full_history():
+    """إشارات الشمعة الأخيرة مطابقة للحساب على كامل التاريخ"""
+    count = 0
+    for df in make_frames(150, seed=1).values():
+        expected = latest_subset(TechnicalIndicators(df).get_all_signals(), df.index[-1])
+        live = TechnicalIndicators(df).get_live_signal_buffer().to_records()
+
+        assert [(s['type'], s['signal']) for s in live] == [(s['type'], s['signal']) for s in expected]
+        for got, want in zip(live, expected):
+            assert got['timestamp'] == want['timestamp']
+            assert abs(got['strength_percentage'] - want['strength_percentage']) < 0.01
+        count += len(live)
+    assert count > 0
+    print(f"✅ {count} إشارة مطابقة")
+
+
+def test_analyzer_live_scan():
+    """المسح المباشر يجلب أقل عدد من الشموع ويعطي إشارات الشمعة الأخيرة"""
+    frames = make_frames(20, seed=2)
+    limits = []
+
+    class FrameFetcher:
+        def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+            limits.append(limit)
+            return {timeframe: frames[symbol] for timeframe in timeframes}
+
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher()
+    live = analyzer.analyze_live(list(frames), ['1h'])
+    assert set(limits) == {live_window()}
+
+    full = analyzer.analyze_multiple_cryptos(list(frames), ['1h'])
+    last = frames['COIN0/USDT'].index[-1].strftime('%Y-%m-%d %H:%M')
+    # بدون الدايفرجنس البسيط (التاريخي)
+    full = full[(full['وقت الإشارة'] == last) & full['المؤشر'].str.contains('الشمعة الأخيرة|تشبع|تقاطع')]
+
+    columns = ['العملة', 'نوع الإشارة', 'المؤشر', 'وقت الإشارة']
+    assert sorted(map(tuple, live[columns].values.tolist())) == sorted(map(tuple, full[columns].values.tolist()))
+    print(f"✅ المسح المباشر ({len(live)} إشارة)")
+
+
+def test_live_speed():
+    """400 عملة: الوضع المباشر أسرع من الحساب الكامل"""
+    frames = make_frames(400, seed=3)
+
+    start = time.perf_counter()
+    for df in frames.values():
+        TechnicalIndicators(df).get_signal_buffer()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for df in frames.values():
+        TechnicalIndicators(df).get_live_signal_buffer()
+    live = time.perf_counter() - start
+
+    print(f"⏱️ كامل: {full * 1000:.0f}ms - مباشر: {live * 1000:.0f}ms")
+    assert live < full
+
+
+if __name__ == "__main__":
+    test_warmup_window()
+    test_window_saving()
+    test_matches_full_history()
+    test_analyzer_live_scan()
+    test_live_speed()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+اختبار ذاكرة الأسواق المشتركة والمحفوظة على القرص (بدون اتصال بالإنترنت)
+"""
+
+import os
+import tempfile
+import time
+
+from data_fetcher import DataFetcher
+from market_cache import MarketCache
+
+
+class CountingLoader:
+    """دالة تحميل وهمية تحسب عدد مرات الاستدعاء"""
+
+    def __init__(self, symbols, delay=0.0):
+        self.symbols = symbols
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {symbol: {'symbol': symbol, 'spot': True} for symbol in self.symbols}
+
+
+def test_cold_start_does_not_block():
+    """البدء البارد يعيد None فوراً ويكتمل التحميل في الخلفية"""
+    print("🔥 اختبار ذاكرة الأسواق")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'markets.json')
+        cache = MarketCache(path, ttl=60)
+        loader = CountingLoader(['BTC/USDT', 'ETH/USDT'], delay=0.2)
+
+        start = time.perf_counter()
+        assert cache.get(loader) is None
+        assert time.perf_counter() - start < 0.1
+
+        cache.refresh_async(loader).join()
+        assert loader.calls == 1
+        assert set(cache.get(loader)) == {'BTC/USDT', 'ETH/USDT'}
+
+        # نسخة جديدة (عملية جديدة) تقرأ من القرص دون تحميل
+        other = MarketCache(path, ttl=60)
+        assert set(other.get(loader)) == {'BTC/USDT', 'ETH/USDT'}
+        assert loader.calls == 1
+        print(f"✅ عمر البيانات: {other.age():.2f}s")
+
+
+def test_stale_served_while_refreshing():
+    """البيانات القديمة تُعاد فوراً بينما يتم تحديثها في الخلفية"""
+    cache = MarketCache(None, ttl=0)
+    cache.refresh(CountingLoader(['BTC/USDT']))
+
+    loader = CountingLoader(['BTC/USDT', 'SOL/USDT'], delay=0.1)
+    assert set(cache.get(loader)) == {'BTC/USDT'}
+    cache.refresh_async(loader).join()
+    assert set(cache.get(loader, block=True)) == {'BTC/USDT', 'SOL/USDT'}
+
+
+def test_available_symbols_from_cache():
+    """قائمة العملات تُبنى من الذاكرة المشتركة دون طلب للمنصة"""
+    cache = MarketCache(None, ttl=60)
+    cache.refresh(CountingLoader(['BTC/USDT', 'ETH/USDT', 'SUSHI/USDT', 'ETH/BTC']))
+
+    fetcher = DataFetcher(use_store=False, market_cache=cache)
+    symbols = fetcher.get_available_symbols()
+    print(f"📊 العملات: {symbols}")
+    assert symbols == ['BTC/USDT', 'ETH/USDT', 'SUSHI/USDT']
+
+
+def test_failed_load_is_not_retried_per_request():
+    """بعد فشل التحميل لا يُعاد الطلب مع كل استدعاء حتى تنتهي مهلة الانتظار"""
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError("offline")
+
+    cache = MarketCache(None, ttl=60, retry=0.2)
+    for _ in range(5):
+        try:
+            cache.get(failing, block=True)
+        except Exception:
+            pass
+    assert len(calls) == 1
+
+    time.sleep(0.25)
+    loader = CountingLoader(['BTC/USDT'])
+    assert set(cache.get(loader, block=True)) == {'BTC/USDT'}
+    print("✅ فشل التحميل لا يتكرر مع كل طلب")
+
+
+def test_failed_background_load_is_not_retried_per_request():
+    """المسار غير الحاجب يحترم مهلة الانتظار بعد الفشل أيضاً"""
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError("offline")
+
+    # بدء بارد وبيانات قديمة: كلاهما يحدّث في الخلفية
+    stale = MarketCache(None, ttl=0, retry=0.2)
+    stale.refresh(CountingLoader(['BTC/USDT']))
+    for cache, expected in ((MarketCache(None, ttl=60, retry=0.2), None), (stale, {'BTC/USDT'})):
+        calls.clear()
+        for _ in range(5):
+            markets = cache.get(failing)
+            assert (markets if markets is None else set(markets)) == expected
+            if cache._refresh_thread is not None:
+                cache._refresh_thread.join()
+        assert len(calls) == 1
+
+        time.sleep(0.25)
+        loader = CountingLoader(['BTC/USDT', 'ETH/USDT'])
+        cache.get(loader)
+        cache._refresh_thread.join()
+        assert loader.calls == 1
+    print("✅ فشل التحديث في الخلفية لا يتكرر مع كل صفحة")
+
+
+if __name__ == "__main__":
+    test_cold_start_does_not_block()
+    test_stale_served_while_refreshing()
+    test_available_symbols_from_cache()
+    test_failed_load_is_not_retried_per_request()
+    test_failed_background_load_is_not_retried_per_request()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+اختبار المخزن المحلي للشموع والتحديث التزايدي (بدون اتصال بالإنترنت)
+"""
+
+import time
+
+import pandas as pd
+
+from data_fetcher import DataFetcher
+from resampler import timeframe_ms
+from market_cache import MarketCache
+from ohlcv_store import OHLCVStore
+from rate_limiter import TokenBucket
+
+
+class ClockExchange:
+    """منصة وهمية تولد شموعاً حتى الوقت الحالي وتحترم since و limit"""
+
+    id = 'fake'
+
+    def __init__(self):
+        self.requested_limits = []
+
+    markets = None
+    markets_loaded = 0
+
+    def fetch_markets(self):
+        self.markets_loaded += 1
+        return [{'symbol': 'BTC/USDT'}]
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=200, params=None):
+        tf_ms = timeframe_ms(timeframe)
+        current = int(time.time() * 1000) // tf_ms * tf_ms
+        if since is None:
+            start = current - (limit - 1) * tf_ms
+        else:
+            start = (since + tf_ms - 1) // tf_ms * tf_ms
+
+        self.requested_limits.append(limit)
+        candles = []
+        ts = start
+        while ts <= current and len(candles) < limit:
+            price = 100.0 + (ts // tf_ms) % 50
+            candles.append([ts, price, price + 1, price - 1, price + 0.5, 10.0])
+            ts += tf_ms
+        return candles
+
+
+def cached_markets():
+    """ذاكرة أسواق محمّلة مسبقاً (كما بعد أول تشغيل)"""
+    cache = MarketCache(None, ttl=60)
+    cache.refresh(lambda: {'BTC/USDT': {'symbol': 'BTC/USDT'}, 'ETH/USDT': {'symbol': 'ETH/USDT'}})
+    return cache
+
+
+def test_incremental_update():
+    """الاستدعاء الثاني يجب أن يطلب الشموع الجديدة فقط"""
+    print("🔥 اختبار التحديث التزايدي من المخزن المحلي")
+    print("=" * 60)
+
+    store = OHLCVStore(':memory:')
+    fetcher = DataFetcher(store=store, rate_limiter=TokenBucket(1e9, 1e9),
+                          market_cache=cached_markets())
+    fetcher.exchange = ClockExchange()
+
+    first = fetcher.get_crypto_data('BTC/USDT', '1h', 200)
+    second = fetcher.get_crypto_data('BTC/USDT', '1h', 200)
+
+    print(f"📊 الطلبات: {fetcher.exchange.requested_limits}")
+    print(f"✅ عدد الشموع: {len(first)} ثم {len(second)}")
+
+    assert len(first) == 200 and len(second) == 200
+    assert fetcher.exchange.requested_limits[0] == 200
+    assert fetcher.exchange.requested_limits[1] <= 3
+    assert second.index[-1] == first.index[-1]
+    assert second[['open', 'high', 'low', 'close', 'volume']].equals(
+        first[['open', 'high', 'low', 'close', 'volume']])
+    # المسار التسلسلي يأخذ الأسواق من الذاكرة المشتركة بدل تحميلها من المنصة
+    assert fetcher.exchange.markets_loaded == 0 and 'ETH/USDT' in fetcher.exchange.markets
+
+
+def test_full_fetch_when_store_short():
+    """إذا كان المخزن لا يغطي العدد المطلوب يجب الجلب الكامل"""
+    store = OHLCVStore(':memory:')
+    fetcher = DataFetcher(store=store, rate_limiter=TokenBucket(1e9, 1e9),
+                          market_cache=cached_markets())
+    fetcher.exchange = ClockExchange()
+
+    fetcher.get_crypto_data('ETH/USDT', '4h', 50)
+    df = fetcher.get_crypto_data('ETH/USDT', '4h', 120)
+
+    assert fetcher.exchange.requested_limits == [50, 120]
+    assert len(df) == 120
+    assert store.count_since('fake', 'ETH/USDT', '4h', 0) == 120
+
+
+def test_paginated_history():
+    """جلب تاريخ أطول من حد الطلب الواحد عبر صفحات متزامنة"""
+    print("🔥 اختبار جلب التاريخ الطويل على صفحات")
+
+    tf_ms = timeframe_ms('1h')
+    current = int(time.time() * 1000) // tf_ms * tf_ms
+    since = current - 2499 * tf_ms
+
+    for store in (OHLCVStore(':memory:'), None):
+        fetcher = DataFetcher(store=store, use_store=store is not None, rate_limiter=TokenBucket(1e9, 1e9),
+                              market_cache=cached_markets())
+        fetcher.exchange = ClockExchange()
+
+        df = fetcher.get_history('BTC/USDT', '1h', since, until=current)
+
+        print(f"📊 الصفحات: {fetcher.exchange.requested_limits} - الشموع: {len(df)}")
+        assert sorted(fetcher.exchange.requested_limits) == [500, 1000, 1000]
+        assert len(df) == 2500
+        assert df.index.is_unique and df.index.is_monotonic_increasing
+        assert (df.index.to_series().diff().dropna() == pd.Timedelta(hours=1)).all()
+
+    # get_crypto_data يستخدم الصفحات تلقائياً عند تجاوز الحد
+    fetcher = DataFetcher(store=OHLCVStore(':memory:'), rate_limiter=TokenBucket(1e9, 1e9),
+                          market_cache=cached_markets())
+    fetcher.exchange = ClockExchange()
+    assert len(fetcher.get_crypto_data('ETH/USDT', '1h', 2200)) == 2200
+
+
+if __name__ == "__main__":
+    test_incremental_update()
+    test_full_fetch_when_store_short()
+    test_paginated_history()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+اختبار التحليل المتوازي على عدة عمليات عبر الذاكرة المشتركة
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from parallel_analysis import SharedFrames, analyze_in_processes, default_chunk_size, frame_from_task
+
+
+def make_frames(count, periods=200, seed=8):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, periods)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+            'volume': rng.uniform(1, 100, periods),
+        }, index=pd.date_range(end='2024-06-01', periods=periods, freq='1h', name='timestamp'))
+    return frames
+
+
+class FrameFetcher:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        return {timeframe: self.frames[symbol] for timeframe in timeframes}
+
+
+def open_handles():
+    """عدد الملفات المفتوحة في العملية (None خارج لينكس)"""
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+
+
+def test_shared_frames_roundtrip():
+    """البيانات المقروءة من الذاكرة المشتركة مطابقة للأصل"""
+    print("🔥 اختبار التحليل المتوازي")
+    print("=" * 60)
+
+    frames = make_frames(3)
+    utc = frames['COIN2/USDT'].tz_localize('UTC')
+    units = [(symbol, '1h', df) for symbol, df in frames.items()] + [('UTC/USDT', '4h', utc)]
+    with SharedFrames(units) as shared:
+        assert len(shared.tasks) == 4
+        handles = open_handles()
+        for (symbol, timeframe, df), task in zip(units, shared.tasks):
+            restored_symbol, restored_timeframe, restored = frame_from_task(task)
+            assert (restored_symbol, restored_timeframe) == (symbol, timeframe)
+            pd.testing.assert_frame_equal(restored, df[list(restored.columns)], check_freq=False)
+        # كل مهمة تفصل الذاكرة المشتركة بعد النسخ
+        assert open_handles() == handles
+    print("✅ البيانات مطابقة")
+
+    assert default_chunk_size(100, 4) == 7
+    assert default_chunk_size(1, 8) == 1
+
+
+def test_process_pool_matches_serial():
+    """نفس جدول الإشارات مع العمليات المتعددة"""
+    frames = make_frames(16)
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher(frames)
+
+    def rows(table):
+        return sorted(map(tuple, table.astype(str).values.tolist()))
+
+    start = time.perf_counter()
+    serial = analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'])
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'], workers=2, chunk_size=4)
+    parallel_time = time.perf_counter() - start
+
+    print(f"⏱️ تسلسلي: {serial_time * 1000:.0f}ms - متوازي: {parallel_time * 1000:.0f}ms")
+    assert rows(serial) == rows(parallel)
+    print(f"✅ جدول الإشارات مطابق ({len(parallel)} إشارة)")
+
+    # العمليات العاملة تستخدم المحرك المطلوب (المحرك غير المعروف يُرفض داخلها)
+    units = [(symbol, '1h', df) for symbol, df in list(frames.items())[:4]]
+    assert all(len(buffer) for buffer in analyze_in_processes(units, 2, backend='ta'))
+    assert not any(len(buffer) for buffer in analyze_in_processes(units, 2, backend='unknown'))
+    print("✅ محرك المؤشرات يصل إلى العمليات العاملة")
+
+
+if __name__ == "__main__":
+    test_shared_frames_roundtrip()
+    test_process_pool_matches_serial()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+اختبار فهرس القمم والقيعان المشترك بين كواشف الدايفرجنس
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicators import TechnicalIndicators, pivot_positions
+
+
+def brute_force_pivots(values, order, greater):
+    """الطريقة القديمة بالحلقات للمقارنة"""
+    result = []
+    for i in range(order, len(values) - order):
+        neighbors = [values[i - j] for j in range(1, order + 1)] + [values[i + j] for j in range(1, order + 1)]
+        if greater and all(values[i] > v for v in neighbors):
+            result.append(i)
+        elif not greater and all(values[i] < v for v in neighbors):
+            result.append(i)
+    return result
+
+
+def make_data(periods=200, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    return pd.DataFrame({
+        'open': close,
+        'high': np.round(close * (1 + rng.uniform(0, 0.01, periods)), 1),
+        'low': np.round(close * (1 - rng.uniform(0, 0.01, periods)), 1),
+        'close': close,
+        'volume': rng.uniform(1, 100, periods),
+    }, index=pd.date_range('2024-01-01', periods=periods, freq='4h'))
+
+
+def test_pivot_positions_match_loops():
+    """النسخة المتجهة تطابق الحلقات (بما في ذلك القيم المتساوية)"""
+    print("🔥 اختبار فهرس القمم والقيعان")
+    print("=" * 60)
+
+    df = make_data()
+    for order in (1, 2, 5):
+        for column, greater in (('high', True), ('low', False)):
+            comparator = np.greater if greater else np.less
+            fast = pivot_positions(df[column].values, order, comparator).tolist()
+            assert fast == brute_force_pivots(df[column].values, order, greater)
+    print("✅ النتائج مطابقة")
+
+
+def test_pivots_shared_between_detectors():
+    """الفهرس يُحسب مرة واحدة ونافذة آخر 30 شمعة تطابق الحساب المباشر"""
+    df = make_data(300, seed=5)
+    indicators = TechnicalIndicators(df)
+    indicators.get_all_signals()
+
+    assert list(indicators._pivot_cache) == [2]
+
+    recent = indicators.df.tail(30)
+    shared = indicators._recent_pivots(recent)
+    direct = indicators._recent_pivots(recent.iloc[:-1])  # نافذة ليست في نهاية البيانات
+    highs = brute_force_pivots(recent['high'].values, 2, True)
+    lows = brute_force_pivots(recent['low'].values, 2, False)
+
+    assert [i for i, _ in shared[0]] == highs
+    assert [i for i, _ in shared[1]] == lows
+    assert [i for i, _ in direct[0]] == [i for i in highs if i <= 26]
+
+
+if __name__ == "__main__":
+    test_pivot_positions_match_loops()
+    test_pivots_shared_between_detectors()
+    print("\n✅ انتهى الاختبار")
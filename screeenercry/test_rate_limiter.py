@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+اختبار محدد المعدل المشترك (token bucket) بدون اتصال بالإنترنت
+"""
+
+import asyncio
+import threading
+import time
+
+from data_fetcher import DataFetcher
+from rate_limiter import TokenBucket, get_shared_limiter, klines_weight, request_weight
+
+
+def test_weights():
+    """أوزان Binance لطلبات الشموع ونقاط النهاية الأخرى"""
+    assert klines_weight(50) == 1
+    assert klines_weight(200) == 2
+    assert klines_weight(1000) == 5
+    assert request_weight('klines', 200) == 2
+    assert request_weight('exchangeInfo') == 20
+
+
+def test_bucket_refill_across_threads():
+    """الرصيد مشترك بين الـ threads ويُعاد ملؤه بشكل مستمر"""
+    print("🔥 اختبار محدد المعدل المشترك")
+    print("=" * 60)
+
+    # رصيد 2 ثم 10 وحدات في الثانية: 6 طلبات بوزن 1 => 0.4 ثانية على الأقل
+    bucket = TokenBucket(capacity=2, refill_per_second=10)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    metrics = bucket.metrics()
+    print(f"⏱️ الزمن: {elapsed:.2f}s - الإحصائيات: {metrics}")
+
+    assert elapsed >= 0.38
+    assert metrics['requests'] == 6
+    assert metrics['total_weight'] == 6
+    assert abs(metrics['max_wait'] - 0.4) < 0.05
+
+
+def test_async_acquire():
+    """المهام غير المتزامنة تنتظر دون حجب الحلقة"""
+    bucket = TokenBucket(capacity=1, refill_per_second=20)
+
+    async def run():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - start >= 0.19
+
+
+def test_server_weight_pressure():
+    """عند اقتراب الوزن المعلن من حد Binance يُصفَّر الرصيد"""
+    bucket = TokenBucket(capacity=100, refill_per_second=10)
+    bucket.report_used_weight(100)
+    assert bucket.metrics()['available'] > 90
+
+    bucket.report_used_weight(5500)
+    assert bucket.metrics()['available'] < 1
+
+
+def test_shared_between_fetchers():
+    """كل DataFetcher يستخدم نفس المحدد افتراضياً"""
+    first = DataFetcher(use_store=False)
+    second = DataFetcher(use_store=False)
+    assert first.rate_limiter is second.rate_limiter is get_shared_limiter()
+
+
+if __name__ == "__main__":
+    test_weights()
+    test_bucket_refill_across_threads()
+    test_async_acquire()
+    test_server_weight_pressure()
+    test_shared_between_fetchers()
+    print("\n✅ انتهى الاختبار")
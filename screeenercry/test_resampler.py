@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+اختبار بناء الأطر الزمنية الأكبر محلياً من شموع الساعة
+"""
+
+import numpy as np
+import pandas as pd
+
+from resampler import plan_base_timeframes, resample_ohlcv
+
+
+def make_hourly(start='2024-01-01 01:00', periods=24 * 21):
+    """شموع ساعة وهمية تبدأ في منتصف فترة 4h"""
+    index = pd.date_range(start, periods=periods, freq='1h')
+    rng = np.random.default_rng(7)
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.2, periods),
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.uniform(1, 10, periods),
+    }, index=index)
+
+
+def test_resample_4h_and_3h():
+    """حدود 4h و 3h تبدأ من منتصف الليل UTC والتجميع صحيح"""
+    print("🔥 اختبار التجميع المحلي للأطر الزمنية")
+    print("=" * 60)
+
+    hourly = make_hourly()
+    four = resample_ohlcv(hourly, '1h', '4h')
+
+    # الفترة الأولى 00:00-04:00 ناقصة (البيانات تبدأ 01:00) فتُحذف
+    assert four.index[0] == pd.Timestamp('2024-01-01 04:00')
+    assert all(ts.hour % 4 == 0 for ts in four.index)
+
+    bucket = hourly.loc['2024-01-01 04:00':'2024-01-01 07:00']
+    first = four.iloc[0]
+    assert first['open'] == bucket['open'].iloc[0]
+    assert first['high'] == bucket['high'].max()
+    assert first['low'] == bucket['low'].min()
+    assert first['close'] == bucket['close'].iloc[-1]
+    assert np.isclose(first['volume'], bucket['volume'].sum())
+
+    three = resample_ohlcv(hourly, '1h', '3h')
+    assert three.index[0] == pd.Timestamp('2024-01-01 03:00')
+    assert all(ts.hour % 3 == 0 for ts in three.index)
+    print(f"✅ 4h: {len(four)} شمعة - 3h: {len(three)} شمعة")
+
+
+def test_resample_daily_and_weekly():
+    """الشموع اليومية تبدأ 00:00 والأسبوعية يوم الاثنين"""
+    hourly = make_hourly()
+    daily = resample_ohlcv(hourly, '1h', '1d')
+    weekly = resample_ohlcv(hourly, '1h', '1w')
+
+    assert daily.index[0] == pd.Timestamp('2024-01-02')
+    assert all(ts.dayofweek == 0 for ts in weekly.index)
+    # 2024-01-01 يوم اثنين لكن البيانات تبدأ 01:00 فالأسبوع الأول ناقص
+    assert weekly.index[0] == pd.Timestamp('2024-01-08')
+
+
+def test_plan_base_timeframes():
+    """خطة الجلب تقلل عدد الطلبات"""
+    plan = plan_base_timeframes(['1h', '2h', '3h', '4h', '1d', '1w'], 200)
+    print(f"📊 خطة الجلب: {plan}")
+
+    assert set(plan) == {'1h', '1d', '1w'}
+    assert plan['1h'][1] == ['1h', '2h', '3h', '4h']
+    assert plan['1h'][0] == 201 * 4
+
+    # 3h غير مدعوم من Binance فيُبنى من 1h
+    plan = plan_base_timeframes(['3h'], 100)
+    assert list(plan) == ['1h']
+
+
+if __name__ == "__main__":
+    test_resample_4h_and_3h()
+    test_resample_daily_and_weekly()
+    test_plan_base_timeframes()
+    print("\n✅ انتهى الاختبار")
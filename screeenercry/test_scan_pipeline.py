@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+اختبار خط المسح حسب العملة (جلب في الخلفية وتحليل متداخل)
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from scan_pipeline import prefetch_symbols
+
+
+def test_overlap_and_order():
+    """الجلب يتداخل مع التحليل والترتيب محفوظ"""
+    print("🔥 اختبار خط المسح حسب العملة")
+    print("=" * 60)
+
+    symbols = [f'COIN{i}/USDT' for i in range(10)]
+
+    def fetch(symbol):
+        time.sleep(0.03)
+        return symbol.lower()
+
+    start = time.perf_counter()
+    received = []
+    for symbol, data, error in prefetch_symbols(fetch, symbols):
+        assert error is None and data == symbol.lower()
+        time.sleep(0.03)  # التحليل
+        received.append(symbol)
+    elapsed = time.perf_counter() - start
+
+    print(f"⏱️ 10 عملات: {elapsed * 1000:.0f}ms (بالتتابع ~600ms)")
+    assert received == symbols
+    assert elapsed < 0.5
+
+
+def test_bounded_queue_and_errors():
+    """الجلب لا يسبق التحليل بأكثر من حجم الطابور، والأخطاء تصل للمستهلك"""
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(symbol):
+        with lock:
+            fetched.append(symbol)
+        if symbol == 'BAD/USDT':
+            raise ValueError('رمز غير موجود')
+        return symbol
+
+    symbols = ['A/USDT', 'BAD/USDT'] + [f'C{i}/USDT' for i in range(20)]
+    stream = prefetch_symbols(fetch, symbols, max_pending=2)
+
+    first = next(stream)
+    time.sleep(0.2)
+    # عنصران في الطابور + عنصر ينتظر الإضافة + العنصر المستهلك
+    assert len(fetched) <= 4, fetched
+    assert first == ('A/USDT', 'A/USDT', None)
+
+    symbol, data, error = next(stream)
+    assert symbol == 'BAD/USDT' and data is None and isinstance(error, ValueError)
+
+    # إغلاق المستهلك يوقف الجلب
+    stream.close()
+    time.sleep(0.3)
+    count = len(fetched)
+    time.sleep(0.2)
+    assert len(fetched) == count < len(symbols)
+    print("✅ الطابور محدود والأخطاء تصل للمستهلك")
+
+
+def test_analyzer_fetches_each_symbol_once():
+    """جلب واحد لكل عملة لكل الأطر، ونفس النتائج مع الجلب المسبق وبدونه"""
+    rng = np.random.default_rng(4)
+    calls = []
+
+    class FrameFetcher:
+        def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+            calls.append(symbol)
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, limit)))
+            df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                               'close': close, 'volume': np.ones(limit)},
+                              index=pd.date_range(end='2024-06-01', periods=limit, freq='1h'))
+            return {timeframe: df for timeframe in timeframes}
+
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher()
+    symbols = [f'COIN{i}/USDT' for i in range(5)]
+
+    rng = np.random.default_rng(4)
+    serial = analyzer.analyze_multiple_cryptos(symbols, ['1h', '4h', '1d'], prefetch=0)
+    assert calls == symbols
+
+    calls.clear()
+    rng = np.random.default_rng(4)
+    pipelined = analyzer.analyze_multiple_cryptos(symbols, ['1h', '4h', '1d'])
+    assert calls == symbols
+    assert sorted(map(tuple, serial.astype(str).values.tolist())) == \
+           sorted(map(tuple, pipelined.astype(str).values.tolist()))
+    print(f"✅ جلب واحد لكل عملة ({len(pipelined)} إشارة)")
+
+
+if __name__ == "__main__":
+    test_overlap_and_order()
+    test_bounded_queue_and_errors()
+    test_analyzer_fetches_each_symbol_once()
+    print("\n✅ انتهى الاختبار")
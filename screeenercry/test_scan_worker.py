@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+اختبار عامل المسح الخلفي المشترك بين الجلسات
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from scan_worker import ScanWorker
+
+
+def seconds(text):
+    return pd.Timestamp(text).value / 1e9
+
+
+def make_frames(symbols, length=300, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, length)))
+        frames[symbol] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end='2024-06-05 10:00', periods=length, freq='1h'))
+    return frames
+
+
+class FrameFetcher:
+    def __init__(self, frames, delay=0.0):
+        self.frames = frames
+        self.delay = delay
+        self.calls = []
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        self.calls.append((symbol, tuple(timeframes)))
+        time.sleep(self.delay)
+        return {timeframe: self.frames[symbol] for timeframe in timeframes}
+
+
+def rows(table):
+    return table.to_display().astype(str).values.tolist()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_viewers_share_one_scan():
+    """عدة جلسات متزامنة بنفس الاختيار: مسح واحد ونتيجة مطابقة للمسح المباشر"""
+    print("🔥 اختبار عامل المسح المشترك")
+    print("=" * 60)
+
+    symbols = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT']
+    frames = make_frames(symbols, seed=1)
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(frames, delay=0.05)
+    worker = ScanWorker(analyzer, clock=lambda: seconds('2024-06-05 10:30')).start()
+
+    viewers = [threading.Thread(target=worker.table, args=(symbols, ['1h', '4h'])) for _ in range(5)]
+    for viewer in viewers:
+        viewer.start()
+    for viewer in viewers:
+        viewer.join()
+    assert wait_for(lambda: worker.generation == 1 and not worker.pending(symbols, ['1h', '4h']))
+
+    results = [worker.table(symbols, ['1h', '4h']) for _ in range(5)]
+    worker.stop(timeout=5)
+    assert sorted(fetcher.calls) == [(symbol, ('1h', '4h')) for symbol in symbols]
+    expected = rows(analyzer.analyze_signal_table(symbols, ['1h', '4h']))
+    assert all(rows(table) == expected for table in results)
+    assert worker.generation == 1
+    print(f"✅ 5 جلسات - مسح واحد ({len(expected)} إشارة)")
+
+
+def test_new_selection_scans_only_new_pairs():
+    """إضافة عملة أو إطار يمسح الأزواج الجديدة فقط"""
+    symbols = ['AAA/USDT', 'BBB/USDT']
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(make_frames(symbols + ['CCC/USDT'], seed=2))
+    worker = ScanWorker(analyzer, clock=lambda: seconds('2024-06-05 10:30'))
+
+    worker.table(symbols, ['1h'])
+    worker.run_once()
+    fetcher.calls.clear()
+
+    # الجدول لا ينتظر المسح: النتائج الجاهزة فقط والباقي ينتظر العامل
+    table = worker.table(symbols + ['CCC/USDT'], ['1h', '4h'])
+    assert fetcher.calls == [] and set(table.frame['symbol']) <= set(symbols)
+    assert worker.pending(symbols + ['CCC/USDT'], ['1h', '4h']) == [
+        ('AAA/USDT', '4h'), ('BBB/USDT', '4h'), ('CCC/USDT', '1h'), ('CCC/USDT', '4h')]
+    worker.run_once()
+    assert sorted(fetcher.calls) == [('AAA/USDT', ('4h',)), ('BBB/USDT', ('4h',)), ('CCC/USDT', ('1h', '4h'))]
+
+    fetcher.calls.clear()
+    worker.table(['BBB/USDT'], ['4h'])
+    assert worker.run_once() == 0 and fetcher.calls == []
+    print("✅ الأزواج الجديدة فقط")
+
+
+def test_pending_selection_triggers_rerun():
+    """الصفحة المعروضة بدون أزواج قيد المسح تُعاد عند جاهزيتها حتى دون التحديث التلقائي"""
+    symbols = ['AAA/USDT', 'BBB/USDT']
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher(make_frames(symbols, seed=6))
+    worker = ScanWorker(analyzer, clock=lambda: seconds('2024-06-05 10:30'))
+
+    # جلسة تعرض AAA، وأخرى تنتظر BBB
+    worker.table(['AAA/USDT'], ['1h'])
+    worker.run_once()
+    seen = worker.generation
+    worker.table(symbols, ['1h'])
+    pending = worker.pending(symbols, ['1h'])
+    assert pending == [('BBB/USDT', '1h')]
+    assert not worker.has_new_results(seen, pending, follow=False)
+
+    worker.run_once()
+    assert worker.has_new_results(seen, pending, follow=False)
+    assert not worker.has_new_results(worker.generation, pending, follow=False)
+
+    # جيل جديد لأزواج معروضة مسبقاً: فقط مع التحديث التلقائي
+    assert not worker.has_new_results(seen, [], follow=False)
+    assert worker.has_new_results(seen, [], follow=True)
+    print("✅ الأزواج قيد المسح تظهر تلقائياً")
+
+
+def test_rescans_on_candle_close_and_refresh():
+    """إعادة المسح عند إغلاق الشمعة أو انتهاء عمر النتيجة فقط"""
+    now = [seconds('2024-06-05 10:30')]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(make_frames(['AAA/USDT'], seed=3))
+    worker = ScanWorker(analyzer, refresh=3600, settle=5, clock=lambda: now[0])
+
+    worker.table(['AAA/USDT'], ['1h', '4h'])
+    assert worker.run_once() == 2 and worker.generation == 1
+    assert worker.run_once() == 0
+    assert worker.seconds_until_next() == 30 * 60 + 5
+
+    # إغلاق ساعة: الإطار 4h غير مستحق، ونفس البيانات لا تغيّر الجيل
+    fetcher.calls.clear()
+    now[0] = seconds('2024-06-05 11:00:05')
+    assert worker.run_once() == 1 and worker.generation == 1
+    assert fetcher.calls == [('AAA/USDT', ('1h',))]
+
+    # شمعة جديدة عند المنصة: نتيجة جديدة
+    frame = fetcher.frames['AAA/USDT']
+    fetcher.frames['AAA/USDT'] = pd.concat([frame, frame.iloc[[-1]].set_axis([frame.index[-1] + pd.Timedelta(hours=1)])])
+    assert worker.refresh_now([('AAA/USDT', '1h')]) == 1 and worker.generation == 2
+
+    # 4h مستحق بعد انتهاء عمر نتيجته
+    now[0] = seconds('2024-06-05 11:30:01')
+    assert worker.due_pairs() == [('AAA/USDT', '4h')]
+    print("✅ الجدولة على إغلاق الشموع")
+
+
+def test_targeted_refresh_and_idle_pairs():
+    """التحديث اليدوي يعيد مسح الاختيار فقط، والأزواج غير المطلوبة تُحذف"""
+    now = [seconds('2024-06-05 10:30')]
+    symbols = ['AAA/USDT', 'BBB/USDT']
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(make_frames(symbols, seed=5))
+    worker = ScanWorker(analyzer, idle=600, clock=lambda: now[0])
+    worker.table(symbols, ['1h', '4h'])
+    worker.run_once()
+
+    fetcher.calls.clear()
+    assert worker.refresh_now(worker.watch(['BBB/USDT'], ['4h'])) == 1
+    assert fetcher.calls == [('BBB/USDT', ('4h',))]
+
+    worker.invalidate([('AAA/USDT', '1h')])
+    fetcher.calls.clear()
+    worker.table(symbols, ['1h'])
+    assert worker.run_once() == 1 and fetcher.calls == [('AAA/USDT', ('1h',))]
+
+    # بعد 10 دقائق لم يُطلب إلا AAA/1h
+    now[0] += 601
+    worker.watch(['AAA/USDT'], ['1h'])
+    assert sorted(worker.prune()) == [('AAA/USDT', '4h'), ('BBB/USDT', '1h'), ('BBB/USDT', '4h')]
+    assert worker.watched() == [('AAA/USDT', '1h')]
+
+    fetcher.calls.clear()
+    worker.table(['BBB/USDT'], ['1h'])
+    # BBB/1h من جديد، وAAA/1h انتهى عمر نتيجته
+    assert worker.run_once() == 2 and sorted(fetcher.calls) == [('AAA/USDT', ('1h',)), ('BBB/USDT', ('1h',))]
+    print("✅ التحديث الموجه وحذف الأزواج غير المطلوبة")
+
+
+def test_background_thread_wakes_and_stops():
+    """العامل الخلفي يمسح المطلوب عند إيقاظه ويتوقف فوراً"""
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher(make_frames(['AAA/USDT'], seed=4))
+    worker = ScanWorker(analyzer).start()
+    assert worker.start()._thread is worker._thread
+
+    worker.watch(['AAA/USDT'], ['1h'])
+    worker.wake()
+    assert wait_for(lambda: worker.generation == 1)
+
+    worker.stop(timeout=5)
+    assert not worker._thread.is_alive()
+    print("✅ العامل الخلفي يعمل ويتوقف")
+
+
+if __name__ == "__main__":
+    test_viewers_share_one_scan()
+    test_new_selection_scans_only_new_pairs()
+    test_pending_selection_triggers_rerun()
+    test_rescans_on_candle_close_and_refresh()
+    test_targeted_refresh_and_idle_pairs()
+    test_background_thread_wakes_and_stops()
+    print("\n✅ انتهى الاختبار")
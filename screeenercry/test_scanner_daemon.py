@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+اختبار الماسح المجدول على إغلاق الشموع
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from indicators import TechnicalIndicators
+from scanner_daemon import ScannerDaemon, closed_candles, last_close_ms
+from signal_store import SignalStore
+from streaming_indicators import INDICATOR_COLUMNS
+
+
+def ms(text):
+    return int(pd.Timestamp(text).value // 1_000_000)
+
+
+def seconds(text):
+    return ms(text) / 1000
+
+
+class FrameFetcher:
+    """بيانات تنتهي بالشمعة قيد التكوين عند وقت الطلب"""
+
+    def __init__(self, symbols, clock):
+        rng = np.random.default_rng(0)
+        index = pd.date_range('2024-05-01', '2024-06-10', freq='1h')
+        self.frames = {}
+        for symbol in symbols:
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+            self.frames[symbol] = pd.DataFrame({
+                'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                'close': close, 'volume': rng.uniform(1, 100, len(index)),
+            }, index=index)
+        self.clock = clock
+        self.calls = []
+        self.limits = []
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        self.calls.append((symbol, tuple(timeframes)))
+        self.limits.append(limit)
+        now = pd.Timestamp(self.clock(), unit='s')
+        df = self.frames[symbol][:now]
+        rules = {'1h': '1h', '4h': '4h'}
+        return {
+            timeframe: df.resample(rules[timeframe], origin='epoch').agg(
+                {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).tail(limit)
+            for timeframe in timeframes
+        }
+
+
+def test_candle_boundaries():
+    """حدود الشموع مطابقة للمنصة"""
+    print("🔥 اختبار الماسح المجدول")
+    print("=" * 60)
+
+    now = ms('2024-06-05 10:30')  # الأربعاء
+    assert last_close_ms('1h', now) == ms('2024-06-05 10:00')
+    assert last_close_ms('4h', now) == ms('2024-06-05 08:00')
+    assert last_close_ms('1d', now) == ms('2024-06-05')
+    assert last_close_ms('1w', now) == ms('2024-06-03')  # الاثنين
+    assert last_close_ms('1h', ms('2024-06-05 10:00')) == ms('2024-06-05 10:00')
+
+    df = pd.DataFrame({'close': [1.0, 2.0, 3.0]}, index=pd.date_range('2024-06-05 08:00', periods=3, freq='1h'))
+    assert list(closed_candles(df, ms('2024-06-05 10:00')).index.hour) == [8, 9]
+
+    # فهرس بمنطقة زمنية (مثل yfinance): المقارنة بنفس اللحظة بتوقيت UTC
+    riyadh = df.tz_localize('UTC').tz_convert('Asia/Riyadh')
+    assert list(closed_candles(riyadh, ms('2024-06-05 10:00')).index.hour) == [11, 12]
+    print("✅ حدود الشموع صحيحة")
+
+
+def test_scans_only_due_pairs():
+    """كل إغلاق يُمسح مرة واحدة ولا يُجلب إلا المستحق"""
+    now = [seconds('2024-06-05 10:00:06')]
+    clock = lambda: now[0]
+    symbols = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT']
+
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(symbols, clock)
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(symbols, ['1h', '4h'], analyzer, store, settle=5, clock=clock)
+
+    # أول تشغيل: كل الأزواج مستحقة
+    summary = daemon.run_once()
+    assert summary['pairs'] == 6 and summary['errors'] == 0
+    assert summary['signals'] == store.count() > 0
+    assert fetcher.calls == [(symbol, ('1h', '4h')) for symbol in symbols]
+    newest = store._conn.execute('SELECT MAX(ts) FROM signals').fetchone()[0]
+    assert newest < ms('2024-06-05 10:00')  # الشمعة قيد التكوين لا تُحلل
+
+    # قبل الإغلاق التالي: لا شيء مستحق ولا جلب
+    fetcher.calls.clear()
+    now[0] = seconds('2024-06-05 10:30')
+    assert daemon.run_once()['pairs'] == 0 and fetcher.calls == []
+    assert daemon.seconds_until_next() == 30 * 60 + 5
+
+    # إغلاق ساعة فقط: الإطار 4h لا يُجلب
+    now[0] = seconds('2024-06-05 11:00:05')
+    assert daemon.run_once()['pairs'] == 3
+    assert fetcher.calls == [(symbol, ('1h',)) for symbol in symbols]
+
+    # إغلاق 4h: المخزن يحتفظ بحالة المسح
+    fetcher.calls.clear()
+    now[0] = seconds('2024-06-05 12:00:05')
+    restarted = ScannerDaemon(symbols, ['1h', '4h'], analyzer, store, settle=5, clock=clock)
+    assert restarted.run_once()['pairs'] == 6
+    assert restarted.run_once()['pairs'] == 0
+    assert store.scan_state()[('AAA/USDT', '4h')] == ms('2024-06-05 12:00')
+    print(f"✅ مسح المستحق فقط ({store.count()} إشارة في المخزن)")
+
+
+def test_fetch_errors_are_retried():
+    """العملة التي فشل جلبها تبقى مستحقة"""
+    now = [seconds('2024-06-05 10:00:06')]
+    clock = lambda: now[0]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(['AAA/USDT'], clock)
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(['AAA/USDT', 'BAD/USDT'], ['1h'], analyzer, store, clock=clock)
+
+    summary = daemon.run_once()
+    assert summary['pairs'] == 1 and summary['errors'] == 1
+    assert list(daemon.due_pairs()) == ['1h']
+    assert daemon.due_pairs()['1h'][1] == ['BAD/USDT']
+    print("✅ أخطاء الجلب تُعاد في المرة التالية")
+
+
+def test_pair_errors_do_not_stop_scan():
+    """خطأ تحليل زوج لا يوقف بقية العملات، والبيانات بتوقيت UTC تُمسح كالعادة"""
+    now = [seconds('2024-06-05 10:00:06')]
+    clock = lambda: now[0]
+    analyzer = CryptoAnalyzer()
+    fetcher = FrameFetcher(['AAA/USDT', 'CCC/USDT'], clock)
+    frames = fetcher.get_multi_timeframe_data
+    fetcher.get_multi_timeframe_data = lambda symbol, timeframes, limit=200: (
+        {'1h': 'ليست بيانات'} if symbol == 'BAD/USDT' else
+        {tf: df.tz_localize('UTC') for tf, df in frames(symbol, timeframes, limit).items()})
+    analyzer.data_fetcher = fetcher
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(['AAA/USDT', 'BAD/USDT', 'CCC/USDT'], ['1h'], analyzer, store, clock=clock)
+
+    summary = daemon.run_once()
+    assert summary['pairs'] == 2 and summary['errors'] == 1
+    assert daemon.due_pairs()['1h'][1] == ['BAD/USDT']
+    print("✅ أخطاء التحليل لا توقف المسح")
+
+
+def test_symbols_follow_market_list():
+    """بدون رموز محددة تُقرأ قائمة المنصة في كل دورة فلا تبقى القائمة الافتراضية"""
+    now = [seconds('2024-06-05 10:00:06')]
+    clock = lambda: now[0]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(['AAA/USDT', 'BBB/USDT'], clock)
+    listed = [['AAA/USDT']]
+    blocks = []
+
+    def get_available_symbols(block=False):
+        blocks.append(block)
+        return listed[0]
+
+    fetcher.get_available_symbols = get_available_symbols
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(None, ['1h'], analyzer, store, settle=5, clock=clock)
+
+    # البدء البارد: القائمة الافتراضية
+    assert daemon.run_once()['pairs'] == 1 and blocks == [True]
+
+    # اكتمل تحميل الأسواق: العملة الجديدة مستحقة دون انتظار الإغلاق التالي
+    listed[0] = ['AAA/USDT', 'BBB/USDT']
+    fetcher.calls.clear()
+    assert daemon.run_once()['pairs'] == 1
+    assert fetcher.calls == [('BBB/USDT', ('1h',))]
+    print("✅ قائمة العملات تتبع المنصة")
+
+
+def test_unpublished_candle_is_rescanned():
+    """الشمعة المغلقة التي لم تنشرها المنصة بعد لا تُسجل كممسوحة"""
+    now = [seconds('2024-06-05 11:00:06')]
+    lag = [7200]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(['AAA/USDT'], lambda: now[0] - lag[0])
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(['AAA/USDT'], ['1h'], analyzer, store, limit=150, settle=5, clock=lambda: now[0])
+
+    # آخر شمعة عند المنصة 09:00 بدلاً من 10:00
+    summary = daemon.run_once()
+    assert summary['pairs'] == 0 and summary['pending'] == 1
+    assert store.scan_state() == {} and daemon.due_pairs() == {}
+    assert daemon.seconds_until_next() == 5
+    now[0] += 5
+    assert daemon.due_pairs()['1h'][1] == ['AAA/USDT']
+
+    lag[0] = 0
+    summary = daemon.run_once()
+    assert summary['pairs'] == 1 and summary['pending'] == 0
+    assert store.scan_state()[('AAA/USDT', '1h')] == ms('2024-06-05 11:00')
+
+    # شمعة إضافية للشمعة قيد التكوين التي يحذفها closed_candles
+    assert fetcher.limits == [151, 151]
+    print("✅ الشمعة غير المنشورة يُعاد مسحها")
+
+
+def test_missing_candle_retries_are_capped():
+    """شمعة لا تصل أبداً: محاولات بمهلة تتضاعف ثم تسجيل الزوج كممسوح"""
+    now = [seconds('2024-06-05 11:00:06')]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(['AAA/USDT'], lambda: now[0] - 7200)
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(['AAA/USDT'], ['1h'], analyzer, store, settle=5, max_retries=3,
+                           clock=lambda: now[0])
+
+    waits = []
+    for _ in range(3):
+        assert daemon.run_once()['pending'] == 1
+        waits.append(daemon.seconds_until_next())
+        now[0] += waits[-1]
+    assert waits == [5, 10, 20] and len(fetcher.calls) == 3
+
+    # بعد آخر محاولة: يُسجل حتى الإغلاق التالي ولا يُجلب مرة أخرى
+    summary = daemon.run_once()
+    assert summary['pairs'] == 1 and summary['pending'] == 0
+    assert store.scan_state()[('AAA/USDT', '1h')] == ms('2024-06-05 11:00')
+    assert daemon.run_once()['pairs'] == 0 and len(fetcher.calls) == 4
+    assert daemon.seconds_until_next() > 20 * 60
+    print("✅ محاولات الشمعة المفقودة محدودة")
+
+
+def test_incremental_indicator_state():
+    """المؤشرات تتقدم بالشموع الجديدة فقط من الحالة المحفوظة بعد إعادة التشغيل"""
+    now = [seconds('2024-06-05 10:00:06')]
+    clock = lambda: now[0]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = fetcher = FrameFetcher(['AAA/USDT'], clock)
+    store = SignalStore(':memory:')
+    daemon = ScannerDaemon(['AAA/USDT'], ['1h'], analyzer, store, settle=5, clock=clock)
+
+    assert daemon.run_once()['pairs'] == 1
+    state = store.indicator_state('AAA/USDT', '1h')
+    assert pd.Timestamp(state['last_timestamp']) == pd.Timestamp('2024-06-05 09:00')
+    seeded = state['count']
+    assert seeded == daemon.limit  # limit شمعة مغلقة كاملة
+
+    # بعد إعادة التشغيل: شمعة واحدة جديدة فقط تُضاف إلى الحالة المحفوظة
+    now[0] = seconds('2024-06-05 12:00:06')
+    restarted = ScannerDaemon(['AAA/USDT'], ['1h'], analyzer, store, settle=5, clock=clock)
+    assert restarted.run_once()['pairs'] == 1 and store.count() > 0
+    engine = restarted._engines[('AAA/USDT', '1h')]
+    assert engine.count == seeded + 2
+
+    # القيم تطابق الحساب الكامل على كل التاريخ المتراكم منذ التهيئة
+    df = fetcher.get_multi_timeframe_data('AAA/USDT', ['1h'])['1h'].iloc[:-1]
+    start = df.index[-1] - pd.Timedelta(hours=seeded + 1)
+    history = fetcher.frames['AAA/USDT'][start:df.index[-1]]
+    full = TechnicalIndicators(history)
+    full.calculate_rsi(), full.calculate_macd(), full.calculate_obv(), full.calculate_moving_averages()
+    expected = full.df.loc[df.index, INDICATOR_COLUMNS]
+    assert np.allclose(engine.history_frame(df.index).values, expected.values, rtol=1e-9, equal_nan=True)
+    print(f"✅ الحالة التزايدية محفوظة ({engine.count} شمعة)")
+
+
+def test_run_forever_stops():
+    """الانتظار بين عمليات المسح لا يحجب الإيقاف"""
+    now = [seconds('2024-06-05 10:30')]
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = FrameFetcher(['AAA/USDT'], lambda: now[0])
+    store = SignalStore(':memory:')
+    store.mark_scanned([('AAA/USDT', '1h', ms('2024-06-05 10:00'))])
+    daemon = ScannerDaemon(['AAA/USDT'], ['1h'], analyzer, store, clock=lambda: now[0])
+
+    stop = threading.Event()
+    thread = threading.Thread(target=daemon.run_forever, args=(stop,))
+    thread.start()
+    stop.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    print("✅ الإيقاف فوري")
+
+
+if __name__ == "__main__":
+    test_candle_boundaries()
+    test_scans_only_due_pairs()
+    test_fetch_errors_are_retried()
+    test_pair_errors_do_not_stop_scan()
+    test_symbols_follow_market_list()
+    test_unpublished_candle_is_rescanned()
+    test_missing_candle_retries_are_capped()
+    test_incremental_indicator_state()
+    test_run_forever_stops()
+    print("\n✅ انتهى الاختبار")
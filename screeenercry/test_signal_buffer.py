@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+اختبار المخزن العمودي للإشارات
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from indicators import TechnicalIndicators
+from signal_buffer import BUY, SELL, SIGNAL_TYPES, TYPE_CODES, SignalBuffer
+
+
+def make_data(periods=300, seed=13, tz=None):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, periods)))
+    index = pd.date_range('2024-01-01', periods=periods, freq='1h', tz=tz)
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                         'close': close, 'volume': rng.uniform(1, 100, periods)}, index=index)
+
+
+# إشارات ثابتة لإطارين حتميين من تنفيذ القواميس السابق للمخزن العمودي:
+# (الوقت، النوع، الاتجاه، strength_percentage، strength إن وُجدت، الوصف)
+EXPECTED = {
+    (28, 80): [
+        ('01-02 17', 'ma_bearish_crossover', 'بيع', 35.0, None, 'MA9 تقطع MA20 هبوطياً'),
+        ('01-02 18', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-02 19', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-02 20', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-02 23', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 00', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 01', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 02', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 03', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 04', 'obv_simple_bullish_divergence', 'شراء', 55.0, None, 'OBV دايفرجنس شراء'),
+        ('01-03 12', 'macd_simple_bullish_divergence', 'شراء', 60.0, None, 'MACD دايفرجنس شراء'),
+        ('01-03 16', 'macd_simple_bullish_divergence', 'شراء', 60.0, None, 'MACD دايفرجنس شراء'),
+        ('01-03 16', 'rsi_simple_bullish_divergence', 'شراء', 65.0, None, 'RSI دايفرجنس شراء'),
+        ('01-03 17', 'ma_bullish_crossover', 'شراء', 35.0, None, 'MA9 تقطع MA20 صعودياً'),
+        ('01-03 21', 'obv_simple_bearish_divergence', 'بيع', 55.0, None, 'OBV دايفرجنس بيع'),
+        ('01-03 22', 'obv_simple_bearish_divergence', 'بيع', 55.0, None, 'OBV دايفرجنس بيع'),
+        ('01-03 23', 'obv_simple_bearish_divergence', 'بيع', 55.0, None, 'OBV دايفرجنس بيع'),
+        ('01-04 00', 'obv_simple_bearish_divergence', 'بيع', 55.0, None, 'OBV دايفرجنس بيع'),
+        ('01-04 04', 'obv_simple_bearish_divergence', 'بيع', 55.0, None, 'OBV دايفرجنس بيع'),
+        ('01-04 07', 'macd_latest_bearish_divergence', 'بيع', 84.57, 84.57,
+         '🔥 MACD دايفرجنس هبوطي: قمة سعر جديدة لكن MACD انخفض (الشمعة الأخيرة)'),
+        ('01-04 07', 'obv_latest_bearish_divergence', 'بيع', 44.5115, 44.5115,
+         '🔥 OBV دايفرجنس هبوطي: قمة سعر جديدة لكن OBV انخفض (الشمعة الأخيرة)'),
+    ],
+    (29, 60): [
+        ('01-01 13', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (10.7)'),
+        ('01-01 14', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (11.5)'),
+        ('01-01 15', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (10.1)'),
+        ('01-01 16', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (9.1)'),
+        ('01-01 17', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (8.3)'),
+        ('01-01 18', 'rsi_oversold', 'شراء', 70.0, None, 'RSI في منطقة التشبع البيعي (13.5)'),
+        ('01-01 19', 'rsi_oversold', 'شراء', 59.4971, None, 'RSI في منطقة التشبع البيعي (20.3)'),
+        ('01-01 20', 'rsi_oversold', 'شراء', 44.6153, None, 'RSI في منطقة التشبع البيعي (27.7)'),
+        ('01-02 03', 'ma_bullish_crossover', 'شراء', 35.0, None, 'MA9 تقطع MA20 صعودياً'),
+        ('01-02 23', 'ma_bearish_crossover', 'بيع', 35.0, None, 'MA9 تقطع MA20 هبوطياً'),
+        ('01-03 05', 'macd_simple_bearish_divergence', 'بيع', 60.0, None, 'MACD دايفرجنس بيع'),
+        ('01-03 08', 'ma_bullish_crossover', 'شراء', 35.0, None, 'MA9 تقطع MA20 صعودياً'),
+        ('01-03 10', 'rsi_overbought', 'بيع', 40.0133, None, 'RSI في منطقة التشبع الشرائي (70.0)'),
+        ('01-03 11', 'rsi_overbought', 'بيع', 43.9897, None, 'RSI في منطقة التشبع الشرائي (72.0)'),
+    ],
+}
+
+
+def expected_rows(records):
+    """القواميس بصيغة EXPECTED (مرتبة لأن ترتيب الإشارات بنفس الوقت غير محدد)"""
+    return sorted((record['timestamp'].strftime('%m-%d %H'), record['type'], record['signal'],
+                   round(float(record['strength_percentage']), 4),
+                   round(float(record['strength']), 4) if 'strength' in record else None,
+                   record['description']) for record in records)
+
+
+def test_buffer_matches_records():
+    """المخزن يعطي نفس إشارات تنفيذ القواميس السابق"""
+    print("🔥 اختبار المخزن العمودي للإشارات")
+    print("=" * 60)
+
+    for (seed, periods), expected in EXPECTED.items():
+        for tz in (None, 'UTC'):
+            for backend in ('numpy', 'ta'):
+                buffer = TechnicalIndicators(make_data(periods, seed, tz), backend).get_signal_buffer()
+                records = buffer.to_records()
+                assert expected_rows(records) == expected, (seed, tz, backend)
+                assert all((record['timestamp'].tz is None) == (tz is None) for record in records)
+
+                # ترتيب الأحدث أولاً والأعمدة مكتوبة النوع
+                columns = buffer.columns()
+                assert np.all(np.diff(columns['timestamp']) <= 0)
+                assert columns['timestamp'].dtype == np.int64
+                assert columns['type'].dtype == np.int16
+                assert columns['strength'].dtype == np.float64
+
+                # الرجوع من القواميس يعطي نفس المخزن
+                assert SignalBuffer.from_records(records).to_records() == records
+    print(f"✅ {sum(map(len, EXPECTED.values()))} إشارة مطابقة للتنفيذ السابق")
+
+
+def test_lazy_descriptions():
+    """الأوصاف تُنشأ فقط للصفوف المطلوبة"""
+    buffer = SignalBuffer()
+    index = pd.date_range('2024-01-01', periods=3, freq='1D')
+    buffer.append(index, 'rsi_oversold', BUY, [50.0, 45.0, 40.0], value=[12.34, 20.0, 25.0])
+    buffer.append_records([{'type': 'rsi_latest_bearish_divergence', 'timestamp': index[1],
+                            'signal': 'بيع', 'description': 'وصف جاهز', 'strength': 120.0,
+                            'strength_percentage': 100}])
+
+    assert buffer.describe([0]) == ['RSI في منطقة التشبع البيعي (12.3)']
+    assert buffer.describe([3]) == ['وصف جاهز']
+
+    ordered = buffer.sort_by_time()
+    assert [SIGNAL_TYPES[code] for code in ordered.columns()['type']] == \
+           ['rsi_oversold', 'rsi_oversold', 'rsi_latest_bearish_divergence', 'rsi_oversold']
+    assert ordered.describe([2]) == ['وصف جاهز']
+    assert ordered.to_records()[2]['strength'] == 120.0
+    assert 'strength' not in ordered.to_records()[0]
+    print("✅ الأوصاف عند الطلب فقط")
+
+
+def test_concat_and_pickle():
+    """دمج مخازن عدة عملات بفئات موحدة وإرسالها بين العمليات"""
+    first = TechnicalIndicators(make_data(seed=1)).get_signal_buffer().with_context('BTC/USDT', '1h', 10.0)
+    second = TechnicalIndicators(make_data(seed=2)).get_signal_buffer().with_context('ETH/USDT', '4h', 2.0)
+    third = TechnicalIndicators(make_data(seed=3)).get_signal_buffer().with_context('BTC/USDT', '4h', 11.0)
+
+    merged = SignalBuffer.concat([first, SignalBuffer(), second, third])
+    assert len(merged) == len(first) + len(second) + len(third)
+    assert merged.symbols == ['BTC/USDT', 'ETH/USDT']
+    assert merged.timeframes == ['1h', '4h']
+
+    records = merged.to_records()
+    assert records == first.to_records() + second.to_records() + third.to_records()
+
+    frame = merged.to_frame()
+    assert str(frame['type'].dtype) == 'category' and str(frame['symbol'].dtype) == 'category'
+    assert frame['description'].tolist() == [r['description'] for r in records]
+
+    restored = pickle.loads(pickle.dumps(merged))
+    assert restored.to_records() == records
+    assert TYPE_CODES['ma_bullish_crossover'] == SIGNAL_TYPES.index('ma_bullish_crossover')
+    assert SELL == 1
+    print("✅ الدمج والإرسال")
+
+
+if __name__ == "__main__":
+    test_buffer_matches_records()
+    test_lazy_descriptions()
+    test_concat_and_pickle()
+    print("\n✅ انتهى الاختبار")
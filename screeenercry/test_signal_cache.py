@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+اختبار الذاكرة المؤقتة لنتائج التحليل
+"""
+
+import ast
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from signal_buffer import BUY, SignalBuffer
+from signal_cache import CODE_VERSION, VERSIONED_MODULES, SignalCache, cache_key
+
+
+def make_frames(count, length=200, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, length)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end='2024-06-01', periods=length, freq='1h'))
+    return frames
+
+
+class FrameFetcher:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        return {timeframe: self.frames[symbol] for timeframe in timeframes}
+
+
+def rows(table):
+    return sorted(map(tuple, table.astype(str).values.tolist()))
+
+
+def make_buffer(count):
+    buffer = SignalBuffer()
+    buffer.append(np.arange(count), 'rsi_oversold', BUY, np.ones(count))
+    return buffer
+
+
+def test_key_changes_with_data():
+    """المفتاح يتغير مع أي تغير في الشموع (حتى الشمعة قيد التكوين)"""
+    print("🔥 اختبار الذاكرة المؤقتة لنتائج التحليل")
+    print("=" * 60)
+
+    df = make_frames(1)['COIN0/USDT']
+    key = cache_key('COIN0/USDT', '1h', df, {'backend': 'numpy'})
+    assert key == cache_key('COIN0/USDT', '1h', df.copy(), {'backend': 'numpy'})
+    assert key[-1] == CODE_VERSION
+
+    forming = df.copy()
+    forming.iloc[-1, forming.columns.get_loc('close')] *= 1.001
+    assert cache_key('COIN0/USDT', '1h', forming, {'backend': 'numpy'}) != key
+    assert cache_key('COIN0/USDT', '1h', df.iloc[1:], {'backend': 'numpy'}) != key
+    assert cache_key('COIN0/USDT', '4h', df, {'backend': 'numpy'}) != key
+    assert cache_key('COIN0/USDT', '1h', df, {'backend': 'ta'}) != key
+    print("✅ المفاتيح صحيحة")
+
+
+def test_version_covers_analysis_code():
+    """بصمة الكود تشمل كل ملفات التحليل التي يستوردها المحلل والخدمة الخلفية"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    pending = ['indicators.py', 'indicator_panel.py', 'streaming_indicators.py']
+    found = set()
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            modules = ([alias.name for alias in node.names] if isinstance(node, ast.Import)
+                       else [node.module] if isinstance(node, ast.ImportFrom) else [])
+            pending.extend(f'{module}.py' for module in modules
+                           if os.path.exists(os.path.join(directory, f'{module}.py')))
+    assert found <= set(VERSIONED_MODULES), found - set(VERSIONED_MODULES)
+    print(f"✅ بصمة الكود تغطي {len(found)} ملفات")
+
+
+def test_lru_bounded_by_size():
+    """حذف الأقدم استخداماً عند تجاوز الحجم"""
+    size = make_buffer(100).nbytes
+    cache = SignalCache(max_bytes=size * 3)
+    for key in 'abc':
+        cache.put(key, make_buffer(100))
+    assert cache.get('a') is not None  # 'a' أصبح الأحدث استخداماً
+    cache.put('d', make_buffer(100))
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.nbytes <= cache.max_bytes
+
+    # القيمة الأكبر من الحد لا تُخزن
+    cache.put('huge', make_buffer(1000))
+    assert cache.get('huge') is None and len(cache) == 3
+    print(f"✅ LRU محدود بالحجم ({cache.nbytes} بايت)")
+
+
+def test_disk_tier():
+    """طبقة القرص تعيد النتائج بعد مسح الذاكرة أو لذاكرة جديدة"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SignalCache(directory=directory)
+        cache.put(('COIN0/USDT', '1h'), make_buffer(10))
+        cache.clear()
+        restored = SignalCache(directory=directory).get(('COIN0/USDT', '1h'))
+        assert restored is not None and len(restored) == 10
+        assert cache.get(('COIN0/USDT', '4h')) is None
+
+        small = SignalCache(directory=directory, max_disk_bytes=1)
+        small.put('x', make_buffer(10))
+        assert SignalCache(directory=directory).get(('COIN0/USDT', '1h')) is None
+    print("✅ طبقة القرص تعمل")
+
+
+def test_repeat_scan_uses_cache():
+    """المسح المتكرر لنفس الشموع يعطي نفس الجدول بتكلفة البحث فقط"""
+    frames = make_frames(30, seed=1)
+    plain = CryptoAnalyzer()
+    plain.data_fetcher = FrameFetcher(frames)
+    expected = plain.analyze_multiple_cryptos(list(frames), ['1h', '4h'])
+
+    cache = SignalCache()
+    analyzer = CryptoAnalyzer(signal_cache=cache)
+    analyzer.data_fetcher = FrameFetcher(frames)
+
+    start = time.perf_counter()
+    first = analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'])
+    cold = time.perf_counter() - start
+    assert cache.misses == 60 and cache.hits == 0
+
+    start = time.perf_counter()
+    second = analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'])
+    warm = time.perf_counter() - start
+    assert cache.hits == 60
+
+    # وضع اللوحة ونظرة السوق يستفيدان من نفس النتائج
+    batched = analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'], panel=True)
+    overview = analyzer.get_market_overview(list(frames), '1h')
+    assert cache.misses == 60
+
+    assert rows(first) == rows(expected) == rows(second) == rows(batched)
+    assert overview['total_signals'] == (expected['الإطار الزمني'] == '1h').sum()
+    print(f"⏱️ أول مسح: {cold * 1000:.0f}ms - مسح متكرر: {warm * 1000:.0f}ms")
+    assert warm < cold
+
+
+if __name__ == "__main__":
+    test_key_changes_with_data()
+    test_version_covers_analysis_code()
+    test_lru_bounded_by_size()
+    test_disk_tier()
+    test_repeat_scan_uses_cache()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+اختبار مخزن الإشارات الدائم والاستعلام منه
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+from signal_buffer import BUY, SELL, SIGNAL_TYPES, SignalBuffer
+from signal_store import SignalStore
+
+FILTERS = [
+    dict(),
+    dict(hours_back=0),
+    dict(hours_back=12),
+    dict(symbol_filter='COIN1/USDT', hours_back=0),
+    dict(signal_type_filter='بيع', hours_back=100),
+    dict(indicator_filter='RSI', hours_back=48),
+    dict(indicator_filter='MA', signal_type_filter='شراء', hours_back=0),
+    dict(symbol_filter='XYZ/USDT'),
+]
+
+
+def make_frames(count, length=200, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now().floor('h') if end is None else end
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, length)))
+        frames[f'COIN{i}/USDT'] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1, 100, length),
+        }, index=pd.date_range(end=end, periods=length, freq='1h'))
+    return frames
+
+
+class FrameFetcher:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = 0
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        self.calls += 1
+        return {timeframe: self.frames[symbol] for timeframe in timeframes}
+
+
+def rows(table):
+    return sorted(map(tuple, table.astype(str).values.tolist()))
+
+
+def test_scan_writes_and_filters_match():
+    """المسح يكتب في المخزن والفلترة منه تطابق الفلترة على الجدول"""
+    print("🔥 اختبار مخزن الإشارات")
+    print("=" * 60)
+
+    frames = make_frames(6, seed=1)
+    store = SignalStore(':memory:')
+    analyzer = CryptoAnalyzer(signal_store=store)
+    analyzer.data_fetcher = FrameFetcher(frames)
+
+    table = analyzer.analyze_signal_table(list(frames), ['1h', '4h'])
+    assert store.count() == len(table) > 0
+
+    for filters in FILTERS:
+        expected = analyzer.filter_signals(table, **filters)
+        result = analyzer.filter_signals(store, **filters)
+        assert rows(result) == rows(expected), filters
+        times = pd.to_datetime(result['وقت الإشارة'])
+        assert times.is_monotonic_decreasing
+
+    # إعادة المسح تحدّث الصفوف ولا تكررها
+    analyzer.analyze_multiple_cryptos(list(frames), ['1h', '4h'])
+    assert store.count() == len(table)
+    print(f"✅ الفلترة من المخزن مطابقة ({store.count()} إشارة)")
+
+
+def test_market_overview_from_store():
+    """النظرة العامة من استعلامات التجميع مطابقة للحساب من الجدول"""
+    # بيانات المنصة بتوقيت UTC
+    frames = make_frames(8, seed=2, end=pd.Timestamp.now('UTC').tz_localize(None).floor('h'))
+    plain = CryptoAnalyzer()
+    plain.data_fetcher = FrameFetcher(frames)
+    expected = plain.get_market_overview(list(frames), '4h')
+
+    store = SignalStore(':memory:')
+    # إشارة قديمة خارج نافذة المسح لا تدخل في الإحصائيات
+    old = SignalBuffer()
+    old.append(pd.DatetimeIndex(['2020-01-01']), 'rsi_oversold', BUY, 50.0, value=20.0)
+    store.write(old.with_context('COIN0/USDT', '4h', 1.0), [50.0])
+
+    analyzer = CryptoAnalyzer(signal_store=store)
+    analyzer.data_fetcher = FrameFetcher(frames)
+    overview = analyzer.get_market_overview(list(frames), '4h')
+
+    for key in ('total_signals', 'buy_signals', 'sell_signals', 'signal_distribution'):
+        assert overview[key] == expected[key], key
+    assert sorted(overview['most_active_coins'].values()) == sorted(expected['most_active_coins'].values())
+
+    # المرة الثانية من المخزن فقط بدون جلب
+    analyzer.data_fetcher = None
+    assert analyzer.get_market_overview(list(frames), '4h') == overview
+
+    # شمعة مغلقة أحدث من حالة المسح: إعادة مسح العملات المتأخرة فقط
+    analyzer.data_fetcher = fetcher = FrameFetcher(frames)
+    store.mark_scanned([('COIN3/USDT', '4h', 0), ('COIN5/USDT', '4h', 0)])
+    assert analyzer.get_market_overview(list(frames), '4h') == overview
+    assert fetcher.calls == 2
+    print(f"✅ النظرة العامة مطابقة ({overview['total_signals']} إشارة)")
+
+
+def test_persists_across_restarts():
+    """الإشارات تبقى بعد إعادة فتح المخزن"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'signals.sqlite')
+        buffer = SignalBuffer()
+        buffer.append(pd.DatetimeIndex(['2024-06-01 10:00']), 'rsi_oversold', BUY, 55.0, value=25.0)
+        buffer.with_context('AAA/USDT', '1h', 1.5)
+
+        store = SignalStore(path)
+        store.write(buffer, [55.0], detected_at=1_717_236_000)
+        # الوصف لا يُنشأ عند الكتابة: تُخزن قيمة المؤشر فقط
+        assert store._conn.execute('SELECT description, value FROM signals').fetchall() == [(None, 25.0)]
+        store.close()
+
+        reopened = SignalStore(path).query(symbols=['AAA/USDT'])
+        record = reopened.to_records()[0]
+        assert record['type'] == 'rsi_oversold' and record['signal'] == 'شراء'
+        assert record['timestamp'] == pd.Timestamp('2024-06-01 10:00')
+        assert record['description'] == 'RSI في منطقة التشبع البيعي (25.0)'
+        assert record['strength_percentage'] == 55.0 and record['current_price'] == 1.5
+    print("✅ المخزن دائم")
+
+
+def test_rescan_keeps_first_seen_and_drops_vanished():
+    """إعادة المسح تبقي وقت الاكتشاف الأول وتحذف إشارات النافذة التي اختفت"""
+    store = SignalStore(':memory:')
+    times = pd.DatetimeIndex(['2024-06-01 08:00', '2024-06-01 09:00', '2024-06-01 10:00'])
+    window = {('AAA/USDT', '1h'): (times[0].value // 1_000_000, times[-1].value // 1_000_000)}
+
+    def scan(*rows):
+        buffer = SignalBuffer()
+        for position, signal_type, strength in rows:
+            buffer.append(times[[position]], signal_type, BUY, strength, value=20.0)
+        return buffer.with_context('AAA/USDT', '1h', 1.0)
+
+    # إشارة خارج النافذة لا تُمس
+    older = SignalBuffer()
+    older.append(pd.DatetimeIndex(['2024-05-01']), 'rsi_oversold', BUY, 40.0)
+    store.write(older.with_context('AAA/USDT', '1h', 1.0), [40.0], detected_at=1_000)
+
+    first = scan((0, 'rsi_oversold', 50.0), (1, 'ma_bullish_crossover', 60.0))
+    store.write(first, [50.0, 60.0], detected_at=2_000, windows=window)
+
+    # المسح التالي: الأولى بقوة جديدة، والثانية اختفت
+    second = scan((0, 'rsi_oversold', 70.0), (2, 'macd_simple_bullish_divergence', 65.0))
+    store.write(second, [70.0, 65.0], detected_at=3_000, windows=window)
+
+    stored = store._conn.execute('SELECT type, ts, strength, detected_at FROM signals ORDER BY ts').fetchall()
+    assert [(signal_type, strength, detected) for signal_type, _, strength, detected in stored] == [
+        ('rsi_oversold', 40.0, 1_000_000),
+        ('rsi_oversold', 70.0, 2_000_000),
+        ('macd_simple_bullish_divergence', 65.0, 3_000_000),
+    ]
+
+    # نافذة بلا إشارات تحذف كل ما فيها
+    store.write(SignalBuffer(), [], windows=window)
+    assert store.count() == 1
+    print("✅ وقت الاكتشاف الأول محفوظ ولا إشارات وهمية")
+
+
+def test_week_of_signals_query_speed():
+    """أسبوع من الإشارات لـ 400 عملة: الفلترة بالمللي ثانية"""
+    rng = np.random.default_rng(3)
+    now = pd.Timestamp.now().floor('h')
+    store = SignalStore(':memory:')
+    analyzer = CryptoAnalyzer()
+
+    for i in range(400):
+        for timeframe in ('1h', '4h'):
+            count = 60
+            buffer = SignalBuffer()
+            buffer.append(now - pd.to_timedelta(rng.integers(0, 7 * 24, count), unit='h'),
+                          rng.integers(0, len(SIGNAL_TYPES), count), rng.choice([BUY, SELL], count),
+                          rng.uniform(10, 100, count), value=rng.uniform(0, 100, count))
+            buffer.with_context(f'COIN{i}/USDT', timeframe, 1.0)
+            store.write(buffer, np.round(buffer.columns()['strength'], 1))
+
+    start = time.perf_counter()
+    result = analyzer.filter_signals(store, indicator_filter='RSI', signal_type_filter='شراء', hours_back=6)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = analyzer.filter_signals(store, symbol_filter='COIN7/USDT', hours_back=0)
+    single_elapsed = time.perf_counter() - start
+
+    print(f"⏱️ {store.count()} إشارة - آخر 6 ساعات: {len(result)} صف في {elapsed * 1000:.1f}ms، "
+          f"عملة واحدة: {len(single)} صف في {single_elapsed * 1000:.1f}ms")
+    assert len(result) > 0 and len(single) > 0
+    assert elapsed < 1 and single_elapsed < 1
+
+
+if __name__ == "__main__":
+    test_scan_writes_and_filters_match()
+    test_market_overview_from_store()
+    test_persists_across_restarts()
+    test_rescan_keeps_first_seen_and_drops_vanished()
+    test_week_of_signals_query_speed()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+اختبار جدول الإشارات المفهرس بالوقت وتطابق الفلترة مع فلترة جدول العرض
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import _INDICATOR_LABELS, CryptoAnalyzer
+from signal_buffer import BUY, SELL, SIGNAL_TYPES, SignalBuffer
+from signal_table import DISPLAY_COLUMNS, SignalTable
+
+FILTERS = [
+    dict(),
+    dict(hours_back=0),
+    dict(hours_back=6),
+    dict(symbol_filter='C1/USDT', hours_back=0),
+    dict(signal_type_filter='شراء', hours_back=48),
+    dict(indicator_filter='RSI', hours_back=24),
+    dict(indicator_filter='MA', signal_type_filter='بيع', hours_back=200),
+    dict(symbol_filter='C2/USDT', indicator_filter='OBV', hours_back=0),
+    dict(symbol_filter='الكل', signal_type_filter='الكل', indicator_filter='الكل'),
+    dict(symbol_filter='XYZ/USDT'),
+]
+
+
+def reference_filter(signals_df, symbol_filter=None, signal_type_filter=None, indicator_filter=None, hours_back=24):
+    """الفلترة القديمة على جدول العرض (للمقارنة)"""
+    filtered_df = signals_df.copy()
+    if hours_back > 0:
+        cutoff_time = datetime.now() - pd.Timedelta(hours=hours_back)
+        filtered_df = filtered_df[pd.to_datetime(filtered_df['وقت الإشارة']) >= cutoff_time]
+    if symbol_filter and symbol_filter != 'الكل':
+        filtered_df = filtered_df[filtered_df['العملة'] == symbol_filter]
+    if signal_type_filter and signal_type_filter != 'الكل':
+        filtered_df = filtered_df[filtered_df['نوع الإشارة'] == signal_type_filter]
+    if indicator_filter and indicator_filter != 'الكل':
+        filtered_df = filtered_df[filtered_df['المؤشر'].str.contains(indicator_filter, na=False)]
+    return filtered_df
+
+
+def make_buffer(count, seed=0, tz=None):
+    """مخزن إشارات عشوائي لعدة عملات وأطر زمنية (أوقات متكررة عمداً)"""
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now(tz=tz).floor('min')
+    buffers = []
+    for symbol in ['C0/USDT', 'C1/USDT', 'C2/USDT']:
+        for timeframe in ['1h', '4h']:
+            times = now - pd.to_timedelta(rng.integers(0, 72 * 60, count), unit='min') \
+                - pd.to_timedelta(rng.integers(0, 60, count), unit='s')
+            buffer = SignalBuffer(tz)
+            buffer.append(pd.DatetimeIndex(times), rng.integers(0, len(SIGNAL_TYPES), count),
+                          rng.choice([BUY, SELL], count), rng.uniform(0, 120, count), value=rng.uniform(0, 100, count))
+            buffers.append(buffer.with_context(symbol, timeframe, rng.uniform(1, 100)))
+    return SignalBuffer.concat(buffers)
+
+
+def assert_same(left, right):
+    assert list(left.columns) == DISPLAY_COLUMNS
+    assert left.astype(str).values.tolist() == right.astype(str).values.tolist()
+
+
+def test_filters_match_display_filter():
+    """الفلترة على الجدول المفهرس تطابق الفلترة القديمة صفاً بصف وبنفس الترتيب"""
+    print("🔥 اختبار جدول الإشارات المفهرس")
+    print("=" * 60)
+
+    analyzer = CryptoAnalyzer()
+    for tz in [None, 'Asia/Riyadh']:
+        buffer = make_buffer(300, seed=1, tz=tz)
+        table = analyzer.build_table(buffer)
+        display = analyzer._format_signals(buffer)
+        assert_same(table.to_display(), display)
+
+        for filters in FILTERS:
+            expected = reference_filter(display, **filters)
+            assert_same(analyzer.filter_signals(table, **filters), expected)
+            # جدول العرض المنسق يُقبل أيضاً
+            assert_same(analyzer.filter_signals(display, **filters), expected)
+    print("✅ الفلترة مطابقة")
+
+
+def test_select():
+    """select تعيد مواقع تصاعدية والحدود الزمنية بحث ثنائي"""
+    analyzer = CryptoAnalyzer()
+    table = analyzer.build_table(make_buffer(50, seed=2))
+    times = table.frame.index
+    assert times.is_monotonic_increasing
+
+    since = times[len(times) // 2]
+    rows = table.select(since=since, signal='بيع')
+    assert np.all(np.diff(rows) > 0)
+    assert np.all(times[rows] >= since)
+    assert (table.frame['signal'].iloc[rows] == 'بيع').all()
+    assert len(table.select(since=times[-1] + pd.Timedelta(minutes=1))) == 0
+
+    subset = table.take(rows)
+    assert len(subset) == len(rows)
+    assert subset.to_display()['الوصف'].tolist() == table.to_display(rows)['الوصف'].tolist()
+
+    empty = SignalTable.from_buffer(SignalBuffer(), np.empty(0), _INDICATOR_LABELS)
+    assert empty.empty and list(empty.to_display().columns) == DISPLAY_COLUMNS
+    print("✅ select تعمل")
+
+
+def test_benchmark():
+    """فلترة 200 ألف إشارة: الجدول المفهرس أسرع من فلترة جدول العرض"""
+    analyzer = CryptoAnalyzer()
+    buffer = make_buffer(34000, seed=3)
+    table = analyzer.build_table(buffer)
+    display = table.to_display()
+    filters = dict(symbol_filter='C1/USDT', indicator_filter='RSI', hours_back=6)
+
+    start = time.perf_counter()
+    expected = reference_filter(display, **filters)
+    slow = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = analyzer.filter_signals(table, **filters)
+    fast = time.perf_counter() - start
+
+    assert_same(result, expected)
+    print(f"⏱️ {len(table)} إشارة - جدول العرض: {slow * 1000:.0f}ms - الجدول المفهرس: {fast * 1000:.1f}ms")
+    assert fast < slow
+
+
+if __name__ == "__main__":
+    test_filters_match_display_filter()
+    test_select()
+    test_benchmark()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+اختبار النسخة المتجهة من detect_simple_divergence والنسخة المجمعة
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import TechnicalIndicators
+
+
+def reference_simple_divergence(price_series, indicator_series, window=20):
+    """الطريقة القديمة بالنوافذ المتحركة للمقارنة"""
+    divergences = []
+    if len(price_series) < window * 2:
+        return divergences
+
+    for i in range(window, len(price_series) - window):
+        price_trend1 = price_series.iloc[i - 1] - price_series.iloc[i - window]
+        price_trend2 = price_series.iloc[i + window - 1] - price_series.iloc[i]
+        ind_trend2 = indicator_series.iloc[i + window - 1] - indicator_series.iloc[i]
+
+        if price_trend2 < 0 and ind_trend2 > 0 and abs(price_trend2) > abs(price_trend1) * 0.5:
+            divergences.append({'type': 'bullish_divergence',
+                                'timestamp': price_series.index[i + window - 1],
+                                'strength': abs(price_trend2) + abs(ind_trend2)})
+        elif price_trend2 > 0 and ind_trend2 < 0 and abs(price_trend2) > abs(price_trend1) * 0.5:
+            divergences.append({'type': 'bearish_divergence',
+                                'timestamp': price_series.index[i + window - 1],
+                                'strength': abs(price_trend2) + abs(ind_trend2)})
+    return divergences
+
+
+def make_data(periods, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'volume': rng.uniform(1, 100, periods),
+    }, index=pd.date_range('2024-01-01', periods=periods, freq='1h'))
+
+
+def test_matches_reference():
+    """نفس النتائج (مع قيم NaN في بداية المؤشرات)"""
+    print("🔥 اختبار الدايفرجنس البسيط المتجه")
+    print("=" * 60)
+
+    for periods in (39, 40, 41, 300):
+        indicators = TechnicalIndicators(make_data(periods))
+        indicators.calculate_rsi()
+        indicators.calculate_macd()
+        for column in ('rsi', 'macd_histogram'):
+            fast = indicators.detect_simple_divergence(indicators.df['close'], indicators.df[column])
+            slow = reference_simple_divergence(indicators.df['close'], indicators.df[column])
+            assert fast == slow, (periods, column)
+    print("✅ النتائج مطابقة")
+
+
+def test_batch_and_speed():
+    """النسخة المجمعة تطابق الاستدعاءات المنفصلة وأسرع من الحلقة"""
+    indicators = TechnicalIndicators(make_data(3000))
+    indicators.calculate_rsi()
+    indicators.calculate_macd()
+    indicators.calculate_obv()
+
+    close = indicators.df['close']
+    columns = ('rsi', 'macd_histogram', 'obv')
+    batch = indicators.detect_simple_divergence_batch(close, {c: indicators.df[c] for c in columns})
+    for column in columns:
+        assert batch[column] == indicators.detect_simple_divergence(close, indicators.df[column])
+
+    start = time.perf_counter()
+    reference_simple_divergence(close, indicators.df['rsi'])
+    slow = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indicators.detect_simple_divergence(close, indicators.df['rsi'])
+    fast = time.perf_counter() - start
+
+    print(f"⏱️ الحلقة: {slow * 1000:.1f}ms - المتجهة: {fast * 1000:.1f}ms")
+    assert fast < slow
+
+
+if __name__ == "__main__":
+    test_matches_reference()
+    test_batch_and_speed()
+    print("\n✅ انتهى الاختبار")
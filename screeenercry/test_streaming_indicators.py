@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+اختبار الحالة التزايدية للمؤشرات (تحديث شمعة بشمعة)
+"""
+
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels
+from streaming_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+
+TOLERANCE = 1e-8
+
+
+def make_data(periods, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    close[periods // 2:periods // 2 + 3] = close[periods // 2]
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'volume': rng.uniform(1, 100, periods),
+    }, index=pd.date_range('2024-01-01', periods=periods, freq='1h'))
+
+
+def reference_values(df):
+    """قيم آخر شمعة من النوى الكاملة"""
+    close, volume = df['close'].values, df['volume'].values
+    macd, macd_signal, macd_histogram = indicator_kernels.macd(close, 12, 26, 9)
+    series = {
+        'rsi': indicator_kernels.rsi(close, 14),
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd_histogram,
+        'obv': indicator_kernels.obv(close, volume),
+        'ma_short': indicator_kernels.sma(close, 9),
+        'ma_long': indicator_kernels.sma(close, 20),
+    }
+    return {name: values[-1] for name, values in series.items()}
+
+
+def assert_matches(values, expected):
+    for name in INDICATOR_COLUMNS:
+        if np.isnan(expected[name]):
+            assert values[name] is None, name
+        else:
+            assert abs(values[name] - expected[name]) <= TOLERANCE * max(1.0, abs(expected[name])), name
+
+
+def test_matches_full_recompute():
+    """كل شمعة مضافة تعطي نفس قيم الحساب الكامل"""
+    print("🔥 اختبار الحالة التزايدية للمؤشرات")
+    print("=" * 60)
+
+    df = make_data(300)
+    engine = IncrementalIndicators()
+    for i, (timestamp, row) in enumerate(df.iterrows()):
+        values = engine.update(timestamp, row['close'], row['volume'])
+        assert_matches(values, reference_values(df.iloc[:i + 1]))
+    print("✅ القيم مطابقة للحساب الكامل")
+
+
+def test_forming_candle_revision():
+    """مراجعة الشمعة المفتوحة لا تغير الحالة"""
+    df = make_data(120)
+    engine = IncrementalIndicators.from_dataframe(df.iloc[:-1])
+    committed = dict(engine.values)
+
+    timestamp = df.index[-1]
+    for close in (90.0, 110.0, df['close'].iloc[-1]):
+        forming = engine.update(timestamp, close, 50.0, closed=False)
+        revised = df.iloc[:-1].copy()
+        revised.loc[timestamp] = [close, close, close, close, 50.0]
+        assert_matches(forming, reference_values(revised))
+        assert engine.values == committed
+
+    engine.update(timestamp, df['close'].iloc[-1], df['volume'].iloc[-1])
+    assert engine.forming is None
+    assert_matches(engine.values, reference_values(df))
+
+    try:
+        engine.update(timestamp, 1.0, 1.0)
+        assert False, "يجب رفض شمعة مكررة"
+    except ValueError:
+        pass
+    print("✅ مراجعة الشمعة المفتوحة")
+
+
+def test_snapshot_restore():
+    """الحالة المستعادة تكمل التحديث بنفس النتائج"""
+    df = make_data(200)
+    engine = IncrementalIndicators.from_dataframe(df.iloc[:150])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state', 'BTC_USDT_1h.json')
+        engine.snapshot(path)
+        restored = IncrementalIndicators.restore(path)
+
+    assert restored.last_timestamp == df.index[149]
+    for timestamp, row in df.iloc[150:].iterrows():
+        restored.update(timestamp, row['close'], row['volume'])
+    assert_matches(restored.values, reference_values(df))
+    print("✅ الحفظ والاستعادة")
+
+
+def test_rolling_sums_do_not_drift():
+    """المجاميع المتدحرجة تبقى مطابقة لمجموع النافذة في تشغيل طويل"""
+    rng = np.random.default_rng(7)
+    engine = IncrementalIndicators()
+    start = pd.Timestamp('2020-01-01')
+    # قفزات ضخمة تُفقد المجموع دقته بعد خروجها من النافذة؛ الطول مضاعف للفترتين 9 و20
+    closes = rng.uniform(1, 2, 18000)
+    closes[::1000] = 1e12
+    for i, close in enumerate(closes):
+        engine.update(start + pd.Timedelta(minutes=i), close, 1.0)
+
+    assert abs(engine.short_sum - math.fsum(engine.short_window)) <= 1e-9 * math.fsum(engine.short_window)
+    assert abs(engine.long_sum - math.fsum(engine.long_window)) <= 1e-9 * math.fsum(engine.long_window)
+    print("✅ لا انحراف في المجاميع المتدحرجة")
+
+
+def test_forming_state_restore():
+    """الشمعة المفتوحة تُستعاد ولا تُتخطى شمعة دون إغلاقها"""
+    df = make_data(120)
+    engine = IncrementalIndicators.from_dataframe(df.iloc[:-2])
+    forming = engine.update(df.index[-2], 99.0, 10.0, closed=False)
+
+    restored = IncrementalIndicators.from_dict(engine.to_dict())
+    assert restored.forming == forming and restored.forming_timestamp == df.index[-2]
+    try:
+        restored.update(df.index[-1], 1.0, 1.0, closed=False)
+        assert False, "يجب رفض شمعة جديدة قبل إغلاق المفتوحة"
+    except ValueError:
+        pass
+
+    restored.update(df.index[-2], df['close'].iloc[-2], df['volume'].iloc[-2])
+    restored.update(df.index[-1], df['close'].iloc[-1], df['volume'].iloc[-1])
+    assert restored.forming is None and restored.forming_timestamp is None
+    assert_matches(restored.values, reference_values(df))
+    print("✅ استعادة الشمعة المفتوحة")
+
+
+def test_advance_and_history():
+    """التقدم بالشموع الجديدة فقط وسجل القيم لكل شمعة"""
+    df = make_data(200)
+    engine = IncrementalIndicators.from_dataframe(df.iloc[:150], keep=100)
+    assert engine.advance(df.iloc[100:180])
+    assert engine.last_timestamp == df.index[179]
+
+    frame = engine.history_frame(df.index[130:180])
+    for position in (130, 179):
+        expected = reference_values(df.iloc[:position + 1])
+        assert_matches({name: None if np.isnan(value) else value
+                        for name, value in frame.iloc[position - 130].items()}, expected)
+    assert engine.history_frame(df.index[70:180]) is None
+
+    # فجوة أو إغلاق معدّل: يجب إعادة التهيئة
+    assert not engine.advance(df.iloc[181:])
+    revised = df.iloc[170:].copy()
+    revised.loc[df.index[179], 'close'] += 1
+    assert not engine.advance(revised)
+    print("✅ التقدم بالشموع الجديدة فقط")
+
+
+if __name__ == "__main__":
+    test_matches_full_recompute()
+    test_forming_candle_revision()
+    test_snapshot_restore()
+    test_rolling_sums_do_not_drift()
+    test_forming_state_restore()
+    test_advance_and_history()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+اختبار إرجاع نتائج المسح لكل عملة فور انتهائها
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import CryptoAnalyzer
+
+
+class SlowFetcher:
+    """بيانات ثابتة لكل عملة مع تأخير يحاكي الشبكة"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def get_multi_timeframe_data(self, symbol, timeframes, limit=200):
+        time.sleep(self.delay)
+        if symbol == 'BAD/USDT':
+            raise ValueError('رمز غير موجود')
+        rng = np.random.default_rng(sum(map(ord, symbol)))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, limit)))
+        df = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                           'close': close, 'volume': rng.uniform(1, 100, limit)},
+                          index=pd.date_range(end='2024-06-01', periods=limit, freq='1h'))
+        return {timeframe: df for timeframe in timeframes}
+
+
+def make_analyzer(delay=0.0):
+    analyzer = CryptoAnalyzer()
+    analyzer.data_fetcher = SlowFetcher(delay)
+    return analyzer
+
+
+def rows(table):
+    return sorted(map(tuple, table.astype(str).values.tolist()))
+
+
+def test_iterator_matches_full_scan():
+    """النتائج الجزئية مجتمعة = الجدول الكامل، مع معلومات التقدم"""
+    print("🔥 اختبار المسح التدريجي")
+    print("=" * 60)
+
+    symbols = ['BTC/USDT', 'BAD/USDT', 'ETH/USDT', 'SOL/USDT']
+    analyzer = make_analyzer()
+
+    results = list(analyzer.iter_multiple_cryptos(symbols, ['1h', '4h']))
+    assert [r['symbol'] for r in results] == symbols
+    assert [r['completed'] for r in results] == [1, 2, 3, 4]
+    assert all(r['total'] == 4 for r in results)
+    assert results[-1]['progress'] == 1.0
+    assert results[1]['error'] is not None and results[1]['signals'].empty
+
+    full = analyzer.analyze_multiple_cryptos(symbols, ['1h', '4h'])
+    partial = pd.concat([r['signals'] for r in results if not r['signals'].empty])
+    assert list(partial.columns) == list(full.columns)
+    assert rows(partial) == rows(full)
+    print(f"✅ {len(results)} نتائج تدريجية = {len(full)} إشارة")
+
+
+def test_first_result_arrives_early():
+    """أول نتيجة تصل قبل انتهاء المسح كاملاً"""
+    symbols = [f'COIN{i}/USDT' for i in range(6)]
+    start = time.perf_counter()
+    stream = make_analyzer(delay=0.1).iter_multiple_cryptos(symbols)
+    next(stream)
+    first = time.perf_counter() - start
+    stream.close()
+    print(f"⏱️ أول نتيجة بعد {first * 1000:.0f}ms")
+    assert first < 0.3
+
+
+def test_async_iterator():
+    """النسخة غير المتزامنة تعطي نفس النتائج"""
+    symbols = ['BTC/USDT', 'ETH/USDT']
+    analyzer = make_analyzer()
+
+    async def collect():
+        return [result async for result in analyzer.aiter_multiple_cryptos(symbols)]
+
+    results = asyncio.run(collect())
+    assert [r['symbol'] for r in results] == symbols
+    expected = list(analyzer.iter_multiple_cryptos(symbols))
+    for got, want in zip(results, expected):
+        assert rows(got['signals']) == rows(want['signals'])
+    print("✅ النسخة غير المتزامنة")
+
+
+if __name__ == "__main__":
+    test_iterator_matches_full_scan()
+    test_first_result_arrives_early()
+    test_async_iterator()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+اختبار إشارات تقاطع المتوسطات ومناطق RSI المحسوبة بالأقنعة
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicators import TechnicalIndicators
+
+
+def reference_ma_crossover(df):
+    """الطريقة القديمة بالحلقة للمقارنة"""
+    signals = []
+    for i in range(1, len(df)):
+        prev_short, prev_long = df['ma_short'].iloc[i - 1], df['ma_long'].iloc[i - 1]
+        curr_short, curr_long = df['ma_short'].iloc[i], df['ma_long'].iloc[i]
+        if prev_short <= prev_long and curr_short > curr_long:
+            signals.append(('ma_bullish_crossover', df.index[i]))
+        elif prev_short >= prev_long and curr_short < curr_long:
+            signals.append(('ma_bearish_crossover', df.index[i]))
+    return signals
+
+
+def reference_rsi_zones(df):
+    """الطريقة القديمة بالحلقة للمقارنة"""
+    signals = []
+    for i in range(len(df)):
+        rsi_val = df['rsi'].iloc[i]
+        if rsi_val <= 30:
+            signals.append(('rsi_oversold', df.index[i], max(10, min(70, (30 - rsi_val) * 2 + 40)),
+                            f'RSI في منطقة التشبع البيعي ({rsi_val:.1f})'))
+        elif rsi_val >= 70:
+            signals.append(('rsi_overbought', df.index[i], max(10, min(70, (rsi_val - 70) * 2 + 40)),
+                            f'RSI في منطقة التشبع الشرائي ({rsi_val:.1f})'))
+    return signals
+
+
+def make_data(periods=500, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, periods)))
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+        'volume': rng.uniform(1, 100, periods),
+    }, index=pd.date_range('2024-01-01', periods=periods, freq='1D'))
+
+
+def test_ma_crossover_matches_loop():
+    """نفس التقاطعات وبنفس الترتيب"""
+    print("🔥 اختبار إشارات التقاطع ومناطق RSI بالأقنعة")
+    print("=" * 60)
+
+    indicators = TechnicalIndicators(make_data())
+    signals = indicators.analyze_ma_crossover()
+
+    assert [(s['type'], s['timestamp']) for s in signals] == reference_ma_crossover(indicators.df)
+    assert all(s['strength_percentage'] == 35.0 for s in signals)
+    print(f"✅ التقاطعات: {len(signals)}")
+
+
+def test_rsi_zones_match_loop():
+    """نفس إشارات التشبع والقوة والوصف"""
+    indicators = TechnicalIndicators(make_data())
+    signals = [s for s in indicators.analyze_rsi_signals() if s['type'] in ('rsi_oversold', 'rsi_overbought')]
+
+    expected = reference_rsi_zones(indicators.df)
+    assert [(s['type'], s['timestamp'], s['strength_percentage'], s['description']) for s in signals] == expected
+    print(f"✅ إشارات التشبع: {len(signals)}")
+
+
+if __name__ == "__main__":
+    test_ma_crossover_matches_loop()
+    test_rsi_zones_match_loop()
+    print("\n✅ انتهى الاختبار")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+اختبار تكافؤ وسرعة المعالجة المتجهة لقوة الإشارة وأسماء المؤشرات
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from crypto_analyzer import _INDICATOR_LABELS, CryptoAnalyzer, round_like_builtin
+from signal_buffer import SIGNAL_TYPES, TYPE_CODES
+
+SPECIAL_VALUES = [None, np.nan, 'abc', '55', 0, -0.0, 5, 9.99, 10, 10.05, 45.25, 78.35, 99.95, 100,
+                  100.04, 100.5, 150, 999.9, 1000, 2060, 9999.99, 10000, 40000, -5, -99.95, -100,
+                  -150, -40000, np.inf, -np.inf, 1e300]
+
+
+def make_values(count, seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([
+        rng.uniform(-200, 200, count // 4),
+        np.round(rng.uniform(0, 120, count // 4), 2),  # قيم قريبة من منتصف التقريب
+        rng.lognormal(4, 3, count // 4),
+        rng.choice([35.0, 45.0, 55.0, 60.0, 65.0], count - 3 * (count // 4)),
+    ])
+    rng.shuffle(values)
+    return values
+
+
+def test_rounding_matches_builtin():
+    """التقريب المتجه يطابق round() حتى عند المنتصف"""
+    print("🔥 اختبار المعالجة المتجهة لقوة الإشارة")
+    print("=" * 60)
+
+    values = np.concatenate([make_values(200000), np.arange(0, 20000) / 100 + 0.05])
+    expected = np.array([round(value, 1) for value in values.tolist()])
+    assert np.array_equal(round_like_builtin(values, 1), expected)
+    print("✅ التقريب مطابق لـ round()")
+
+
+def test_equivalence():
+    """النتائج المتجهة مطابقة لدوال الصف الواحد"""
+    analyzer = CryptoAnalyzer()
+    values = pd.Series(list(make_values(20000, seed=1)) + SPECIAL_VALUES, dtype=object)
+
+    expected_fixed = np.array([analyzer._fix_strength_value(value) for value in values])
+    fixed = analyzer._fix_strength_values(values)
+    assert np.array_equal(fixed, expected_fixed)
+
+    rounded = np.round(fixed, 1)
+    expected_final = np.array([analyzer._final_strength_check(value) for value in pd.Series(expected_fixed).round(1)])
+    assert np.array_equal(analyzer._final_strength_checks(rounded), expected_final)
+
+    codes = np.arange(len(SIGNAL_TYPES))
+    assert list(analyzer._default_strengths(codes)) == \
+           [analyzer._calculate_default_strength({'type': name}) for name in SIGNAL_TYPES]
+    print("✅ النتائج مطابقة")
+
+
+def test_benchmark():
+    """جدول 50 ألف إشارة: المتجه أسرع من apply"""
+    analyzer = CryptoAnalyzer()
+    count = 50000
+    rng = np.random.default_rng(2)
+    frame = pd.DataFrame({
+        'type': rng.choice(SIGNAL_TYPES, count),
+        'strength_percentage': make_values(count, seed=3),
+    })
+
+    start = time.perf_counter()
+    fixed = frame['strength_percentage'].apply(analyzer._fix_strength_value).round(1)
+    slow_strength = fixed.apply(analyzer._final_strength_check)
+    slow_labels = frame['type'].apply(analyzer._format_indicator_name)
+    slow_default = frame.apply(analyzer._calculate_default_strength, axis=1)
+    slow = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = frame['type'].map(TYPE_CODES).to_numpy()
+    fast_strength = analyzer._final_strength_checks(np.round(analyzer._fix_strength_values(frame['strength_percentage']), 1))
+    fast_labels = _INDICATOR_LABELS[codes]
+    fast_default = analyzer._default_strengths(codes)
+    fast = time.perf_counter() - start
+
+    assert np.array_equal(fast_strength, slow_strength.to_numpy())
+    assert list(fast_labels) == slow_labels.tolist()
+    assert np.array_equal(fast_default, slow_default.to_numpy(dtype=float))
+    print(f"⏱️ apply: {slow * 1000:.0f}ms - متجه: {fast * 1000:.1f}ms ({slow / fast:.0f}x)")
+    assert fast < slow
+
+
+if __name__ == "__main__":
+    test_rounding_matches_builtin()
+    test_equivalence()
+    test_benchmark()
+    print("\n✅ انتهى الاختبار")